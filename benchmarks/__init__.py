@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+# This file is part of Python Boleto.
+#
+# Copyright (c) 2016, Rockho Team. All rights reserved.
+# Author: Christian Hess
+#
+# This source code is licensed under the AGPLv3 license found in the
+# LICENSE file in the root directory of this source tree.
+'''
+Benchmarks da biblioteca.
+
+Uso:
+    python -m benchmarks --size 1000
+    python -m benchmarks --size 100000 --only modulo
+    python -m benchmarks --save    # atualiza o baseline
+'''
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+# This file is part of Python Boleto.
+#
+# Copyright (c) 2016, Rockho Team. All rights reserved.
+# Author: Christian Hess
+#
+# This source code is licensed under the AGPLv3 license found in the
+# LICENSE file in the root directory of this source tree.
+'''
+Executa os benchmarks e compara os resultados com o baseline.
+
+Para cada caso são medidas a vazão (operações por segundo, a melhor de
+`--repeat` execuções) e o pico de memória alocada (tracemalloc, em uma
+execução separada). Com `--check`, retorna 1 quando algum caso ficar mais
+lento que o baseline além da tolerância.
+'''
+from __future__ import print_function, unicode_literals
+
+import argparse
+import gc
+import io
+import json
+import os
+import sys
+import timeit
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+from .cases import CASES
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+DEFAULT_SIZE = 1000
+DEFAULT_REPEAT = 5
+DEFAULT_TOLERANCE = 0.1
+
+
+def measure(case, size, repeat=DEFAULT_REPEAT):
+    '''
+    Mede um caso
+    :rtype: dict (ops, ops_per_sec, peak_kib)
+    '''
+    if case.max_size:
+        size = min(size, case.max_size)
+    run, ops = case.setup(size)
+
+    # execução de aquecimento, também utilizada para medir o pico de memória
+    peak = None
+    if tracemalloc is not None:
+        tracemalloc.start()
+        run()
+        peak = tracemalloc.get_traced_memory()[1] / 1024.0
+        tracemalloc.stop()
+    else:
+        run()
+
+    best = None
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = timeit.default_timer()
+            run()
+            elapsed = timeit.default_timer() - start
+            best = elapsed if best is None else min(best, elapsed)
+    finally:
+        gc.enable()
+
+    return {
+        'ops': ops,
+        'ops_per_sec': round(ops / best, 1) if best else None,
+        'peak_kib': round(peak, 1) if peak is not None else None,
+    }
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return {}
+    with io.open(path, encoding='utf-8') as fp:
+        return json.load(fp)
+
+
+def save_baseline(path, baseline):
+    with io.open(path, 'w', encoding='utf-8') as fp:
+        fp.write(json.dumps(baseline, indent=2, sort_keys=True) + '\n')
+
+
+def compare(result, reference, tolerance=DEFAULT_TOLERANCE):
+    '''
+    Compara a vazão com a do baseline
+    :rtype: tuple (razão atual/baseline, regressão)
+    '''
+    if not reference or not reference.get('ops_per_sec') or not result['ops_per_sec']:
+        return None, False
+    ratio = result['ops_per_sec'] / reference['ops_per_sec']
+    return ratio, ratio < 1 - tolerance
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Benchmarks do Python Boleto')
+    parser.add_argument('--size', type=int, default=DEFAULT_SIZE,
+                        help='quantidade de boletos (padrão: %(default)s)')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help='execuções de cada caso (padrão: %(default)s)')
+    parser.add_argument('--only', help='executa apenas os casos que contêm este texto')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='arquivo do baseline (padrão: %(default)s)')
+    parser.add_argument('--save', action='store_true', help='salva os resultados como baseline')
+    parser.add_argument('--check', action='store_true', help='retorna 1 quando houver regressões')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='redução de vazão tolerada (padrão: %(default)s)')
+    args = parser.parse_args(argv)
+
+    baseline = load_baseline(args.baseline)
+    references = baseline.get(str(args.size), {})
+    results = {}
+    regressions = []
+
+    print("{0:<38} {1:>8} {2:>14} {3:>12} {4:>10}".format('caso', 'ops', 'ops/s', 'pico KiB', 'baseline'))
+    for name, case in CASES.items():
+        if args.only and args.only not in name:
+            continue
+
+        result = results[name] = measure(case, args.size, args.repeat)
+        ratio, regression = compare(result, references.get(name), args.tolerance)
+        if regression:
+            regressions.append(name)
+
+        print("{0:<38} {1:>8} {2:>14,.1f} {3:>12} {4:>10}{5}".format(
+            name, result['ops'], result['ops_per_sec'],
+            '-' if result['peak_kib'] is None else "{0:,.1f}".format(result['peak_kib']),
+            '-' if ratio is None else "{0:.0%}".format(ratio),
+            '  REGRESSÃO' if regression else ''))
+
+    if args.save:
+        references.update(results)
+        baseline[str(args.size)] = references
+        save_baseline(args.baseline, baseline)
+
+    if regressions:
+        print("\n{0} caso(s) abaixo do baseline: {1}".format(len(regressions), ", ".join(regressions)))
+    return 1 if args.check and regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+# This file is part of Python Boleto.
+#
+# Copyright (c) 2016, Rockho Team. All rights reserved.
+# Author: Christian Hess
+#
+# This source code is licensed under the AGPLv3 license found in the
+# LICENSE file in the root directory of this source tree.
+'''
+Casos medidos pelos benchmarks.
+
+Cada caso recebe o tamanho do conjunto de dados e retorna uma tupla
+(função, operações): a função executa o trabalho medido e `operações` é
+a quantidade de operações que ela realiza, utilizada no cálculo da vazão.
+A preparação dos dados fica fora da medição.
+'''
+from __future__ import unicode_literals
+
+from collections import OrderedDict, namedtuple
+import subprocess
+import sys
+
+from python_boleto import css, environment, filters
+from python_boleto.assets import asset_cache
+from python_boleto.base import _stylesheets
+from python_boleto.cecred import CecredBoleto
+from python_boleto.utils import modulo10, modulo11
+
+from .datasets import boletos, records
+
+Case = namedtuple('Case', ['name', 'setup', 'max_size'])
+
+CASES = OrderedDict()
+
+
+def case(name, max_size=None):
+    '''
+    Registra um caso. `max_size` limita o tamanho do conjunto de dados
+    dos casos mais lentos (ex: renderização)
+    '''
+    def decorator(setup):
+        CASES[name] = Case(name, setup, max_size)
+        return setup
+    return decorator
+
+
+@case('boleto_init')
+def boleto_init(size):
+    data = records(size)
+
+    def run():
+        for record in data:
+            CecredBoleto(**record)
+    return run, len(data)
+
+
+@case('boleto_setattr')
+def boleto_setattr(size):
+    data = boletos(size)
+    values = [(boleto.valor_documento, boleto.vencimento) for boleto in data]
+
+    def run():
+        for boleto, (valor, vencimento) in zip(data, values):
+            boleto.valor_documento = valor
+            boleto.vencimento = vencimento
+    return run, 2 * len(data)
+
+
+@case('validate')
+def validate(size):
+    data = boletos(size)
+
+    def run():
+        for boleto in data:
+            boleto.validate()
+    return run, len(data)
+
+
+@case('modulo10')
+def bench_modulo10(size):
+    values = [boleto.codigo_barras[:4] + boleto.codigo_barras[19:24] for boleto in boletos(size)]
+
+    def run():
+        for value in values:
+            modulo10(value)
+    return run, len(values)
+
+
+@case('modulo11')
+def bench_modulo11(size):
+    values = [boleto.codigo_barras[:4] + boleto.codigo_barras[5:] for boleto in boletos(size)]
+
+    def run():
+        for value in values:
+            modulo11(value)
+    return run, len(values)
+
+
+@case('codigo_barras')
+def codigo_barras(size):
+    data = boletos(size)
+
+    def run():
+        for boleto in data:
+            # descarta os valores calculados anteriormente
+            boleto.__dict__.pop('fator_vencimento', None)
+            boleto.__dict__.pop('codigo_barras', None)
+            boleto.codigo_barras
+    return run, len(data)
+
+
+@case('linha_digitavel')
+def linha_digitavel(size):
+    data = boletos(size)
+    for boleto in data:
+        boleto.codigo_barras
+
+    def run():
+        for boleto in data:
+            boleto.__dict__.pop('linha_digitavel', None)
+            boleto.linha_digitavel
+    return run, len(data)
+
+
+def _filter_values(name, data):
+    ''' Argumentos utilizados com cada um dos filtros dos templates '''
+    if name == 'format_currency_or_blank':
+        return [(boleto.valor_documento,) for boleto in data]
+    if name == 'format_date_or_blank':
+        return [(boleto.vencimento,) for boleto in data]
+    if name == 'format_agencia_conta':
+        return [(boleto.conta_corrente,) for boleto in data]
+    return [(boleto.instrucoes, 1) for boleto in data]
+
+
+def _filter_case(name, func):
+    def setup(size):
+        values = _filter_values(name, boletos(size))
+
+        def run():
+            for args in values:
+                func(*args)
+        return run, len(values)
+    return setup
+
+
+def _register_filters():
+    ''' Registra um caso para cada filtro dos templates '''
+    for name, func in sorted(environment.DEFAULT_FILTERS.items()):
+        case('filter_' + name)(_filter_case(name, func))
+
+
+_register_filters()
+
+
+def _reset_caches():
+    ''' Descarta os templates compilados e os demais caches dos renders '''
+    environment.reset_environment()
+    asset_cache.invalidate()
+    filters.configure()
+    _stylesheets.clear()
+    css._parsed.clear()
+    css._pruned.clear()
+
+
+@case('export_html_cold', max_size=20)
+def export_html_cold(size):
+    data = boletos(size)
+
+    def run():
+        for boleto in data:
+            _reset_caches()
+            boleto.export_html()
+    return run, len(data)
+
+
+@case('export_html_warm', max_size=500)
+def export_html_warm(size):
+    data = boletos(size)
+    data[0].export_html()
+
+    def run():
+        for boleto in data:
+            boleto.export_html()
+    return run, len(data)
+
+
+def _import_case(module):
+    ''' Importa `module` em um novo interpretador a cada operação '''
+    code = "import {0}".format(module) if module else "pass"
+
+    def setup(size):
+        def run():
+            for _ in range(size):
+                subprocess.check_call([sys.executable, '-c', code])
+        return run, size
+    return setup
+
+
+# o interpretador sem nenhum import é a referência dos demais casos
+case('import_python', max_size=10)(_import_case(None))
+case('import_cecred', max_size=10)(_import_case('python_boleto.cecred'))
+case('import_render', max_size=10)(_import_case('python_boleto.render'))
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+# This file is part of Python Boleto.
+#
+# Copyright (c) 2016, Rockho Team. All rights reserved.
+# Author: Christian Hess
+#
+# This source code is licensed under the AGPLv3 license found in the
+# LICENSE file in the root directory of this source tree.
+'''
+Dados utilizados nos benchmarks, gerados a partir de uma semente fixa:
+o mesmo tamanho gera sempre os mesmos boletos.
+'''
+from __future__ import unicode_literals
+
+import datetime
+from decimal import Decimal
+import random
+
+from python_boleto.cecred import CecredBoleto
+
+DEFAULT_SEED = 20160125
+
+_NOMES = ('Ana', 'Bruno', 'Carla', 'Daniel', 'Elisa', 'Fábio', 'Gabriela', 'Heitor', 'Íris', 'João')
+_SOBRENOMES = ('Silva', 'Souza', 'Oliveira', 'Pereira', 'Lima', 'Conceição', 'Araújo', 'Gonçalves')
+_RUAS = ('Rua das Flores', 'Av. Brasil', 'Rua XV de Novembro', 'Rua São João', 'Av. Paulista')
+
+
+def _digits(rng, size):
+    return "".join(rng.choice('0123456789') for _ in range(size))
+
+
+def records(size, seed=DEFAULT_SEED):
+    '''
+    Gera `size` registros de boletos Cecred válidos
+    :rtype: list (dicts)
+    '''
+    rng = random.Random(seed)
+    inicio = datetime.date(2016, 1, 1)
+    result = []
+
+    for i in range(size):
+        vencimento = inicio + datetime.timedelta(days=rng.randint(0, 5000))
+        result.append({
+            'convenio': _digits(rng, 6),
+            'agencia': _digits(rng, 5),
+            'conta_corrente': _digits(rng, 8),
+            'carteira': '01',
+            'num_sequencial': i + 1,
+            'vencimento': vencimento,
+            'data_documento': vencimento - datetime.timedelta(days=30),
+            'data_processamento': vencimento - datetime.timedelta(days=30),
+            'valor_documento': Decimal(rng.randint(100, 10000000)).scaleb(-2),
+            'numero_documento': "{0:010d}".format(i + 1),
+            'sacado': "{0} {1}".format(rng.choice(_NOMES), rng.choice(_SOBRENOMES)),
+            'cpf_cei_cnpj': _digits(rng, 11),
+            'sacado_extra': ["{0}, {1}".format(rng.choice(_RUAS), rng.randint(1, 9999))],
+            'cedente': 'Empresa Exemplo Ltda',
+            'local_pagamento': 'Pagável em qualquer banco até o vencimento',
+            'instrucoes': ['Não receber após o vencimento', 'Multa de 2% após o vencimento'],
+        })
+    return result
+
+
+def boletos(size, seed=DEFAULT_SEED):
+    '''
+    Gera `size` boletos Cecred válidos
+    :rtype: list (CecredBoleto)
+    '''
+    return [CecredBoleto(**record) for record in records(size, seed)]
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+# This file is part of Python Boleto.
+#
+# Copyright (c) 2016, Rockho Team. All rights reserved.
+# Author: Christian Hess
+#
+# This source code is licensed under the AGPLv3 license found in the
+# LICENSE file in the root directory of this source tree.
+'''
+Render dos boletos a partir de código asyncio (Python 3.6+).
+
+O render (Jinja) é executado em um executor limitado, sem bloquear o
+event loop. Por padrão é utilizado um pool de threads compartilhado:
+o render continua sujeito ao GIL, mas o event loop segue atendendo as
+demais requisições. Para utilizar todos os núcleos da máquina, informe
+um `concurrent.futures.ProcessPoolExecutor` (os boletos são serializados
+com pickle).
+'''
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import threading
+
+DEFAULT_WORKERS = 4
+DEFAULT_CONCURRENCY = 4
+
+_lock = threading.Lock()
+_executor = None
+
+
+def get_executor():
+    ''' Retorna o pool de threads compartilhado, criando-o se necessário '''
+    global _executor
+
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=DEFAULT_WORKERS)
+    return _executor
+
+
+def _submit(boleto, executor, kwargs):
+    loop = asyncio.get_event_loop()
+    return loop.run_in_executor(executor or get_executor(), functools.partial(boleto.export_html, **kwargs))
+
+
+async def export_html(boleto, executor=None, **kwargs):
+    '''
+    Gera o HTML do boleto no executor (por padrão, o pool compartilhado).
+    Os demais argumentos são repassados para `Boleto.export_html`
+    :rtype: string
+    '''
+    return await _submit(boleto, executor, kwargs)
+
+
+async def _iterate(boletos):
+    ''' Percorre um iterável comum ou assíncrono '''
+    if hasattr(boletos, '__aiter__'):
+        async for boleto in boletos:
+            yield boleto
+    else:
+        for boleto in boletos:
+            yield boleto
+
+
+async def render_many_async(boletos, concurrency=DEFAULT_CONCURRENCY, executor=None, **kwargs):
+    '''
+    Gera o HTML de vários boletos, na mesma ordem de `boletos` (iterável
+    comum ou assíncrono). No máximo `concurrency` boletos são renderizados
+    ao mesmo tempo: os próximos só são lidos quando o consumidor obtém os
+    anteriores. Os demais argumentos são repassados para `Boleto.export_html`
+    :rtype: async generator
+    '''
+    if concurrency < 1:
+        raise ValueError("concurrency deve ser maior que zero")
+
+    pending = deque()
+    try:
+        async for boleto in _iterate(boletos):
+            pending.append(_submit(boleto, executor, kwargs))
+            if len(pending) >= concurrency:
+                yield await pending.popleft()
+
+        while pending:
+            yield await pending.popleft()
+    finally:
+        # o consumidor parou antes do fim (ex: erro ou break)
+        for future in pending:
+            future.cancel()
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+# This file is part of Python Boleto.
+#
+# Copyright (c) 2016, Rockho Team. All rights reserved.
+# Author: Christian Hess
+#
+# This source code is licensed under the AGPLv3 license found in the
+# LICENSE file in the root directory of this source tree.
+'''
+Cache dos arquivos estáticos (logos) utilizados nos boletos.
+
+Os arquivos são lidos e convertidos para Base64 uma única vez. A entrada
+é refeita automaticamente quando a data de modificação do arquivo muda.
+'''
+from __future__ import unicode_literals
+
+import base64
+import mimetypes
+import os
+import stat
+import struct
+import threading
+
+from python_boleto import STATIC_DIR
+
+# altura, em pixels, do logo exibido nos boletos
+LOGO_HEIGHT = 25
+
+
+def jpeg_frame(data):
+    '''
+    Retorna as dimensões e a quantidade de componentes de cor
+    (largura, altura, componentes) de uma imagem JPEG
+    :rtype: tuple|None
+    '''
+    pos = 2
+    while pos + 9 < len(data):
+        marker, size = struct.unpack('>xBH', data[pos:pos + 4])
+
+        # SOF0 a SOF15, exceto DHT (C4), JPG (C8) e DAC (CC)
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            height, width, components = struct.unpack('>HHB', data[pos + 5:pos + 10])
+            return width, height, components
+
+        pos += size + 2
+
+    return None
+
+
+def image_size(data):
+    '''
+    Retorna as dimensões (largura, altura) de uma imagem JPEG, PNG ou GIF
+    :type: data bytes
+    :rtype: tuple|None
+    '''
+    if data[:8] == b'\x89PNG\r\n\x1a\n':
+        return struct.unpack('>II', data[16:24])
+
+    if data[:6] in (b'GIF87a', b'GIF89a'):
+        return struct.unpack('<HH', data[6:10])
+
+    if data[:2] == b'\xff\xd8':
+        frame = jpeg_frame(data)
+        if frame:
+            return frame[:2]
+
+    return None
+
+
+class Asset(object):
+    ''' Conteúdo de um arquivo estático já codificado '''
+
+    def __init__(self, data, mimetype, mtime=None):
+        self.data = data
+        self.mtime = mtime
+        self.mimetype = mimetype
+        self.size = image_size(data)
+        self.base64 = base64.b64encode(data).decode('ascii')
+        self.data_uri = "data:{0};base64,{1}".format(mimetype, self.base64)
+
+
+class AssetCache(object):
+    '''
+    Cache de arquivos estáticos indexado pelo caminho e data de modificação.
+    Caminhos relativos são resolvidos a partir de `STATIC_DIR`.
+    '''
+
+    def __init__(self, static_dir=STATIC_DIR):
+        self.static_dir = static_dir
+        self._lock = threading.Lock()
+        self._files = {}
+        self._memory = {}
+
+    def resolve(self, path):
+        ''' Retorna o caminho absoluto do arquivo '''
+        return os.path.join(self.static_dir, path)
+
+    def get(self, path):
+        '''
+        Retorna o `Asset` do arquivo ou None caso ele não exista
+        :rtype: Asset|None
+        '''
+        path = self.resolve(path)
+
+        asset = self._memory.get(path)
+        if asset is not None:
+            return asset
+
+        try:
+            file_stat = os.stat(path)
+        except OSError:
+            return None
+
+        if not stat.S_ISREG(file_stat.st_mode):
+            return None
+
+        mtime = file_stat.st_mtime
+
+        asset = self._files.get(path)
+        if asset is None or asset.mtime != mtime:
+            with open(path, "rb") as asset_file:
+                asset = Asset(asset_file.read(), self._guess_mimetype(path), mtime)
+
+            with self._lock:
+                self._files[path] = asset
+
+        return asset
+
+    def get_base64(self, path):
+        ''' Retorna o conteúdo do arquivo em Base64 ou None '''
+        asset = self.get(path)
+        return asset.base64 if asset else None
+
+    def get_data_uri(self, path):
+        ''' Retorna o arquivo no formato data URI ou None '''
+        asset = self.get(path)
+        return asset.data_uri if asset else None
+
+    def preload(self, *paths):
+        ''' Carrega os arquivos informados antecipadamente '''
+        for path in paths:
+            self.get(path)
+
+    def register(self, path, data, mimetype=None):
+        '''
+        Registra o conteúdo de um arquivo a partir da memória. Os arquivos
+        registrados têm prioridade sobre os existentes no disco.
+        :type: data bytes
+        '''
+        path = self.resolve(path)
+        asset = Asset(data, mimetype or self._guess_mimetype(path))
+
+        with self._lock:
+            self._memory[path] = asset
+
+    def invalidate(self, path=None):
+        ''' Remove o arquivo informado do cache ou todos, caso nenhum seja informado '''
+        with self._lock:
+            if path is None:
+                self._files.clear()
+                self._memory.clear()
+            else:
+                path = self.resolve(path)
+                self._files.pop(path, None)
+                self._memory.pop(path, None)
+
+    def _guess_mimetype(self, path):
+        return mimetypes.guess_type(path)[0] or 'application/octet-stream'
+
+
+# cache utilizado pelos boletos
+asset_cache = AssetCache()
+
+
+def logo_symbol(path, index=0):
+    '''
+    Retorna os dados do logo para ser incluído uma única vez no documento,
+    como um `<symbol>` SVG referenciado por cada boleto
+    :rtype: dict|None
+    '''
+    asset = asset_cache.get(path)
+    if asset is None or not asset.size:
+        return None
+
+    width, height = asset.size
+    return {
+        'id': "logo-{0}".format(index),
+        'width': width,
+        'height': height,
+        'display_width': round(float(LOGO_HEIGHT) * width / height, 1),
+        'data_uri': asset.data_uri,
+    }
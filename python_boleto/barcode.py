@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+# This file is part of Python Boleto.
+#
+# Copyright (c) 2016, Rockho Team. All rights reserved.
+# Author: Christian Hess
+#
+# This source code is licensed under the AGPLv3 license found in the
+# LICENSE file in the root directory of this source tree.
+'''
+Código de barras ITF (Interleaved 2 of 5), utilizado nos boletos.
+
+Gera o código de barras no servidor, em SVG ou PNG, sem depender de
+JavaScript. As larguras das barras e espaços de todos os pares de
+dígitos são pré-calculadas.
+'''
+from __future__ import unicode_literals
+
+import base64
+import struct
+import zlib
+
+# largura das barras largas em relação às estreitas
+WIDE = 3
+NARROW = 1
+
+# dimensões padrão, iguais às utilizadas com o JsBarcode
+MODULE_WIDTH = 1.35
+HEIGHT = 60
+
+# padrão de cada dígito: n = estreito, w = largo
+_DIGITS = {
+    '0': 'nnwwn', '1': 'wnnnw', '2': 'nwnnw', '3': 'wwnnn', '4': 'nnwnw',
+    '5': 'wnwnn', '6': 'nwwnn', '7': 'nnnww', '8': 'wnnwn', '9': 'nwnwn',
+}
+
+_START = (NARROW, NARROW, NARROW, NARROW)
+_STOP = (WIDE, NARROW, NARROW)
+
+
+def _pair_widths(bars, spaces):
+    ''' O primeiro dígito do par é codificado nas barras e o segundo nos espaços '''
+    widths = []
+    for bar, space in zip(_DIGITS[bars], _DIGITS[spaces]):
+        widths.append(WIDE if bar == 'w' else NARROW)
+        widths.append(WIDE if space == 'w' else NARROW)
+    return tuple(widths)
+
+
+# larguras (barra, espaço, barra, espaço...) de cada um dos 100 pares de dígitos
+PAIRS = dict((a + b, _pair_widths(a, b)) for a in _DIGITS for b in _DIGITS)
+
+
+def encode(code):
+    '''
+    Retorna as larguras, em módulos, das barras e espaços do código,
+    alternando barra e espaço (começando por uma barra)
+    :rtype: list
+    '''
+    if len(code) % 2 or not code.isdigit():
+        raise ValueError("o código de barras ITF deve possuir uma quantidade par de dígitos")
+
+    widths = list(_START)
+    for i in range(0, len(code), 2):
+        widths.extend(PAIRS[code[i:i + 2]])
+    widths.extend(_STOP)
+    return widths
+
+
+def render_svg(code, module_width=MODULE_WIDTH, height=HEIGHT):
+    '''
+    Gera o código de barras em SVG, para ser incluído diretamente no HTML
+    :rtype: string
+    '''
+    widths = encode(code)
+    total = sum(widths)
+
+    # um único path com um retângulo para cada barra
+    path = []
+    x = 0
+    for i, width in enumerate(widths):
+        if not i % 2:
+            path.append("M{0} 0h{1}v{2}h-{1}z".format(x, width, height))
+        x += width
+
+    return ('<svg xmlns="http://www.w3.org/2000/svg" class="barcode" width="{0:g}" height="{1}" '
+            'viewBox="0 0 {2} {1}" preserveAspectRatio="none" shape-rendering="crispEdges">'
+            '<path d="{3}"/></svg>').format(total * module_width, height, total, "".join(path))
+
+
+def _png_chunk(kind, data):
+    chunk = kind + data
+    return struct.pack('>I', len(data)) + chunk + struct.pack('>I', zlib.crc32(chunk) & 0xffffffff)
+
+
+def render_png(code, module_width=1, height=HEIGHT):
+    '''
+    Gera o código de barras em PNG (escala de cinza, 8 bits)
+    :param: module_width largura de cada módulo, em pixels
+    :rtype: bytes
+    '''
+    row = bytearray()
+    for i, width in enumerate(encode(code)):
+        row.extend((b'\x00' if i % 2 == 0 else b'\xff') * (width * module_width))
+
+    # cada linha começa com o tipo de filtro (0 = nenhum)
+    data = (b'\x00' + bytes(row)) * height
+
+    header = struct.pack('>IIBBBBB', len(row), height, 8, 0, 0, 0, 0)
+    return (b'\x89PNG\r\n\x1a\n' + _png_chunk(b'IHDR', header) +
+            _png_chunk(b'IDAT', zlib.compress(data, 9)) + _png_chunk(b'IEND', b''))
+
+
+def render_html(code, format='svg'):
+    '''
+    Gera o código de barras para ser incluído no HTML: o SVG inline ou
+    uma imagem PNG em Base64
+    :rtype: string
+    '''
+    if format == 'svg':
+        return render_svg(code)
+    elif format == 'png':
+        png = base64.b64encode(render_png(code, module_width=2)).decode('ascii')
+        width = sum(encode(code)) * MODULE_WIDTH
+        return '<img class="barcode" src="data:image/png;base64,{0}" width="{1:g}" height="{2}" />'.format(
+            png, width, HEIGHT)
+    raise ValueError("formato de código de barras inválido: {0}".format(format))
@@ -8,19 +8,17 @@
 # LICENSE file in the root directory of this source tree.
 from __future__ import unicode_literals
 
-import base64
-import datetime
 from decimal import Decimal
 import logging
-import os
+import re
 
-from jinja2 import Environment, PackageLoader
 import six
 
-from python_boleto import STATIC_DIR
-
-from . import filters
-from iso8601 import iso8601
+from . import css, environment, fields, instrumentation, validation
+from .assets import asset_cache, logo_symbol
+from .barcode import render_html as render_barcode
+from .record import BoletoRecord
+from .utils import cached_property
 
 if six.PY2:
     from urlparse import urljoin
@@ -29,13 +27,91 @@ else:
 
 logger = logging.getLogger(__name__)
 
+# mapa de dependências das propriedades em cache de cada classe
+_cached_dependencies = {}
+
+# nomes dos campos de cada classe
+_field_names = {}
+
+# estilos base dos documentos independentes (ver `Boleto.get_self_contained_context`)
+SELF_CONTAINED_STYLES = 'bootstrap_styles.jinja'
+_STYLE_TAG = re.compile(r'</?style[^>]*>')
+_INDENT = re.compile(r'\n\s+')
+
+# folhas de estilo, indexadas pelos templates de estilos
+_stylesheets = {}
+
+
+def get_stylesheet(template_names):
+    '''
+    Retorna o CSS dos templates de estilos informados, sem as tags <style>
+    :rtype: string
+    '''
+    templates = tuple(environment.get_template(name) for name in template_names)
+    stylesheet = _stylesheets.get(templates)
+    if stylesheet is None:
+        stylesheet = _stylesheets[templates] = _STYLE_TAG.sub('', "".join(t.render() for t in templates))
+    return stylesheet
+
+
+def get_field_names(cls):
+    '''
+    Retorna os nomes dos campos da classe de boleto: os atributos
+    públicos que não são métodos ou propriedades
+    :rtype: frozenset
+    '''
+    field_names = _field_names.get(cls)
+
+    if field_names is None:
+        field_names = set()
+        for klass in cls.__mro__:
+            for name, attr in vars(klass).items():
+                if not name.startswith('_') and not callable(attr) and \
+                        not isinstance(attr, (property, cached_property, classmethod, staticmethod)):
+                    field_names.add(name)
+
+        field_names = _field_names[cls] = frozenset(field_names)
+
+    return field_names
+
+
+def get_cached_dependencies(cls):
+    '''
+    Retorna um dicionário com o nome de cada atributo e as
+    propriedades em cache (`cached_property`) que dependem dele
+    :rtype: dict
+    '''
+    dependencies = _cached_dependencies.get(cls)
+
+    if dependencies is None:
+        dependencies = {}
+
+        for klass in reversed(cls.__mro__):
+            for name, attr in vars(klass).items():
+                if isinstance(attr, cached_property):
+                    for field in attr.depends_on:
+                        dependencies.setdefault(field, set()).add(name)
+
+        dependencies = dict((field, tuple(names)) for field, names in dependencies.items())
+        _cached_dependencies[cls] = dependencies
+
+    return dependencies
+
+
 class Boleto(object):
     '''
     Classe base que representa um boleto
     '''
     _template = 'generic.jinja'
+    # templates utilizados nos carnês (vários boletos no mesmo documento):
+    # o conteúdo de um boleto e os estilos, incluídos uma única vez no documento
+    _template_boleto = None
+    _template_styles = None
     _banco = '000'
+    _banco_dv = ''
     _logo = ''
+    # representação compacta utilizada em `to_record`/`from_record`
+    _record_class = BoletoRecord
 
     # indica o numero unico do boleto, utilizado para
     # manter uma sequencia lógica
@@ -50,14 +126,14 @@ class Boleto(object):
     quantidade = 0
     valor_unitario = Decimal()
     valor_documento = Decimal()
-    instrucoes = []
+    instrucoes = ()
     valor_desconto = Decimal()
     valor_outras_deducoes = Decimal()
     valor_multa = Decimal()
     valor_outros_acrescimos = Decimal()
     valor_cobrado = Decimal()
     sacado = ''
-    sacado_extra = []
+    sacado_extra = ()
     cpf_cei_cnpj = ''
     sacador_avalista = ''
     local_pagamento = ''
@@ -66,43 +142,144 @@ class Boleto(object):
     conta_corrente = ''
     carteira = ''
     contrato = ''
-    informacoes = []
+    informacoes = ()
+
+    # campos do tipo lista, criados para cada instância no __init__:
+    # os valores padrão da classe são imutáveis e nunca compartilhados
+    _list_fields = ('instrucoes', 'sacado_extra', 'informacoes')
+
+    # funções de conversão de cada campo, aplicadas em toda atribuição.
+    # Subclasses podem estender: dict(Boleto._field_coercers, campo=funcao)
+    _field_coercers = {
+        'valor_unitario': fields.to_decimal,
+        'valor_documento': fields.to_decimal,
+        'valor_desconto': fields.to_decimal,
+        'valor_outras_deducoes': fields.to_decimal,
+        'valor_multa': fields.to_decimal,
+        'valor_outros_acrescimos': fields.to_decimal,
+        'valor_cobrado': fields.to_decimal,
+        'vencimento': fields.to_date,
+        'data_documento': fields.to_date,
+        'data_processamento': fields.to_date,
+        'quantidade': fields.to_int,
+        'num_sequencial': fields.to_int,
+        'numero_documento': fields.to_string,
+        'especie_documento': fields.to_string,
+        'aceite': fields.to_string,
+        'especie': fields.to_string,
+        'sacado': fields.to_string,
+        'cpf_cei_cnpj': fields.to_string,
+        'sacador_avalista': fields.to_string,
+        'local_pagamento': fields.to_string,
+        'cedente': fields.to_string,
+        'agencia': fields.to_string,
+        'conta_corrente': fields.to_string,
+        'carteira': fields.to_string,
+        'contrato': fields.to_string,
+    }
+
+    # schema utilizado na validação, na ordem em que os campos são validados.
+    # Subclasses podem estender: Boleto._schema + (campo, ...)
+    _schema = (
+        validation.IntegerField('num_sequencial', min_value=1),
+        validation.IntegerField('quantidade', min_value=0),
+        validation.DateField('vencimento'),
+        validation.DateField('data_documento', required=False),
+        validation.DateField('data_processamento', required=False),
+        validation.DecimalField('valor_unitario'),
+        validation.DecimalField('valor_documento'),
+        validation.DecimalField('valor_desconto'),
+        validation.DecimalField('valor_outras_deducoes'),
+        validation.DecimalField('valor_multa'),
+        validation.DecimalField('valor_outros_acrescimos'),
+        validation.DecimalField('valor_cobrado'),
+        validation.StringField('numero_documento'),
+        validation.StringField('especie_documento'),
+        validation.StringField('aceite'),
+        validation.StringField('especie'),
+        validation.StringField('sacado'),
+        validation.StringField('cpf_cei_cnpj'),
+        validation.StringField('sacador_avalista'),
+        validation.StringField('local_pagamento'),
+        validation.StringField('cedente'),
+        validation.StringField('agencia'),
+        validation.StringField('conta_corrente'),
+        validation.StringField('carteira'),
+        validation.StringField('contrato'),
+        validation.ListField('instrucoes'),
+        validation.ListField('informacoes'),
+        validation.ListField('sacado_extra'),
+    )
 
     def __init__(self, **kwargs):
         '''
         Inicializa os atributos, se os informados em `kwargs` existirem
         '''
+        for name in self._list_fields:
+            setattr(self, name, [])
 
+        # as propriedades banco e template não podem ser alteradas no init
+        field_names = get_field_names(type(self))
         for k, v in kwargs.items():
-            # as propriedades banco e template não podem ser alteradas no init
-            if not k in ('banco', 'template') and hasattr(self, k):
+            if k in field_names:
                 setattr(self, k, v)
 
+    @classmethod
+    def from_trusted(cls, **kwargs):
+        '''
+        Cria o boleto com valores que já estão nos tipos corretos (ex: obtidos
+        do banco de dados), sem aplicar as conversões de `_field_coercers`.
+        Campos inexistentes são ignorados, assim como no __init__
+        '''
+        boleto = cls.__new__(cls)
+        data = boleto.__dict__
+
+        for name in cls._list_fields:
+            data[name] = []
+
+        field_names = get_field_names(cls)
+        if field_names.issuperset(kwargs):
+            data.update(kwargs)
+        else:
+            data.update((k, v) for k, v in kwargs.items() if k in field_names)
+
+        return boleto
+
+    @classmethod
+    def from_row(cls, columns, row):
+        '''
+        Cria o boleto a partir de uma linha (sequência de valores já nos
+        tipos corretos) e do nome das suas colunas, ver `from_trusted`
+        '''
+        return cls.from_trusted(**dict(zip(columns, row)))
+
     def __setattr__(self, name, value):
         '''
         Transforma os valores de acordo com os tipos
         '''
-        if name in ('valor_unitario', 'valor_documento', 'valor_desconto',
-                    'valor_outras_deducoes', 'valor_multa', 'valor_outros_acrescimos',
-                    'valor_cobrado'):
-            value = Decimal(value)
+        coerce = self._field_coercers.get(name)
+        if coerce is not None:
+            value = coerce(value)
 
-        elif name in ('vencimento', 'data_documento', 'data_processamento'):
-            if isinstance(value, six.string_types):
-                value = iso8601.parse_date(value).date()
+        super(Boleto, self).__setattr__(name, value)
 
-        elif name in ('quantidade', 'num_sequencial'):
-            try:
-                value = int(value)
-            except:
-                value = 0
-                
-        elif name in ('numero_documento', 'especie_documento', 'aceite', 'especie', 'sacado',
-                      'cpf_cei_cnpj', 'sacador_avalista', 'local_pagamento', 
-                      'cedente', 'agencia', 'conta_corrente', 'carteira', 'contrato'):
-            value = "{0}".format(value)
+        # descarta os valores calculados a partir do atributo alterado
+        cached = get_cached_dependencies(type(self)).get(name)
+        if cached:
+            for cached_name in cached:
+                self.__dict__.pop(cached_name, None)
+
+    def to_record(self):
+        '''
+        Retorna a representação compacta do boleto (ver `python_boleto.record`)
+        :rtype: BoletoRecord
+        '''
+        return self._record_class.from_boleto(self)
 
-        return super(Boleto, self).__setattr__(name, value)
+    @classmethod
+    def from_record(cls, record):
+        ''' Cria o boleto a partir da sua representação compacta '''
+        return record.to_boleto(cls)
 
     @property
     def nosso_numero(self):
@@ -124,16 +301,24 @@ class Boleto(object):
         ''' Calcula e retorna o código de barras do boleto '''
         raise NotImplementedError()
 
-    def export_html(self, include_recibo_sacado=True, static_url=None):
-        ''' Gera e retorna o boleto em HTML '''
-        env = Environment(loader=PackageLoader('python_boleto', 'templates'))
-        env.filters['index_or_blank'] = filters.index_or_blank
-        env.filters['format_currency_or_blank'] = filters.format_currency_or_blank
-        env.filters['format_date_or_blank'] = filters.format_date_or_blank
-        env.filters['format_agencia_conta'] = filters.format_agencia_conta
-        template = env.get_template(self._template)
+    @classmethod
+    def parse_campo_livre(cls, campo_livre):
+        '''
+        Obtém os campos do campo livre (posições 20 a 44) do código de barras,
+        específicos de cada banco (ver `python_boleto.parser`)
+        :rtype: dict
+        '''
+        raise NotImplementedError()
 
-        context_data = self.get_context_data() or {}
+    def get_render_context(self, include_recibo_sacado=True, static_url=None, barcode='svg'):
+        '''
+        Retorna o contexto utilizado no render dos templates do boleto
+        :param: barcode 'svg' ou 'png' para gerar o código de barras no servidor,
+                'js' para gerá-lo no navegador com o JsBarcode
+        :rtype: dict
+        '''
+        with instrumentation.timer('context'):
+            context_data = self.get_context_data() or {}
 
         # Monta a URL do logo do banco
         logo_url = self._logo
@@ -141,118 +326,135 @@ class Boleto(object):
             logo_url = urljoin(static_url, self._logo)
         context_data['logo_url'] = logo_url
 
-        # gera o barse64 do logo, se possível
+        # obtém o barse64 do logo, se possível
         try:
-            logo_img_file = os.path.join(STATIC_DIR, self._logo)
-            if os.path.exists(logo_img_file):
-                img = open(logo_img_file, "rb")
-                context_data['logo_base64'] = base64.b64encode(img.read()).decode('utf-8')
+            with instrumentation.timer('assets'):
+                logo_base64 = asset_cache.get_base64(self._logo)
+            if logo_base64:
+                context_data['logo_base64'] = logo_base64
         except:
             logger.exception("Erro ao converter logo em Base64")
 
-        return template.render(boleto=self,
-                               include_recibo_sacado=include_recibo_sacado,
-                               **context_data)
-
-    def validate(self):
+        # gera o código de barras, quando não for gerado pelo JsBarcode
+        if barcode != 'js':
+            try:
+                with instrumentation.timer('barcode'):
+                    context_data['barcode_html'] = render_barcode(self.codigo_barras, barcode)
+            except NotImplementedError:
+                pass
+            except ValueError:
+                # código de barras com caracteres inválidos: gerado pelo JsBarcode, como nas versões anteriores
+                logger.warning("Código de barras inválido para o ITF: %s", self.codigo_barras)
+                barcode = 'js'
+
+        context_data['barcode'] = barcode
+        context_data['boleto'] = self
+        context_data['include_recibo_sacado'] = include_recibo_sacado
+        return context_data
+
+    def get_self_contained_context(self, include_recibo_sacado=True, barcode='svg'):
         '''
-        Valida os dados do boleto, lançando excessões o erro.
+        Retorna o contexto do documento independente (self_contained.jinja):
+        o HTML do boleto, apenas os estilos utilizados, minificados, e o logo,
+        incluído uma única vez. O documento não depende de nenhum arquivo externo
+        :rtype: dict
         '''
+        if barcode == 'js':
+            raise ValueError("documentos independentes não suportam barcode='js'")
+        if not self._template_boleto:
+            raise NotImplementedError("{0} não suporta documentos independentes".format(type(self).__name__))
+
+        context = self.get_render_context(include_recibo_sacado, None, barcode)
+
+        with instrumentation.timer('assets'):
+            logo = logo_symbol(self._logo) if self._logo else None
+        if logo:
+            context['logo'] = logo
+            context.pop('logo_base64', None)
+
+        # remove a indentação dos templates
+        with instrumentation.timer('template'):
+            template = environment.get_template(self._template_boleto)
+        with instrumentation.timer('render'):
+            html = _INDENT.sub('\n', template.render(**context))
+
+        styles = [SELF_CONTAINED_STYLES]
+        if self._template_styles:
+            styles.append(self._template_styles)
+
+        with instrumentation.timer('css'):
+            stylesheet = css.prune(get_stylesheet(styles), html)
+
+        return {
+            'html': html,
+            'logo': logo,
+            'css': stylesheet,
+        }
+
+    def _get_template_and_context(self, include_recibo_sacado, static_url, barcode, self_contained):
+        with instrumentation.timer('template'):
+            template = environment.get_template('self_contained.jinja' if self_contained else self._template)
+
+        if self_contained:
+            return template, self.get_self_contained_context(include_recibo_sacado, barcode)
+        return template, self.get_render_context(include_recibo_sacado, static_url, barcode)
+
+    def export_html(self, include_recibo_sacado=True, static_url=None, barcode='svg', self_contained=False,
+                    instrument=None):
+        '''
+        Gera e retorna o boleto em HTML. Com `self_contained`, o documento
+        não carrega nenhum script, estilo ou imagem externa
+        :param: instrument callable(etapa, segundos) que recebe o tempo de cada
+                etapa do render (ver `python_boleto.instrumentation`)
+        '''
+        with instrumentation.instrument(instrument), instrumentation.timer('total'):
+            template, context = self._get_template_and_context(include_recibo_sacado, static_url, barcode,
+                                                               self_contained)
+            with instrumentation.timer('render'):
+                return template.render(**context)
 
-        # inteiros
-        if not isinstance(self.num_sequencial, six.integer_types):
-            raise TypeError("num_sequencial deve ser um inteiro")
-        elif self.num_sequencial <= 0:
-            raise ValueError("num_sequencial deve maior que zero")
-
-        elif not isinstance(self.quantidade, six.integer_types):
-            raise TypeError("quantidade deve ser um inteiro")
-        elif self.quantidade < 0:
-            raise ValueError("quantidade deve maior ou igual a zero")
-
-        # datas
-        elif not isinstance(self.vencimento, datetime.date):
-            raise TypeError("vencimento deve ser do tipo data")
-
-        elif not self.data_documento is None and not isinstance(self.data_documento, datetime.date):
-            raise TypeError("data_documento deve ser do tipo data")
-
-        elif not self.data_processamento is None and not isinstance(self.data_processamento, datetime.date):
-            raise TypeError("data_processamento deve ser do tipo data")
-
-
-        # decimais
-        elif not isinstance(self.valor_unitario, Decimal):
-            raise TypeError("valor_unitario deve ser do tipo Decimal")
-
-        elif not isinstance(self.valor_documento, Decimal):
-            raise TypeError("valor_documento deve ser do tipo Decimal")
-
-        elif not isinstance(self.valor_desconto, Decimal):
-            raise TypeError("valor_desconto deve ser do tipo Decimal")
-
-        elif not isinstance(self.valor_outras_deducoes, Decimal):
-            raise TypeError("valor_outras_deducoes deve ser do tipo Decimal")
-
-        elif not isinstance(self.valor_multa, Decimal):
-            raise TypeError("valor_multa deve ser do tipo Decimal")
-
-        elif not isinstance(self.valor_outros_acrescimos, Decimal):
-            raise TypeError("valor_outros_acrescimos deve ser do tipo Decimal")
-
-        elif not isinstance(self.valor_cobrado, Decimal):
-            raise TypeError("valor_cobrado deve ser do tipo Decimal")
-
-        # strings
-        elif not isinstance(self.numero_documento, six.string_types):
-            raise TypeError("numero_documento deve ser uma string")
-
-        elif not isinstance(self.especie_documento, six.string_types):
-            raise TypeError("especie_documento deve ser uma string")
-
-        elif not isinstance(self.aceite, six.string_types):
-            raise TypeError("aceite deve ser uma string")
-
-        elif not isinstance(self.especie, six.string_types):
-            raise TypeError("especie deve ser uma string")
-
-        elif not isinstance(self.sacado, six.string_types):
-            raise TypeError("sacado deve ser uma string")
-
-        elif not isinstance(self.cpf_cei_cnpj, six.string_types):
-            raise TypeError("cpf_cei_cnpj deve ser uma string")
-
-        elif not isinstance(self.sacador_avalista, six.string_types):
-            raise TypeError("sacador_avalista deve ser uma string")
-
-        elif not isinstance(self.local_pagamento, six.string_types):
-            raise TypeError("local_pagamento deve ser uma string")
-
-        elif not isinstance(self.cedente, six.string_types):
-            raise TypeError("cedente deve ser uma string")
-
-        elif not isinstance(self.agencia, six.string_types):
-            raise TypeError("agencia deve ser uma string")
-
-        elif not isinstance(self.conta_corrente, six.string_types):
-            raise TypeError("conta_corrente deve ser uma string")
-
-        elif not isinstance(self.carteira, six.string_types):
-            raise TypeError("carteira deve ser uma string")
-
-        elif not isinstance(self.contrato, six.string_types):
-            raise TypeError("contrato deve ser uma string")
+    def export_html_async(self, executor=None, **kwargs):
+        '''
+        Versão assíncrona de `export_html` (Python 3.6+): o render é executado
+        em um executor, sem bloquear o event loop (ver `python_boleto.aio`)
+        :rtype: awaitable (string)
+        '''
+        # importado sob demanda, o módulo utiliza a sintaxe async do Python 3
+        from . import aio
+        return aio.export_html(self, executor, **kwargs)
 
-        # listas
-        elif self.instrucoes and not isinstance(self.instrucoes, list):
-            raise TypeError("instrucoes deve ser do tipo list")
+    def stream_html(self, include_recibo_sacado=True, static_url=None, barcode='svg', self_contained=False):
+        '''
+        Gera o boleto em HTML em partes, sem montar todo o documento em memória
+        (ver `python_boleto.render.write_html`)
+        :rtype: generator
+        '''
+        template, context = self._get_template_and_context(include_recibo_sacado, static_url, barcode,
+                                                           self_contained)
+        return template.generate(**context)
 
-        elif self.informacoes and not isinstance(self.informacoes, list):
-            raise TypeError("informacoes deve ser do tipo list")
+    def export_pdf(self, include_recibo_sacado=True):
+        '''
+        Gera e retorna o boleto em PDF, sem depender de um navegador
+        (ver `python_boleto.pdf.write_pdf` para vários boletos)
+        :rtype: bytes
+        '''
+        # importado sob demanda, não é necessário para os demais usos do boleto
+        from . import pdf
+        return pdf.render_pdf([self], include_recibo_sacado)
 
-        elif self.sacado_extra and not isinstance(self.sacado_extra, list):
-            raise TypeError("sacado_extra deve ser do tipo list")
+    def validate(self):
+        '''
+        Valida os dados do boleto, lançando excessões o erro.
+        '''
+        validation.validate(self)
 
+    def get_errors(self):
+        '''
+        Valida os dados do boleto, retornando todos os erros encontrados
+        :rtype: list
+        '''
+        return validation.get_errors(self)
 
     def get_context_data(self):
         '''
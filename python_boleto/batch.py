@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+# This file is part of Python Boleto.
+#
+# Copyright (c) 2016, Rockho Team. All rights reserved.
+# Author: Christian Hess
+#
+# This source code is licensed under the AGPLv3 license found in the
+# LICENSE file in the root directory of this source tree.
+from __future__ import unicode_literals
+
+import datetime
+
+import six
+
+from python_boleto import fields
+from python_boleto.base import Boleto
+from python_boleto.utils import get_numpy
+
+
+def _is_scalar(values):
+    return isinstance(values, six.string_types) or not hasattr(values, '__len__')
+
+
+def to_date(value):
+    value = fields.to_date(value)
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    return value
+
+
+class BoletoBatch(object):
+    '''
+    Lote de boletos armazenado em colunas (listas ou arrays paralelos),
+    permitindo calcular os identificadores de todos os boletos de uma só vez,
+    sem instanciar um `Boleto` por linha.
+
+    Colunas informadas como um valor único (ex: `convenio='010120'`) são
+    repetidas para todas as linhas. Colunas não informadas utilizam o
+    valor padrão do boleto.
+    '''
+    _boleto_class = Boleto
+    _columns = {
+        'valor_documento': fields.to_decimal,
+        'vencimento': to_date,
+        'num_sequencial': fields.to_int,
+        'conta_corrente': fields.to_string,
+        'carteira': fields.to_string,
+    }
+
+    def __init__(self, **columns):
+        size = None
+        for name, values in columns.items():
+            if name not in self._columns:
+                raise ValueError("{0} não é uma coluna do lote".format(name))
+
+            if not _is_scalar(values):
+                if size is not None and len(values) != size:
+                    raise ValueError("as colunas do lote devem possuir o mesmo tamanho")
+                size = len(values)
+
+        self._size = size or 0
+        self._coerced = {}
+        self.columns = {}
+
+        for name, coerce in self._columns.items():
+            values = columns.get(name, getattr(self._boleto_class, name))
+            if _is_scalar(values):
+                # valores únicos são convertidos uma só vez
+                values = self._coerced[name] = [coerce(values)] * self._size
+            self.columns[name] = values
+
+    def __len__(self):
+        return self._size
+
+    def column(self, name):
+        '''
+        Retorna a coluna `name` convertida para os tipos utilizados no boleto
+        :rtype: list
+        '''
+        if name in self._coerced:
+            return self._coerced[name]
+
+        values = self.columns[name]
+
+        numpy = get_numpy()
+        if numpy is not None and isinstance(values, numpy.ndarray):
+            if values.dtype.kind == 'M':
+                values = values.astype('datetime64[D]')
+            values = values.tolist()
+
+        coerce = self._columns[name]
+        values = self._coerced[name] = [coerce(value) for value in values]
+        return values
+
+    @classmethod
+    def from_boletos(cls, boletos):
+        ''' Cria o lote a partir de instâncias de boletos '''
+        boletos = list(boletos)
+        return cls(**dict((name, [getattr(boleto, name) for boleto in boletos]) for name in cls._columns))
+
+    def to_boletos(self, **kwargs):
+        '''
+        Gera uma instância de boleto para cada linha do lote.
+        Os campos em `kwargs` são utilizados em todos os boletos.
+        '''
+        names = list(self._columns)
+        for row in zip(*[self.column(name) for name in names]):
+            # as colunas já estão convertidas, os demais campos não
+            boleto = self._boleto_class.from_row(names, row)
+            for name, value in kwargs.items():
+                setattr(boleto, name, value)
+            yield boleto
+
+    @property
+    def nosso_numero(self):
+        ''' Calcula e retorna o nosso número de cada boleto '''
+        raise NotImplementedError()
+
+    @property
+    def fator_vencimento(self):
+        ''' Calcula e retorna o fator de vencimento de cada boleto '''
+        raise NotImplementedError()
+
+    @property
+    def linha_digitavel(self):
+        ''' Calcula e retorna a linha digitável de cada boleto '''
+        raise NotImplementedError()
+
+    @property
+    def codigo_barras(self):
+        ''' Calcula e retorna o código de barras de cada boleto '''
+        raise NotImplementedError()
@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+# This file is part of Python Boleto.
+#
+# Copyright (c) 2016, Rockho Team. All rights reserved.
+# Author: Christian Hess
+#
+# This source code is licensed under the AGPLv3 license found in the
+# LICENSE file in the root directory of this source tree.
+'''
+Geração de boletos em lote, distribuída entre vários processos.
+
+Os registros são lidos de um arquivo CSV ou JSON Lines, validados e
+exportados para HTML (um arquivo por boleto). Os registros com erro são
+escritos em um relatório CSV com a linha, o tipo e a mensagem do erro.
+
+Uso:
+    python -m python_boleto.bulk boletos.csv -o saida/ --workers 8
+'''
+from __future__ import unicode_literals
+
+import argparse
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import csv
+from decimal import Decimal
+import importlib
+import io
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+
+import six
+
+from . import environment
+from .render import write_html
+
+# campos do tipo lista, informados no CSV separados por LIST_SEPARATOR
+LIST_FIELDS = ('instrucoes', 'sacado_extra', 'informacoes')
+LIST_SEPARATOR = '|'
+
+DEFAULT_BOLETO_CLASS = 'python_boleto.cecred.CecredBoleto'
+DEFAULT_FILENAME = '{boleto.nosso_numero}.html'
+DEFAULT_CHUNKSIZE = 100
+ERRORS_FILENAME = 'errors.csv'
+
+BulkResult = namedtuple('BulkResult', ['total', 'generated', 'errors'])
+
+
+def load_boleto_class(path):
+    '''
+    Importa a classe de boleto a partir do caminho completo,
+    ex: python_boleto.cecred.CecredBoleto
+    '''
+    module_name, _, class_name = path.rpartition('.')
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+if six.PY2:
+    # o módulo csv do Python 2 trabalha apenas com bytes
+    def _csv_reader(fp):
+        return csv.DictReader(line.encode('utf-8') for line in fp)
+
+    def _csv_text(value):
+        return value.decode('utf-8')
+
+    def _csv_row(values):
+        return [six.text_type(value).encode('utf-8') for value in values]
+
+    def _open_csv(path):
+        return io.open(path, 'wb')
+else:
+    _csv_reader = csv.DictReader
+
+    def _csv_text(value):
+        return value
+
+    def _csv_row(values):
+        return values
+
+    def _open_csv(path):
+        return io.open(path, 'w', encoding='utf-8', newline='')
+
+
+def _read_csv(fp):
+    reader = _csv_reader(fp)
+    for row in reader:
+        # campos em branco utilizam o valor padrão do boleto
+        record = dict((_csv_text(k), _csv_text(v)) for k, v in row.items() if k and v not in (None, ''))
+        for field in LIST_FIELDS:
+            if field in record:
+                record[field] = record[field].split(LIST_SEPARATOR)
+        yield reader.line_num, record
+
+
+def _read_jsonl(fp):
+    for line, data in enumerate(fp, 1):
+        if not data.strip():
+            continue
+
+        try:
+            # valores como Decimal: um float (ex: 12.34) não é representado exatamente
+            yield line, json.loads(data, parse_float=Decimal)
+        except ValueError as e:
+            yield line, e
+
+
+def read_records(fp, format='csv'):
+    '''
+    Lê os registros de boletos de um arquivo CSV (com cabeçalho) ou JSON Lines.
+    Retorna tuplas (linha, registro); registros que não puderam ser
+    lidos são retornados como a exceção ocorrida.
+    :rtype: generator
+    '''
+    if format == 'csv':
+        return _read_csv(fp)
+    elif format == 'jsonl':
+        return _read_jsonl(fp)
+    raise ValueError("formato inválido: {0}".format(format))
+
+
+def _render_chunk(boleto_class, chunk, output_dir, filename, include_recibo_sacado, self_contained=False):
+    '''
+    Valida e exporta os registros de `chunk`, executado nos processos filhos.
+    Retorna uma lista de tuplas (linha, arquivo gerado, erro)
+    '''
+    results = []
+    for line, record in chunk:
+        try:
+            if isinstance(record, Exception):
+                raise record
+
+            boleto = boleto_class(**record)
+
+            # reporta todos os erros de validação do registro de uma só vez
+            errors = boleto.get_errors()
+            if errors:
+                message = "; ".join("{0}".format(e) for e in errors)
+                results.append((line, None, (type(errors[0]).__name__, message)))
+                continue
+
+            path = os.path.join(output_dir, filename.format(boleto=boleto, line=line))
+            with io.open(path, 'w', encoding='utf-8') as fp:
+                write_html(boleto, fp, include_recibo_sacado=include_recibo_sacado, self_contained=self_contained)
+
+            results.append((line, path, None))
+        except Exception as e:
+            results.append((line, None, (type(e).__name__, "{0}".format(e))))
+    return results
+
+
+def generate(records, output_dir, boleto_class=None, workers=None, chunksize=DEFAULT_CHUNKSIZE,
+             errors_path=None, filename=DEFAULT_FILENAME, include_recibo_sacado=True, self_contained=False):
+    '''
+    Gera os boletos de `records` (tuplas (linha, registro), ver `read_records`)
+    em `output_dir`, distribuindo blocos de `chunksize` registros entre
+    `workers` processos. Com `workers=1` os boletos são gerados no processo atual.
+    Os erros são escritos em `errors_path` (por padrão errors.csv em `output_dir`).
+    Com `self_contained`, os boletos não dependem de nenhum arquivo externo.
+    :rtype: BulkResult
+    '''
+    boleto_class = boleto_class or load_boleto_class(DEFAULT_BOLETO_CLASS)
+    workers = workers or multiprocessing.cpu_count()
+    errors_path = errors_path or os.path.join(output_dir, ERRORS_FILENAME)
+
+    if chunksize < 1:
+        raise ValueError("chunksize deve ser maior que zero")
+
+    if not os.path.isdir(output_dir):
+        os.makedirs(output_dir)
+
+    records = iter(records)
+    chunks = iter(lambda: list(itertools.islice(records, chunksize)), [])
+    args = (output_dir, filename, include_recibo_sacado, self_contained)
+
+    if workers == 1:
+        results = (_render_chunk(boleto_class, chunk, *args) for chunk in chunks)
+        return _collect(results, errors_path)
+
+    # os processos filhos (fork) herdam os templates já carregados
+    environment.preload()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # mantém um número limitado de blocos em processamento, preservando a ordem
+        pending = deque()
+
+        def results():
+            for chunk in chunks:
+                pending.append(executor.submit(_render_chunk, boleto_class, chunk, *args))
+                if len(pending) >= workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+        return _collect(results(), errors_path)
+
+
+def _collect(results, errors_path):
+    ''' Contabiliza os resultados e escreve o relatório de erros '''
+    total = generated = errors = 0
+
+    with _open_csv(errors_path) as fp:
+        writer = csv.writer(fp)
+        writer.writerow(_csv_row(['linha', 'erro', 'mensagem']))
+
+        for chunk_results in results:
+            for line, path, error in chunk_results:
+                total += 1
+                if error is None:
+                    generated += 1
+                else:
+                    errors += 1
+                    writer.writerow(_csv_row([line, error[0], error[1]]))
+
+    return BulkResult(total, generated, errors)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m python_boleto.bulk',
+                                     description='Gera boletos em HTML a partir de um arquivo CSV ou JSON Lines')
+    parser.add_argument('input', help='arquivo com os registros dos boletos (.csv ou .jsonl)')
+    parser.add_argument('-o', '--output-dir', required=True, help='diretório onde os boletos serão gerados')
+    parser.add_argument('-f', '--format', choices=('csv', 'jsonl'),
+                        help='formato do arquivo de entrada (padrão: obtido pela extensão)')
+    parser.add_argument('-c', '--boleto-class', default=DEFAULT_BOLETO_CLASS,
+                        help='classe de boleto (padrão: %(default)s)')
+    parser.add_argument('-w', '--workers', type=int, help='quantidade de processos (padrão: número de CPUs)')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE,
+                        help='registros enviados a cada processo por vez (padrão: %(default)s)')
+    parser.add_argument('--filename', default=DEFAULT_FILENAME,
+                        help='nome dos arquivos gerados (padrão: %(default)s)')
+    parser.add_argument('--errors', help='relatório de erros (padrão: errors.csv no diretório de saída)')
+    parser.add_argument('--no-recibo-sacado', action='store_true', help='não inclui o recibo do pagador')
+    parser.add_argument('--self-contained', action='store_true',
+                        help='gera documentos sem scripts, estilos ou imagens externas')
+    args = parser.parse_args(argv)
+
+    format = args.format
+    if not format:
+        format = 'csv' if args.input.lower().endswith('.csv') else 'jsonl'
+
+    with io.open(args.input, encoding='utf-8', newline='') as fp:
+        result = generate(read_records(fp, format), args.output_dir,
+                          boleto_class=load_boleto_class(args.boleto_class),
+                          workers=args.workers,
+                          chunksize=args.chunksize,
+                          errors_path=args.errors,
+                          filename=args.filename,
+                          include_recibo_sacado=not args.no_recibo_sacado,
+                          self_contained=args.self_contained)
+
+    sys.stderr.write("{0} registros, {1} boletos gerados, {2} erros\n".format(*result))
+    return 1 if result.errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
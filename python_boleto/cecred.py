@@ -11,20 +11,125 @@ from __future__ import unicode_literals
 from datetime import date
 from decimal import Decimal
 
+from python_boleto import fields, validation
 from python_boleto.base import Boleto
-from python_boleto.utils import modulo10, modulo11
-import six
+from python_boleto.batch import BoletoBatch
+from python_boleto.parser import DATA_BASE_FATOR, DATA_BASE_NOVO_FATOR, DATA_LIMITE_FATOR
+from python_boleto.record import BoletoRecord
+from python_boleto.utils import cached_property, get_numpy, modulo10, modulo10_many, modulo11, modulo11_many
+
+# campos utilizados na composição do código de barras e da linha digitável
+_CAMPOS_CODIGO_BARRAS = ('_banco', 'vencimento', 'valor_documento', 'convenio',
+                         'conta_corrente', 'num_sequencial', 'carteira')
+
+
+def _formata_conta_nosso_numero(conta_corrente):
+    return "{:0>8}".format("".join([d for d in conta_corrente if d.isdigit()])[:8])
+
+
+def _somente_digitos_conta(conta_corrente):
+    ''' A conta corrente pode ser informada com pontuação (ex: 0357157-2), ignorada no código de barras '''
+    return "".join([d for d in "{0}".format(conta_corrente) if d in '0123456789'])
+
+
+def _formata_campo(value, size):
+    ''' Completa `value` com zeros à esquerda, mantendo apenas os últimos `size` caracteres '''
+    return "{0:0>{1}}".format(value, size)[-size:]
+
+
+def calcula_nosso_numero(conta_corrente, num_sequencial):
+    ''' Calcula o nosso número (ver `CecredBoleto.nosso_numero`) '''
+    conta = _formata_conta_nosso_numero(conta_corrente)
+    numero = "{:0>9}".format(num_sequencial)
+    return conta + numero
+
+
+def calcula_fator_vencimento(vencimento):
+    ''' Calcula o fator de vencimento (ver `CecredBoleto.fator_vencimento`) '''
+    fator = 0
+
+    if vencimento <= DATA_LIMITE_FATOR:
+        fator = (vencimento - DATA_BASE_FATOR).days
+    else:
+        fator = (vencimento - DATA_BASE_NOVO_FATOR).days + 1000
+
+    # deixa no intervalo (0, 9999)
+    return max(0, min(fator, 9999))
+
+
+# campos do código de barras após o DV e seus tamanhos
+CAMPOS_CODIGO_BARRAS = (('fator_vencimento', 4), ('valor', 10), ('convenio', 6),
+                        ('conta_corrente', 8), ('num_sequencial', 9), ('carteira', 2))
+
+
+def _posicoes(campos):
+    ''' Retorna as posições (nome, início, fim) de campos consecutivos '''
+    posicoes = []
+    inicio = 0
+    for name, size in campos:
+        posicoes.append((name, inicio, inicio + size))
+        inicio += size
+    return tuple(posicoes)
+
+
+# posições dos campos do campo livre: os campos após o valor
+_POSICOES_CAMPO_LIVRE = _posicoes(CAMPOS_CODIGO_BARRAS[2:])
+
+
+def formata_banco_moeda(banco):
+    ''' Formata os campos do código de barras anteriores ao DV: banco e moeda '''
+    return "{:0>3}".format(banco) + '9'
+
+
+def formata_codigo_barras(banco, fator_vencimento, valor, convenio, conta_corrente, num_sequencial, carteira):
+    '''
+    Formata os campos do código de barras, sem o DV
+    :param: valor valor do documento em centavos
+    :rtype: tuple (banco e moeda, demais campos)
+    '''
+    valores = (fator_vencimento, valor, convenio, _somente_digitos_conta(conta_corrente), num_sequencial, carteira)
+    campos = [_formata_campo(value, size) for value, (_, size) in zip(valores, CAMPOS_CODIGO_BARRAS)]
+    return formata_banco_moeda(banco), "".join(campos)
+
+
+def campos_linha_digitavel(codigo_barras):
+    '''
+    Retorna os 3 primeiros campos da linha digitável, sem os DACs.
+    A linha digitável utiliza os mesmos campos do código de barras,
+    reordenados: banco, moeda, campo livre, fator de vencimento e valor
+    '''
+    linha_total = codigo_barras[:4] + codigo_barras[19:]
+    return linha_total[:9], linha_total[9:19], linha_total[19:29]
+
+
+def formata_linha_digitavel(codigo_barras, campos, dacs):
+    ''' Formata a linha digitável a partir dos campos e seus DACs calculados com modulo10 '''
+    campo1, campo2, campo3 = ["{0}.{1}{2}".format(campo[:5], campo[5:], dac) for campo, dac in zip(campos, dacs)]
+    campo4 = codigo_barras[4]
+    campo5 = codigo_barras[5:19]
+
+    return "{0} {1} {2} {3} {4}".format(campo1, campo2, campo3, campo4, campo5)
+
+
+class CecredBoletoRecord(BoletoRecord):
+    __slots__ = ('convenio',)
 
 
 class CecredBoleto(Boleto):
     _banco = '085'
+    _banco_dv = '1'
     _template = 'cecred.jinja'
+    _template_boleto = 'cecred_boleto.jinja'
+    _template_styles = 'cecred_styles.jinja'
     _logo = 'cecred.jpg'
+    _record_class = CecredBoletoRecord
+    _field_coercers = dict(Boleto._field_coercers, convenio=fields.to_string_or_blank)
+    _schema = Boleto._schema + (validation.RequiredStringField('convenio'),)
 
     # numero do convenio
     convenio = ''
 
-    @property
+    @cached_property('conta_corrente', 'num_sequencial')
     def nosso_numero(self):
         '''
         É composto por 17 dígitos incluindo o dígito verificador
@@ -36,11 +141,9 @@ class CecredBoleto(Boleto):
             - 8 primeiros dígitos: Conta corrente + dv do cooperado (Sempre será fixo)
             - 9 dígitos restantes: Número do boleto (Sequencial)
         '''
-        conta = "{:0>8}".format("".join([d for d in self.conta_corrente if d.isdigit()])[:8])
-        numero = "{:0>9}".format(self.num_sequencial)
-        return conta + numero
+        return calcula_nosso_numero(self.conta_corrente, self.num_sequencial)
 
-    @property
+    @cached_property('vencimento')
     def fator_vencimento(self):
         '''
         - Para vencimento até 21/02/2025 deverá ser utilizada a data base de 07.10.1997, calculando o
@@ -48,71 +151,110 @@ class CecredBoleto(Boleto):
         - A partir do dia 22/02/2025 deverá ser considerado a sequência de um novo fator com
         numeração 1000.
         '''
-        fator = 0
-
-        if self.vencimento <= date(2025, 2, 21):
-            fator = (self.vencimento - date(1997, 10, 7)).days
-        else:
-            fator = (self.vencimento - date(2025, 2, 22)).days + 1000
-
-        # deixa no intervalo (0, 9999)
-        return max(0, min(fator, 9999))
+        return calcula_fator_vencimento(self.vencimento)
 
-    @property
+    @cached_property(*_CAMPOS_CODIGO_BARRAS)
     def linha_digitavel(self):
-        linha_total_fmt = "{banco}{moeda}{convenio}{conta_corrente}"\
-                          "{num_sequencial}{carteira}{fator_vencto}{valor}"
-
-        valor = str(int(self.valor_documento * Decimal(100.0)))
-
-        linha_total = linha_total_fmt.format(**{'banco': "{:0>3}".format(self._banco)[-3:],
-                                                'moeda': '9',
-                                                'convenio': "{:0>6}".format(self.convenio)[-6:],
-                                                'conta_corrente': "{:0>8}".format(self.conta_corrente)[-8:],
-                                                'num_sequencial': "{:0>9}".format(self.num_sequencial)[-9:],
-                                                'carteira': "{:0>2}".format(self.carteira)[-2:],
-                                                'fator_vencto': "{:0>4}".format(self.fator_vencimento)[-4:],
-                                                'valor': "{:0>10}".format(valor)[-10:]})
-
-        campo1 = linha_total[:9]
-        campo2 = linha_total[9:19]
-        campo3 = linha_total[19:29]
-        campo4 = str(self.codigo_barras_dv)
-        campo5 = linha_total[-14:]
+        codigo_barras = self.codigo_barras
+        campos = campos_linha_digitavel(codigo_barras)
 
         # formata e calcula os DAC com modulo10
-        campo1 = "{0}.{1}{2}".format(campo1[:5], campo1[5:], modulo10(campo1))
-        campo2 = "{0}.{1}{2}".format(campo2[:5], campo2[5:], modulo10(campo2))
-        campo3 = "{0}.{1}{2}".format(campo3[:5], campo3[5:], modulo10(campo3))
-
-        return "{0} {1} {2} {3} {4}".format(campo1, campo2, campo3, campo4, campo5)
+        return formata_linha_digitavel(codigo_barras, campos, [modulo10(campo) for campo in campos])
 
     @property
     def codigo_barras_dv(self):
         return self.codigo_barras[4]
 
-    @property
-    def codigo_barras(self):
-        cod_bar_fmt1 = "{banco}{moeda}"
-        cod_bar_fmt2 = "{fator_vencto}{valor}{convenio}{conta_corrente}{num_sequencial}{carteira}"
-
-        valor = str(int(self.valor_documento * Decimal(100.0)))
+    @classmethod
+    def parse_campo_livre(cls, campo_livre):
+        ''' Obtém o convênio, a conta corrente, o número sequencial e a carteira do campo livre '''
+        campos = dict((name, campo_livre[inicio:fim]) for name, inicio, fim in _POSICOES_CAMPO_LIVRE)
+        campos['num_sequencial'] = int(campos['num_sequencial'])
+        return campos
 
-        cod_bar_part1 = cod_bar_fmt1.format(**{'banco':"{:0>3}".format(self._banco),
-                                               'moeda':'9'})
+    @cached_property(*_CAMPOS_CODIGO_BARRAS)
+    def codigo_barras(self):
+        valor = int(self.valor_documento * Decimal(100.0))
 
-        cod_bar_part2 = cod_bar_fmt2.format(**{'fator_vencto': "{:0>4}".format(self.fator_vencimento)[-4:],
-                                               'valor': "{:0>10}".format(valor)[-10:],
-                                               'convenio': "{:0>6}".format(self.convenio)[-6:],
-                                               'conta_corrente': "{:0>8}".format(self.conta_corrente)[-8:],
-                                               'num_sequencial': "{:0>9}".format(self.num_sequencial)[-9:],
-                                               'carteira': "{:0>2}".format(self.carteira)[-2:]})
+        cod_bar_part1, cod_bar_part2 = formata_codigo_barras(self._banco, self.fator_vencimento, valor,
+                                                             self.convenio, self.conta_corrente,
+                                                             self.num_sequencial, self.carteira)
 
         dv = modulo11("{0}{1}".format(cod_bar_part1, cod_bar_part2))
         return "{0}{1}{2}".format(cod_bar_part1, dv, cod_bar_part2)
 
-    def validate(self):
-        super(CecredBoleto, self).validate()
 
-        if not self.convenio or not isinstance(self.convenio, six.string_types):
-            raise ValueError("convenio deve obrigatoriamente informado")
+class CecredBoletoBatch(BoletoBatch):
+    '''
+    Lote de boletos Cecred. Calcula os identificadores de todas as linhas
+    de uma só vez, seguindo as mesmas regras de `CecredBoleto`.
+    '''
+    _boleto_class = CecredBoleto
+    _columns = dict(BoletoBatch._columns, convenio=fields.to_string_or_blank)
+
+    def _formata_coluna(self, values, formatter, *args):
+        ''' Formata os valores de uma coluna, formatando apenas uma vez os valores repetidos '''
+        formatados = {}
+        result = []
+        for value in values:
+            try:
+                result.append(formatados[value])
+            except KeyError:
+                result.append(formatados.setdefault(value, formatter(value, *args)))
+        return result
+
+    @cached_property()
+    def nosso_numero(self):
+        contas = self._formata_coluna(self.column('conta_corrente'), _formata_conta_nosso_numero)
+        numeros = ["{:0>9}".format(num_sequencial) for num_sequencial in self.column('num_sequencial')]
+        return [conta + numero for conta, numero in zip(contas, numeros)]
+
+    @cached_property()
+    def fator_vencimento(self):
+        numpy = get_numpy()
+        if numpy is None:
+            return [calcula_fator_vencimento(vencimento) for vencimento in self.column('vencimento')]
+
+        vencimentos = self.columns['vencimento']
+        if isinstance(vencimentos, numpy.ndarray) and vencimentos.dtype.kind == 'M':
+            epoch = date(1970, 1, 1).toordinal()
+            ordinais = vencimentos.astype('datetime64[D]').astype(numpy.int64) + epoch
+        else:
+            ordinais = numpy.array([vencimento.toordinal() for vencimento in self.column('vencimento')],
+                                   dtype=numpy.int64)
+
+        fatores = numpy.where(ordinais <= DATA_LIMITE_FATOR.toordinal(),
+                              ordinais - DATA_BASE_FATOR.toordinal(),
+                              ordinais - DATA_BASE_NOVO_FATOR.toordinal() + 1000)
+
+        # deixa no intervalo (0, 9999)
+        return numpy.clip(fatores, 0, 9999).tolist()
+
+    @cached_property()
+    def codigo_barras(self):
+        valores = {
+            'fator_vencimento': self.fator_vencimento,
+            'valor': [int(valor * Decimal(100.0)) for valor in self.column('valor_documento')],
+            'conta_corrente': self._formata_coluna(self.column('conta_corrente'), _somente_digitos_conta),
+        }
+
+        colunas = []
+        for name, size in CAMPOS_CODIGO_BARRAS:
+            values = valores[name] if name in valores else self.column(name)
+            colunas.append(self._formata_coluna(values, _formata_campo, size))
+
+        banco_moeda = formata_banco_moeda(self._boleto_class._banco)
+        campos = ["".join(campos) for campos in zip(*colunas)]
+
+        dvs = modulo11_many([banco_moeda + campo for campo in campos])
+        return ["{0}{1}{2}".format(banco_moeda, dv, campo) for campo, dv in zip(campos, dvs)]
+
+    @cached_property()
+    def linha_digitavel(self):
+        codigos = self.codigo_barras
+        campos = [campos_linha_digitavel(codigo_barras) for codigo_barras in codigos]
+
+        # calcula os DAC de cada um dos 3 campos de todas as linhas
+        dacs = zip(*[modulo10_many([c[i] for c in campos]) for i in range(3)])
+
+        return [formata_linha_digitavel(codigo_barras, c, d) for codigo_barras, c, d in zip(codigos, campos, dacs)]
@@ -0,0 +1,801 @@
+# -*- coding: utf-8 -*-
+# This file is part of Python Boleto.
+#
+# Copyright (c) 2016, Rockho Team. All rights reserved.
+# Author: Christian Hess
+#
+# This source code is licensed under the AGPLv3 license found in the
+# LICENSE file in the root directory of this source tree.
+'''
+Arquivos de remessa e de retorno CNAB 240 e CNAB 400.
+
+Os registros são montados a partir de layouts de tamanho fixo, compilados
+uma única vez (os campos constantes já formatados). Os boletos são escritos
+um a um, mantendo apenas os totais do arquivo: o consumo de memória não
+depende da quantidade de boletos.
+
+Os arquivos de retorno são mapeados em memória (mmap) e os registros são
+obtidos sob demanda, lendo apenas os campos utilizados de cada linha.
+`NossoNumeroIndex` relaciona os registros aos boletos emitidos.
+
+Os layouts seguem o padrão FEBRABAN (CNAB 240, versão 087) e o layout
+CNAB 400 de cobrança mais comum. Bancos com particularidades podem
+estender `Remessa240`/`Remessa400` e substituir os layouts.
+'''
+from __future__ import unicode_literals
+
+from collections import namedtuple
+import datetime
+import io
+import itertools
+import mmap
+import os
+import unicodedata
+
+import six
+
+from .record import from_cents, to_cents
+
+LINE_SEPARATOR = '\r\n'
+
+RemessaResult = namedtuple('RemessaResult', ['registros', 'titulos', 'valor_total'])
+
+RegistroRetorno = namedtuple('RegistroRetorno', ['linha', 'nosso_numero', 'movimento', 'numero_documento',
+                                                 'vencimento', 'valor_documento', 'valor_pago', 'valor_tarifa',
+                                                 'valor_juros', 'valor_desconto', 'valor_abatimento',
+                                                 'data_ocorrencia', 'data_credito'])
+
+
+def _format_num(value, size, name):
+    ''' Campo numérico: apenas algarismos, alinhado à direita e completado com zeros '''
+    if value is None or value == '':
+        return '0' * size
+
+    if isinstance(value, six.integer_types):
+        value = "{0}".format(value)
+    else:
+        value = "".join(d for d in "{0}".format(value) if d.isdigit())
+
+    if len(value) > size:
+        raise ValueError("o campo {0} excede {1} posições: {2}".format(name, size, value))
+    return value.rjust(size, '0')
+
+
+def _format_alfa(value, size, name):
+    ''' Campo alfanumérico: maiúsculas sem acentos, alinhado à esquerda e completado com brancos '''
+    if not value:
+        return ' ' * size
+
+    value = unicodedata.normalize('NFKD', "{0}".format(value)).encode('ascii', 'ignore').decode('ascii')
+    return value.upper()[:size].ljust(size)
+
+
+def _format_data(value, size, name):
+    ''' Data no formato DDMMAAAA (8 posições) ou DDMMAA (6 posições), zeros quando não informada '''
+    if value is None:
+        return '0' * size
+    return "{0:%d%m%Y}".format(value) if size == 8 else "{0:%d%m%y}".format(value)
+
+
+def _format_valor(value, size, name):
+    ''' Valor monetário em centavos '''
+    return _format_num(to_cents(value) if value else 0, size, name)
+
+
+_FORMATTERS = {
+    'num': _format_num,
+    'alfa': _format_alfa,
+    'data': _format_data,
+    'valor': _format_valor,
+}
+
+
+def _parse_data(value):
+    ''' Data no formato DDMMAAAA ou DDMMAA, None quando não informada '''
+    if not value.strip('0 '):
+        return None
+
+    ano = int(value[4:])
+    if len(value) == 6:
+        ano += 2000
+    return datetime.date(ano, int(value[2:4]), int(value[:2]))
+
+
+_PARSERS = {
+    'num': lambda value: int(value.strip() or 0),
+    'alfa': lambda value: value.strip(),
+    'data': _parse_data,
+    'valor': lambda value: from_cents(int(value.strip() or 0)),
+}
+
+
+class Layout(object):
+    '''
+    Layout de um registro de tamanho fixo. `campos` é uma sequência de
+    (início, fim, nome, tipo, padrão), com as posições iniciando em 1, assim
+    como nos manuais dos bancos. Campos sem nome são constantes (ex: brancos).
+    Tipos: 'num', 'alfa', 'data' (DDMMAAAA ou DDMMAA) e 'valor' (centavos)
+    '''
+
+    def __init__(self, tamanho, campos):
+        posicao = 1
+        compilados = []
+        leitura = []
+
+        for inicio, fim, name, tipo, padrao in campos:
+            if inicio != posicao or fim < inicio:
+                raise ValueError("posição inválida no layout: {0}-{1}".format(inicio, fim))
+            posicao = fim + 1
+
+            size = fim - inicio + 1
+            formatter = _FORMATTERS[tipo]
+            if name:
+                compilados.append((name, size, formatter, padrao))
+                leitura.append((name, inicio - 1, fim, _PARSERS[tipo]))
+            else:
+                compilados.append(formatter(padrao, size, None))
+
+        if posicao != tamanho + 1:
+            raise ValueError("o layout deve possuir {0} posições".format(tamanho))
+
+        # agrupa as constantes consecutivas
+        self._campos = []
+        for constante, grupo in itertools.groupby(compilados, lambda c: isinstance(c, six.string_types)):
+            if constante:
+                self._campos.append("".join(grupo))
+            else:
+                self._campos.extend(grupo)
+
+        self._leitura = {None: tuple(leitura)}
+        self.tamanho = tamanho
+
+    def format(self, values):
+        '''
+        Monta o registro com os valores informados
+        :rtype: string
+        '''
+        parts = []
+        for campo in self._campos:
+            if isinstance(campo, six.string_types):
+                parts.append(campo)
+            else:
+                name, size, formatter, padrao = campo
+                parts.append(formatter(values.get(name, padrao), size, name))
+        return "".join(parts)
+
+    def parse(self, buffer, offset=0, names=None):
+        '''
+        Lê os campos do registro iniciado em `offset`, apenas os campos em
+        `names` (tupla) quando informado. `buffer` pode ser uma string, bytes
+        ou um mmap: apenas os campos são copiados, não a linha toda
+        :rtype: dict
+        '''
+        leitura = self._leitura.get(names)
+        if leitura is None:
+            leitura = self._leitura[names] = tuple(c for c in self._leitura[None] if c[0] in names)
+
+        values = {}
+        for name, inicio, fim, parser in leitura:
+            value = buffer[offset + inicio:offset + fim]
+            if isinstance(value, six.binary_type):
+                value = value.decode('latin-1')
+            values[name] = parser(value)
+        return values
+
+
+def _separa_dv(value):
+    ''' Separa o número e o DV de agências e contas, o último algarismo é o DV '''
+    digits = "".join(d for d in "{0}".format(value or '') if d.isdigit())
+    return digits[:-1], digits[-1:]
+
+
+def _tipo_inscricao(inscricao):
+    ''' 1 para CPF, 2 para CNPJ e 0 quando não informado '''
+    digits = "".join(d for d in "{0}".format(inscricao or '') if d.isdigit())
+    return {11: 1, 14: 2}.get(len(digits), 0)
+
+
+CNAB240_HEADER_ARQUIVO = Layout(240, (
+    (1, 3, 'banco', 'num', 0),
+    (4, 7, None, 'num', 0),
+    (8, 8, None, 'num', 0),
+    (9, 17, None, 'alfa', ''),
+    (18, 18, 'tipo_inscricao_empresa', 'num', 0),
+    (19, 32, 'inscricao_empresa', 'num', 0),
+    (33, 52, 'convenio', 'alfa', ''),
+    (53, 57, 'agencia', 'num', 0),
+    (58, 58, 'agencia_dv', 'alfa', ''),
+    (59, 70, 'conta', 'num', 0),
+    (71, 71, 'conta_dv', 'alfa', ''),
+    (72, 72, None, 'alfa', ''),
+    (73, 102, 'nome_empresa', 'alfa', ''),
+    (103, 132, 'nome_banco', 'alfa', ''),
+    (133, 142, None, 'alfa', ''),
+    (143, 143, None, 'num', 1),
+    (144, 151, 'data_geracao', 'data', None),
+    (152, 157, 'hora_geracao', 'num', 0),
+    (158, 163, 'nsa', 'num', 1),
+    (164, 166, None, 'num', 87),
+    (167, 171, None, 'num', 0),
+    (172, 240, None, 'alfa', ''),
+))
+
+CNAB240_HEADER_LOTE = Layout(240, (
+    (1, 3, 'banco', 'num', 0),
+    (4, 7, 'lote', 'num', 1),
+    (8, 8, None, 'num', 1),
+    (9, 9, None, 'alfa', 'R'),
+    (10, 11, None, 'num', 1),
+    (12, 13, None, 'alfa', ''),
+    (14, 16, None, 'num', 45),
+    (17, 17, None, 'alfa', ''),
+    (18, 18, 'tipo_inscricao_empresa', 'num', 0),
+    (19, 33, 'inscricao_empresa', 'num', 0),
+    (34, 53, 'convenio', 'alfa', ''),
+    (54, 58, 'agencia', 'num', 0),
+    (59, 59, 'agencia_dv', 'alfa', ''),
+    (60, 71, 'conta', 'num', 0),
+    (72, 72, 'conta_dv', 'alfa', ''),
+    (73, 73, None, 'alfa', ''),
+    (74, 103, 'nome_empresa', 'alfa', ''),
+    (104, 183, None, 'alfa', ''),
+    (184, 191, 'nsa', 'num', 1),
+    (192, 199, 'data_geracao', 'data', None),
+    (200, 207, None, 'num', 0),
+    (208, 240, None, 'alfa', ''),
+))
+
+CNAB240_SEGMENTO_P = Layout(240, (
+    (1, 3, 'banco', 'num', 0),
+    (4, 7, 'lote', 'num', 1),
+    (8, 8, None, 'num', 3),
+    (9, 13, 'registro', 'num', 0),
+    (14, 14, None, 'alfa', 'P'),
+    (15, 15, None, 'alfa', ''),
+    (16, 17, 'movimento', 'num', 1),
+    (18, 22, 'agencia', 'num', 0),
+    (23, 23, 'agencia_dv', 'alfa', ''),
+    (24, 35, 'conta', 'num', 0),
+    (36, 36, 'conta_dv', 'alfa', ''),
+    (37, 37, None, 'alfa', ''),
+    (38, 57, 'nosso_numero', 'alfa', ''),
+    (58, 58, None, 'num', 1),
+    (59, 59, None, 'num', 1),
+    (60, 60, None, 'alfa', '1'),
+    (61, 61, None, 'num', 2),
+    (62, 62, None, 'alfa', '2'),
+    (63, 77, 'numero_documento', 'alfa', ''),
+    (78, 85, 'vencimento', 'data', None),
+    (86, 100, 'valor_documento', 'valor', 0),
+    (101, 105, None, 'num', 0),
+    (106, 106, None, 'alfa', ''),
+    (107, 108, 'especie_titulo', 'num', 2),
+    (109, 109, 'aceite', 'alfa', 'N'),
+    (110, 117, 'data_documento', 'data', None),
+    (118, 118, None, 'num', 3),
+    (119, 141, None, 'num', 0),
+    (142, 142, 'codigo_desconto', 'num', 0),
+    (143, 150, None, 'num', 0),
+    (151, 165, 'valor_desconto', 'valor', 0),
+    (166, 180, None, 'num', 0),
+    (181, 195, 'valor_abatimento', 'valor', 0),
+    (196, 220, 'uso_empresa', 'alfa', ''),
+    (221, 221, None, 'num', 3),
+    (222, 223, None, 'num', 0),
+    (224, 224, None, 'num', 0),
+    (225, 227, None, 'alfa', ''),
+    (228, 229, None, 'num', 9),
+    (230, 239, 'contrato', 'num', 0),
+    (240, 240, None, 'alfa', ''),
+))
+
+CNAB240_SEGMENTO_Q = Layout(240, (
+    (1, 3, 'banco', 'num', 0),
+    (4, 7, 'lote', 'num', 1),
+    (8, 8, None, 'num', 3),
+    (9, 13, 'registro', 'num', 0),
+    (14, 14, None, 'alfa', 'Q'),
+    (15, 15, None, 'alfa', ''),
+    (16, 17, 'movimento', 'num', 1),
+    (18, 18, 'tipo_inscricao_sacado', 'num', 0),
+    (19, 33, 'inscricao_sacado', 'num', 0),
+    (34, 73, 'sacado', 'alfa', ''),
+    (74, 113, 'endereco', 'alfa', ''),
+    (114, 128, None, 'alfa', ''),
+    (129, 136, None, 'num', 0),
+    (137, 153, None, 'alfa', ''),
+    (154, 154, None, 'num', 0),
+    (155, 169, None, 'num', 0),
+    (170, 209, 'sacador_avalista', 'alfa', ''),
+    (210, 212, None, 'num', 0),
+    (213, 240, None, 'alfa', ''),
+))
+
+CNAB240_TRAILER_LOTE = Layout(240, (
+    (1, 3, 'banco', 'num', 0),
+    (4, 7, 'lote', 'num', 1),
+    (8, 8, None, 'num', 5),
+    (9, 17, None, 'alfa', ''),
+    (18, 23, 'registros_lote', 'num', 0),
+    (24, 29, 'titulos', 'num', 0),
+    (30, 46, 'valor_total', 'valor', 0),
+    (47, 115, None, 'num', 0),
+    (116, 240, None, 'alfa', ''),
+))
+
+CNAB240_TRAILER_ARQUIVO = Layout(240, (
+    (1, 3, 'banco', 'num', 0),
+    (4, 7, None, 'num', 9999),
+    (8, 8, None, 'num', 9),
+    (9, 17, None, 'alfa', ''),
+    (18, 23, 'lotes', 'num', 1),
+    (24, 29, 'registros', 'num', 0),
+    (30, 35, None, 'num', 0),
+    (36, 240, None, 'alfa', ''),
+))
+
+CNAB400_HEADER = Layout(400, (
+    (1, 1, None, 'num', 0),
+    (2, 2, None, 'num', 1),
+    (3, 9, None, 'alfa', 'REMESSA'),
+    (10, 11, None, 'num', 1),
+    (12, 26, None, 'alfa', 'COBRANCA'),
+    (27, 30, 'agencia', 'num', 0),
+    (31, 31, 'agencia_dv', 'alfa', ''),
+    (32, 39, 'conta', 'num', 0),
+    (40, 40, 'conta_dv', 'alfa', ''),
+    (41, 46, 'convenio', 'num', 0),
+    (47, 76, 'nome_empresa', 'alfa', ''),
+    (77, 79, 'banco', 'num', 0),
+    (80, 94, 'nome_banco', 'alfa', ''),
+    (95, 100, 'data_geracao', 'data', None),
+    (101, 107, 'nsa', 'num', 1),
+    (108, 394, None, 'alfa', ''),
+    (395, 400, 'registro', 'num', 1),
+))
+
+CNAB400_DETALHE = Layout(400, (
+    (1, 1, None, 'num', 1),
+    (2, 3, 'tipo_inscricao_empresa', 'num', 0),
+    (4, 17, 'inscricao_empresa', 'num', 0),
+    (18, 21, 'agencia', 'num', 0),
+    (22, 22, 'agencia_dv', 'alfa', ''),
+    (23, 30, 'conta', 'num', 0),
+    (31, 31, 'conta_dv', 'alfa', ''),
+    (32, 37, 'convenio', 'num', 0),
+    (38, 62, 'uso_empresa', 'alfa', ''),
+    (63, 79, 'nosso_numero', 'num', 0),
+    (80, 81, 'carteira', 'alfa', ''),
+    (82, 108, None, 'alfa', ''),
+    (109, 110, 'movimento', 'num', 1),
+    (111, 120, 'numero_documento', 'alfa', ''),
+    (121, 126, 'vencimento', 'data', None),
+    (127, 139, 'valor_documento', 'valor', 0),
+    (140, 142, 'banco', 'num', 0),
+    (143, 147, None, 'num', 0),
+    (148, 149, 'especie_titulo', 'num', 1),
+    (150, 150, 'aceite', 'alfa', 'N'),
+    (151, 156, 'data_documento', 'data', None),
+    (157, 173, None, 'num', 0),
+    (174, 179, None, 'num', 0),
+    (180, 192, 'valor_desconto', 'valor', 0),
+    (193, 205, None, 'num', 0),
+    (206, 218, 'valor_abatimento', 'valor', 0),
+    (219, 220, 'tipo_inscricao_sacado', 'num', 0),
+    (221, 234, 'inscricao_sacado', 'num', 0),
+    (235, 274, 'sacado', 'alfa', ''),
+    (275, 314, 'endereco', 'alfa', ''),
+    (315, 326, None, 'alfa', ''),
+    (327, 334, None, 'num', 0),
+    (335, 351, None, 'alfa', ''),
+    (352, 391, 'sacador_avalista', 'alfa', ''),
+    (392, 394, None, 'alfa', ''),
+    (395, 400, 'registro', 'num', 0),
+))
+
+CNAB400_TRAILER = Layout(400, (
+    (1, 1, None, 'num', 9),
+    (2, 7, 'titulos', 'num', 0),
+    (8, 20, 'valor_total', 'valor', 0),
+    (21, 394, None, 'alfa', ''),
+    (395, 400, 'registro', 'num', 0),
+))
+
+
+CNAB240_SEGMENTO_T = Layout(240, (
+    (1, 3, 'banco', 'num', 0),
+    (4, 7, 'lote', 'num', 1),
+    (8, 8, None, 'num', 3),
+    (9, 13, 'registro', 'num', 0),
+    (14, 14, None, 'alfa', 'T'),
+    (15, 15, None, 'alfa', ''),
+    (16, 17, 'movimento', 'num', 0),
+    (18, 22, 'agencia', 'num', 0),
+    (23, 23, 'agencia_dv', 'alfa', ''),
+    (24, 35, 'conta', 'num', 0),
+    (36, 36, 'conta_dv', 'alfa', ''),
+    (37, 37, None, 'alfa', ''),
+    (38, 57, 'nosso_numero', 'alfa', ''),
+    (58, 58, None, 'num', 1),
+    (59, 73, 'numero_documento', 'alfa', ''),
+    (74, 81, 'vencimento', 'data', None),
+    (82, 96, 'valor_documento', 'valor', 0),
+    (97, 104, None, 'num', 0),
+    (105, 130, None, 'alfa', ''),
+    (131, 132, None, 'num', 9),
+    (133, 133, 'tipo_inscricao_sacado', 'num', 0),
+    (134, 148, 'inscricao_sacado', 'num', 0),
+    (149, 188, 'sacado', 'alfa', ''),
+    (189, 198, None, 'num', 0),
+    (199, 213, 'valor_tarifa', 'valor', 0),
+    (214, 223, 'motivo', 'alfa', ''),
+    (224, 240, None, 'alfa', ''),
+))
+
+CNAB240_SEGMENTO_U = Layout(240, (
+    (1, 3, 'banco', 'num', 0),
+    (4, 7, 'lote', 'num', 1),
+    (8, 8, None, 'num', 3),
+    (9, 13, 'registro', 'num', 0),
+    (14, 14, None, 'alfa', 'U'),
+    (15, 15, None, 'alfa', ''),
+    (16, 17, 'movimento', 'num', 0),
+    (18, 32, 'valor_juros', 'valor', 0),
+    (33, 47, 'valor_desconto', 'valor', 0),
+    (48, 62, 'valor_abatimento', 'valor', 0),
+    (63, 77, None, 'num', 0),
+    (78, 92, 'valor_pago', 'valor', 0),
+    (93, 137, None, 'num', 0),
+    (138, 145, 'data_ocorrencia', 'data', None),
+    (146, 153, 'data_credito', 'data', None),
+    (154, 180, None, 'num', 0),
+    (181, 240, None, 'alfa', ''),
+))
+
+CNAB400_RETORNO_DETALHE = Layout(400, (
+    (1, 1, None, 'num', 1),
+    (2, 3, 'tipo_inscricao_empresa', 'num', 0),
+    (4, 17, 'inscricao_empresa', 'num', 0),
+    (18, 21, 'agencia', 'num', 0),
+    (22, 22, 'agencia_dv', 'alfa', ''),
+    (23, 30, 'conta', 'num', 0),
+    (31, 31, 'conta_dv', 'alfa', ''),
+    (32, 37, 'convenio', 'num', 0),
+    (38, 62, 'uso_empresa', 'alfa', ''),
+    (63, 79, 'nosso_numero', 'alfa', ''),
+    (80, 108, None, 'alfa', ''),
+    (109, 110, 'movimento', 'num', 0),
+    (111, 116, 'data_ocorrencia', 'data', None),
+    (117, 126, 'numero_documento', 'alfa', ''),
+    (127, 146, None, 'alfa', ''),
+    (147, 152, 'vencimento', 'data', None),
+    (153, 165, 'valor_documento', 'valor', 0),
+    (166, 175, None, 'num', 0),
+    (176, 188, 'valor_tarifa', 'valor', 0),
+    (189, 227, None, 'num', 0),
+    (228, 240, 'valor_abatimento', 'valor', 0),
+    (241, 253, 'valor_desconto', 'valor', 0),
+    (254, 266, 'valor_pago', 'valor', 0),
+    (267, 279, 'valor_juros', 'valor', 0),
+    (280, 294, None, 'num', 0),
+    (295, 300, 'data_credito', 'data', None),
+    (301, 394, None, 'alfa', ''),
+    (395, 400, 'registro', 'num', 0),
+))
+
+
+class Remessa(object):
+    '''
+    Escreve um arquivo de remessa em `fp` (arquivo texto, ex:
+    `io.open(path, 'w', encoding='ascii', newline='')`). Os dados da empresa
+    (banco, agência, conta, convênio e beneficiário) são obtidos do primeiro boleto.
+    '''
+
+    def __init__(self, fp, nsa=1, data_geracao=None, inscricao_empresa='', nome_banco=''):
+        self.fp = fp
+        self.nsa = nsa
+        self.data_geracao = data_geracao or datetime.datetime.now()
+        self.inscricao_empresa = inscricao_empresa
+        self.nome_banco = nome_banco
+
+        self.registros = 0
+        self.titulos = 0
+        self.valor_total = 0
+
+    def _write(self, layout, values):
+        self.fp.write(layout.format(values) + LINE_SEPARATOR)
+        self.registros += 1
+
+    def _empresa(self, boleto):
+        agencia, agencia_dv = _separa_dv(boleto.agencia)
+        conta, conta_dv = _separa_dv(boleto.conta_corrente)
+        return {
+            'banco': boleto._banco,
+            'agencia': agencia,
+            'agencia_dv': agencia_dv,
+            'conta': conta,
+            'conta_dv': conta_dv,
+            'convenio': getattr(boleto, 'convenio', ''),
+            'nome_empresa': boleto.cedente,
+            'nome_banco': self.nome_banco,
+            'tipo_inscricao_empresa': _tipo_inscricao(self.inscricao_empresa),
+            'inscricao_empresa': self.inscricao_empresa,
+            'nsa': self.nsa,
+            'data_geracao': self.data_geracao,
+            'hora_geracao': "{0:%H%M%S}".format(self.data_geracao),
+        }
+
+    def _titulo(self, boleto, empresa):
+        ''' Valores do título, utilizados nos registros de detalhe '''
+        values = dict(empresa)
+        values.update({
+            'nosso_numero': boleto.nosso_numero,
+            'numero_documento': boleto.numero_documento,
+            'uso_empresa': boleto.numero_documento,
+            'carteira': boleto.carteira,
+            'vencimento': boleto.vencimento,
+            'valor_documento': boleto.valor_documento,
+            'aceite': boleto.aceite or 'N',
+            'data_documento': boleto.data_documento or self.data_geracao,
+            'codigo_desconto': 1 if boleto.valor_desconto else 0,
+            'valor_desconto': boleto.valor_desconto,
+            'valor_abatimento': boleto.valor_outras_deducoes,
+            'contrato': boleto.contrato,
+            'tipo_inscricao_sacado': _tipo_inscricao(boleto.cpf_cei_cnpj),
+            'inscricao_sacado': boleto.cpf_cei_cnpj,
+            'sacado': boleto.sacado,
+            'endereco': " ".join(boleto.sacado_extra),
+            'sacador_avalista': boleto.sacador_avalista,
+        })
+        return values
+
+    def write(self, boletos):
+        '''
+        Escreve o arquivo com os boletos informados. `boletos` pode ser
+        qualquer iterável, inclusive um generator: os boletos são
+        consumidos e escritos um a um
+        :rtype: RemessaResult
+        '''
+        boletos = iter(boletos)
+        for first in boletos:
+            boletos = itertools.chain([first], boletos)
+            break
+        else:
+            raise ValueError("nenhum boleto informado")
+
+        empresa = self._empresa(first)
+        self.header(empresa)
+        for boleto in boletos:
+            self.titulos += 1
+            self.valor_total += boleto.valor_documento
+            self.detalhe(self._titulo(boleto, empresa))
+        self.trailer(empresa)
+
+        return RemessaResult(self.registros, self.titulos, self.valor_total)
+
+    def header(self, empresa):
+        raise NotImplementedError()
+
+    def detalhe(self, titulo):
+        raise NotImplementedError()
+
+    def trailer(self, empresa):
+        raise NotImplementedError()
+
+
+class Remessa240(Remessa):
+    ''' Arquivo de remessa CNAB 240, com um único lote de cobrança (segmentos P e Q) '''
+    header_arquivo = CNAB240_HEADER_ARQUIVO
+    header_lote = CNAB240_HEADER_LOTE
+    segmento_p = CNAB240_SEGMENTO_P
+    segmento_q = CNAB240_SEGMENTO_Q
+    trailer_lote = CNAB240_TRAILER_LOTE
+    trailer_arquivo = CNAB240_TRAILER_ARQUIVO
+
+    def header(self, empresa):
+        self._write(self.header_arquivo, empresa)
+        self._write(self.header_lote, empresa)
+
+    def detalhe(self, titulo):
+        # registros do lote, sem o header do arquivo e do lote
+        titulo['registro'] = self.registros - 1
+        self._write(self.segmento_p, titulo)
+        titulo['registro'] += 1
+        self._write(self.segmento_q, titulo)
+
+    def trailer(self, empresa):
+        values = dict(empresa, registros_lote=self.registros, titulos=self.titulos, valor_total=self.valor_total)
+        self._write(self.trailer_lote, values)
+
+        values['registros'] = self.registros + 1
+        self._write(self.trailer_arquivo, values)
+
+
+class Remessa400(Remessa):
+    ''' Arquivo de remessa CNAB 400 '''
+    header_arquivo = CNAB400_HEADER
+    detalhe_titulo = CNAB400_DETALHE
+    trailer_arquivo = CNAB400_TRAILER
+
+    def header(self, empresa):
+        self._write(self.header_arquivo, dict(empresa, registro=1))
+
+    def detalhe(self, titulo):
+        titulo['registro'] = self.registros + 1
+        self._write(self.detalhe_titulo, titulo)
+
+    def trailer(self, empresa):
+        self._write(self.trailer_arquivo, dict(titulos=self.titulos, valor_total=self.valor_total,
+                                               registro=self.registros + 1))
+
+
+REMESSAS = {240: Remessa240, 400: Remessa400}
+
+
+def write_remessa(boletos, fp, formato=240, **kwargs):
+    '''
+    Escreve o arquivo de remessa CNAB 240 ou 400 com os boletos em `fp`.
+    Os demais argumentos são repassados para `Remessa`
+    :rtype: RemessaResult
+    '''
+    try:
+        remessa_class = REMESSAS[formato]
+    except KeyError:
+        raise ValueError("formato de remessa inválido: {0}".format(formato))
+    return remessa_class(fp, **kwargs).write(boletos)
+
+
+# campos lidos dos registros de retorno
+_CAMPOS_RETORNO = RegistroRetorno._fields[1:]
+
+
+class Retorno(object):
+    '''
+    Registros de um arquivo de retorno. `buffer` é o conteúdo do arquivo
+    (bytes, string ou mmap, ver `read_retorno`). Os registros são obtidos
+    sob demanda, na ordem do arquivo
+    '''
+    tamanho = None
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+
+    def _linhas(self):
+        ''' Retorna o número e a posição inicial de cada linha, ignorando as linhas em branco '''
+        buffer = self.buffer
+        newline = b'\n' if isinstance(buffer, (six.binary_type, mmap.mmap)) else '\n'
+        size = len(buffer)
+        inicio = 0
+        numero = 0
+
+        while inicio < size:
+            fim = buffer.find(newline, inicio)
+            if fim < 0:
+                fim = size
+            numero += 1
+
+            tamanho = fim - inicio
+            if tamanho >= self.tamanho:
+                yield numero, inicio
+            elif buffer[inicio:fim].strip():
+                raise ValueError("a linha {0} deve possuir {1} posições".format(numero, self.tamanho))
+            inicio = fim + 1
+
+    def _registro(self, linha, values):
+        return RegistroRetorno(linha, *[values.get(name) for name in _CAMPOS_RETORNO])
+
+    def __iter__(self):
+        raise NotImplementedError()
+
+
+class Retorno240(Retorno):
+    ''' Arquivo de retorno CNAB 240: cada título é composto pelos segmentos T e U '''
+    tamanho = 240
+    segmento_t = CNAB240_SEGMENTO_T
+    segmento_u = CNAB240_SEGMENTO_U
+
+    def __iter__(self):
+        buffer = self.buffer
+        titulo = None
+
+        for numero, inicio in self._linhas():
+            if buffer[inicio + 7:inicio + 8] not in (b'3', '3'):
+                continue
+
+            segmento = buffer[inicio + 13:inicio + 14]
+            if segmento in (b'T', 'T'):
+                titulo = (numero, self.segmento_t.parse(buffer, inicio, _CAMPOS_RETORNO))
+            elif segmento in (b'U', 'U'):
+                if titulo is None:
+                    raise ValueError("segmento U sem o segmento T na linha {0}".format(numero))
+                values = dict(titulo[1], **self.segmento_u.parse(buffer, inicio, _CAMPOS_RETORNO))
+                yield self._registro(titulo[0], values)
+                titulo = None
+
+
+class Retorno400(Retorno):
+    ''' Arquivo de retorno CNAB 400 '''
+    tamanho = 400
+    detalhe_titulo = CNAB400_RETORNO_DETALHE
+
+    def __iter__(self):
+        buffer = self.buffer
+        for numero, inicio in self._linhas():
+            if buffer[inicio:inicio + 1] in (b'1', '1'):
+                yield self._registro(numero, self.detalhe_titulo.parse(buffer, inicio, _CAMPOS_RETORNO))
+
+
+RETORNOS = {240: Retorno240, 400: Retorno400}
+
+
+def _detecta_formato(buffer):
+    ''' Obtém o formato (240 ou 400) pelo tamanho da primeira linha '''
+    fim = buffer.find(b'\n')
+    tamanho = len(buffer[:fim if fim >= 0 else len(buffer)].rstrip(b'\r\n'))
+    if tamanho not in RETORNOS:
+        raise ValueError("formato de retorno não identificado: linhas com {0} posições".format(tamanho))
+    return tamanho
+
+
+def read_retorno(path, formato=None):
+    '''
+    Lê os registros de título de um arquivo de retorno CNAB 240 ou 400,
+    mapeando o arquivo em memória. Sem `formato`, ele é identificado pelo
+    tamanho da primeira linha. Os registros são retornados sob demanda
+    :rtype: generator (RegistroRetorno)
+    '''
+    with io.open(path, 'rb') as fp:
+        if not os.fstat(fp.fileno()).st_size:
+            return
+
+        buffer = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if formato is None:
+                formato = _detecta_formato(buffer)
+
+            try:
+                retorno_class = RETORNOS[formato]
+            except KeyError:
+                raise ValueError("formato de retorno inválido: {0}".format(formato))
+
+            for registro in retorno_class(buffer):
+                yield registro
+        finally:
+            buffer.close()
+
+
+class NossoNumeroIndex(object):
+    '''
+    Índice dos boletos emitidos pelo nosso número (ex: `CecredBoleto.nosso_numero`),
+    utilizado para relacionar os registros de retorno aos boletos
+    '''
+
+    def __init__(self, boletos=()):
+        self._boletos = {}
+        for boleto in boletos:
+            self.add(boleto)
+
+    def add(self, boleto):
+        nosso_numero = boleto.nosso_numero
+        if nosso_numero in self._boletos:
+            raise ValueError("nosso número repetido: {0}".format(nosso_numero))
+        self._boletos[nosso_numero] = boleto
+
+    def get(self, nosso_numero, default=None):
+        return self._boletos.get(nosso_numero.strip(), default)
+
+    def __contains__(self, nosso_numero):
+        return nosso_numero.strip() in self._boletos
+
+    def __len__(self):
+        return len(self._boletos)
+
+    def match(self, registros):
+        '''
+        Relaciona os registros de retorno aos boletos, None para os
+        registros cujo nosso número não foi emitido
+        :rtype: generator (registro, boleto)
+        '''
+        boletos = self._boletos
+        for registro in registros:
+            yield registro, boletos.get(registro.nosso_numero)
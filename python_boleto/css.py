@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+# This file is part of Python Boleto.
+#
+# Copyright (c) 2016, Rockho Team. All rights reserved.
+# Author: Christian Hess
+#
+# This source code is licensed under the AGPLv3 license found in the
+# LICENSE file in the root directory of this source tree.
+'''
+Redução das folhas de estilo incluídas nos documentos independentes
+(ver `Boleto.export_html(self_contained=True)`).
+
+Apenas as regras cujos seletores podem ser aplicados ao HTML gerado são
+mantidas (classes, ids e tags utilizados) e o resultado é minificado.
+As folhas de estilo são interpretadas e reduzidas uma única vez para
+cada conjunto de classes, ids e tags.
+'''
+from __future__ import unicode_literals
+
+import re
+import threading
+
+from .utils import LRUCache
+
+_COMMENT = re.compile(r'/\*.*?\*/', re.S)
+_SPACES = re.compile(r'\s+')
+_SELECTOR_SPACES = re.compile(r'\s*([,>+~])\s*')
+_PSEUDO = re.compile(r'::?[\w-]+(\([^)]*\))?|\[[^\]]*\]')
+_TOKEN = re.compile(r'([.#]?)(-?[_a-zA-Z][\w-]*)')
+
+_HTML_TAG = re.compile(r'<([a-zA-Z][\w-]*)')
+_HTML_CLASS = re.compile(r'\sclass\s*=\s*["\']([^"\']*)["\']')
+_HTML_ID = re.compile(r'\sid\s*=\s*["\']([^"\']*)["\']')
+
+# tags sempre presentes no documento
+_DOCUMENT_TAGS = ('html', 'head', 'body')
+
+# quantidade de folhas de estilo reduzidas mantidas em cache: os tokens
+# utilizados dependem do HTML, que inclui os dados de cada boleto
+CACHE_SIZE = 256
+
+_lock = threading.Lock()
+_parsed = {}
+_pruned = LRUCache(CACHE_SIZE)
+
+
+def _blocks(css):
+    '''
+    Divide a folha de estilo em tuplas (prelúdio, conteúdo), uma
+    para cada regra ou at-rule de primeiro nível
+    '''
+    blocks = []
+    depth = 0
+    start = 0
+    prelude = None
+    for i, char in enumerate(css):
+        if char == '{':
+            if depth == 0:
+                prelude = css[start:i]
+                start = i + 1
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                blocks.append((prelude.strip(), css[start:i]))
+                start = i + 1
+    return blocks
+
+
+def parse(css):
+    '''
+    Interpreta a folha de estilo. Retorna uma lista de regras (seletores,
+    declarações) e at-rules (prelúdio, lista de regras) já minificadas
+    :rtype: list
+    '''
+    rules = []
+    for prelude, body in _blocks(_COMMENT.sub('', css)):
+        prelude = _SPACES.sub(' ', prelude)
+
+        if prelude.startswith('@media') or prelude.startswith('@supports'):
+            rules.append((re.sub(r'\s*:\s*', ':', prelude), parse(body)))
+            continue
+
+        declarations = []
+        for declaration in body.split(';'):
+            name, _, value = declaration.partition(':')
+            if value.strip():
+                declarations.append("{0}:{1}".format(name.strip(), _SPACES.sub(' ', value.strip())))
+
+        if prelude.startswith('@'):
+            # demais at-rules (ex: @font-face) são mantidas sem alteração
+            rules.append((prelude, ";".join(declarations)))
+        elif declarations:
+            selectors = [_SELECTOR_SPACES.sub(r'\1', s.strip()) for s in prelude.split(',')]
+            rules.append((tuple(selectors), ";".join(declarations)))
+    return rules
+
+
+def used_tokens(html):
+    '''
+    Retorna as tags, classes (.nome) e ids (#nome) utilizados no HTML
+    :rtype: frozenset
+    '''
+    tokens = set(_DOCUMENT_TAGS)
+    tokens.update(tag.lower() for tag in _HTML_TAG.findall(html))
+    for classes in _HTML_CLASS.findall(html):
+        tokens.update('.' + name for name in classes.split())
+    tokens.update('#' + name.strip() for name in _HTML_ID.findall(html))
+    return frozenset(tokens)
+
+
+def _matches(selector, tokens):
+    '''
+    Indica se o seletor pode ser aplicado ao documento: todas as suas tags,
+    classes e ids devem ser utilizados. Pseudo-classes e atributos são ignorados
+    '''
+    for prefix, name in _TOKEN.findall(_PSEUDO.sub('', selector)):
+        token = prefix + (name if prefix else name.lower())
+        if token not in tokens:
+            return False
+    return True
+
+
+def _serialize(rules, tokens=None):
+    ''' Monta a folha de estilo minificada, mantendo apenas os seletores presentes em `tokens` '''
+    output = []
+    for prelude, body in rules:
+        if isinstance(body, list):
+            inner = _serialize(body, tokens)
+            if inner:
+                output.append("{0}{{{1}}}".format(prelude, inner))
+        elif isinstance(prelude, tuple):
+            selectors = [selector for selector in prelude if tokens is None or _matches(selector, tokens)]
+            if selectors:
+                output.append("{0}{{{1}}}".format(",".join(selectors), body))
+        else:
+            output.append("{0}{{{1}}}".format(prelude, body))
+    return "".join(output)
+
+
+def prune(css, html):
+    '''
+    Retorna a folha de estilo minificada, apenas com as regras que podem
+    ser aplicadas ao HTML informado
+    :rtype: string
+    '''
+    tokens = used_tokens(html)
+    key = (css, tokens)
+
+    result = _pruned.get(key)
+    if result is None:
+        rules = _parsed.get(css)
+        if rules is None:
+            rules = parse(css)
+
+        result = _serialize(rules, tokens)
+        with _lock:
+            _parsed[css] = rules
+        _pruned.set(key, result)
+    return result
+
+
+def minify(css):
+    '''
+    Retorna a folha de estilo minificada, com todas as regras
+    :rtype: string
+    '''
+    return _serialize(parse(css))
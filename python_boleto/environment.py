@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+# This file is part of Python Boleto.
+#
+# Copyright (c) 2016, Rockho Team. All rights reserved.
+# Author: Christian Hess
+#
+# This source code is licensed under the AGPLv3 license found in the
+# LICENSE file in the root directory of this source tree.
+'''
+Ambiente Jinja compartilhado pelo processo.
+
+O ambiente e os templates compilados são criados uma única vez e
+reutilizados por todos os renders. O acesso é protegido por lock,
+podendo ser utilizado a partir de várias threads.
+
+O Jinja é importado apenas na criação do ambiente, no primeiro render.
+
+Quando o pacote é instalado, os templates são pré-compilados em módulos
+Python (ver `python_boleto.precompile`) e carregados sem interpretar o
+código fonte dos templates. Sem os templates pré-compilados (ex: em
+desenvolvimento), eles são compilados a partir do código fonte.
+'''
+from __future__ import unicode_literals
+
+import io
+import os
+import threading
+
+from . import filters, instrumentation
+
+DEFAULT_FILTERS = {
+    'index_or_blank': filters.index_or_blank,
+    'format_currency_or_blank': filters.format_currency_or_blank,
+    'format_date_or_blank': filters.format_date_or_blank,
+    'format_agencia_conta': filters.format_agencia_conta,
+}
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+
+# templates pré-compilados do pacote e a versão do Jinja utilizada na compilação
+COMPILED_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'compiled_templates')
+COMPILED_VERSION_FILE = 'jinja_version'
+
+_lock = threading.RLock()
+_environment = None
+_templates = {}
+_loaders = []
+_filters = {}
+
+
+def _compiled_loader():
+    '''
+    Retorna o loader dos templates pré-compilados do pacote, ou None quando
+    não existirem ou tiverem sido compilados com outra versão do Jinja
+    '''
+    import jinja2
+
+    try:
+        with io.open(os.path.join(COMPILED_DIR, COMPILED_VERSION_FILE), encoding='utf-8') as fp:
+            version = fp.read().strip()
+    except (IOError, OSError):
+        return None
+
+    if version != jinja2.__version__:
+        return None
+    return jinja2.ModuleLoader(COMPILED_DIR)
+
+
+def _build_environment(loaders=None, compiled=True):
+    '''
+    Cria o ambiente com os loaders (por padrão, os registrados) e filtros
+    registrados. Com `compiled`, utiliza os templates pré-compilados do pacote
+    '''
+    from jinja2 import ChoiceLoader, Environment, PackageLoader
+
+    loaders = list(_loaders if loaders is None else loaders)
+    compiled_loader = _compiled_loader() if compiled else None
+    if compiled_loader is not None:
+        loaders.append(compiled_loader)
+    loader = ChoiceLoader(loaders + [PackageLoader('python_boleto', 'templates')])
+
+    # os templates são imutáveis durante a execução do processo,
+    # não há necessidade de verificar se foram alterados a cada render
+    env = Environment(loader=loader, auto_reload=False)
+
+    template_filters = dict(DEFAULT_FILTERS, **_filters)
+    if instrumentation.filters_enabled():
+        # os filtros reportam os seus tempos ao instrumento do render
+        template_filters = dict((name, instrumentation.wrap_filter(name, func))
+                                for name, func in template_filters.items())
+    env.filters.update(template_filters)
+    return env
+
+
+def get_environment():
+    ''' Retorna o ambiente Jinja compartilhado, criando-o se necessário '''
+    global _environment
+
+    env = _environment
+    if env is None:
+        with _lock:
+            if _environment is None:
+                _environment = _build_environment()
+            env = _environment
+    return env
+
+
+def get_template(name):
+    ''' Retorna o template compilado `name`, compilando-o apenas no primeiro uso '''
+    template = _templates.get(name)
+    if template is None:
+        with _lock:
+            template = _templates.get(name)
+            if template is None:
+                template = get_environment().get_template(name)
+                _templates[name] = template
+    return template
+
+
+def preload(names=None):
+    '''
+    Carrega o ambiente, os templates `names` (por padrão, todos os do pacote)
+    e os formatadores dos filtros. Indicado antes de criar processos filhos
+    (fork), para que o primeiro render de cada processo não precise fazê-lo
+    '''
+    if names is None:
+        names = sorted(name for name in os.listdir(TEMPLATES_DIR) if name.endswith('.jinja'))
+
+    for name in names:
+        get_template(name)
+    filters.get_currency_formatter()
+    filters.get_date_formatter()
+
+
+def register_loader(loader):
+    '''
+    Adiciona um loader Jinja. Os loaders registrados têm prioridade
+    sobre os templates do pacote, permitindo sobrescrevê-los.
+    '''
+    with _lock:
+        _loaders.insert(0, loader)
+        reset_environment()
+
+
+def register_filter(name, func):
+    ''' Adiciona (ou substitui) um filtro disponível nos templates '''
+    with _lock:
+        _filters[name] = func
+        reset_environment()
+
+
+def reset_environment():
+    '''
+    Descarta o ambiente e os templates compilados. Serão recriados
+    no próximo render com os loaders e filtros registrados.
+    '''
+    global _environment
+
+    with _lock:
+        _environment = None
+        _templates.clear()
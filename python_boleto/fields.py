@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+# This file is part of Python Boleto.
+#
+# Copyright (c) 2016, Rockho Team. All rights reserved.
+# Author: Christian Hess
+#
+# This source code is licensed under the AGPLv3 license found in the
+# LICENSE file in the root directory of this source tree.
+'''
+Conversão dos valores atribuídos aos campos dos boletos
+(ver `Boleto._field_coercers`)
+'''
+from __future__ import unicode_literals
+
+import datetime
+from decimal import Decimal
+
+import six
+
+
+def to_decimal(value):
+    return Decimal(value)
+
+
+def to_date(value):
+    '''
+    Converte datas informadas como string (ISO 8601). As datas no formato
+    AAAA-MM-DD, mais comuns, são convertidas sem o parser completo
+    '''
+    if isinstance(value, six.string_types):
+        if len(value) == 10 and value[4] == '-' and value[7] == '-' and \
+                value[:4].isdigit() and value[5:7].isdigit() and value[8:].isdigit():
+            try:
+                return datetime.date(int(value[:4]), int(value[5:7]), int(value[8:]))
+            except ValueError:
+                pass
+        # importado sob demanda, apenas quando as datas não estão no formato AAAA-MM-DD
+        from iso8601 import iso8601
+        return iso8601.parse_date(value).date()
+    return value
+
+
+def to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError, OverflowError):
+        return 0
+
+
+def to_string(value):
+    return "{0}".format(value)
+
+
+def to_string_or_blank(value):
+    ''' Converte para string, mantendo em branco os valores não informados (None) '''
+    if value is None:
+        return ""
+    return "{0}".format(value)
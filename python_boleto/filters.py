@@ -6,9 +6,113 @@
 #
 # This source code is licensed under the AGPLv3 license found in the
 # LICENSE file in the root directory of this source tree.
+'''
+Filtros utilizados nos templates dos boletos.
 
-from babel.dates import format_date
-from babel.numbers import format_currency
+Os formatos de moeda e data do locale são obtidos e compilados uma única
+vez (ver `configure`) e os valores formatados mais recentes são mantidos
+em cache, já que se repetem entre os boletos (valores zerados, vencimentos).
+
+O Babel é importado apenas quando o primeiro formatador é criado: o uso
+da biblioteca sem o render (ex: código de barras) não paga o seu custo.
+'''
+import datetime
+import threading
+
+from .utils import LRUCache
+
+DEFAULT_LOCALE = 'pt_BR'
+DEFAULT_CURRENCY = 'R$'
+DEFAULT_DATE_FORMAT = 'dd/MM/yyyy'
+CACHE_SIZE = 1024
+
+
+class CurrencyFormatter(object):
+    '''
+    Formata valores monetários com o padrão de moeda do locale
+    '''
+
+    def __init__(self, locale=DEFAULT_LOCALE, currency=DEFAULT_CURRENCY, cache_size=CACHE_SIZE):
+        from babel.core import Locale
+
+        self.locale = Locale.parse(locale)
+        self.currency = currency
+        self.pattern = self.locale.currency_formats['standard']
+        self.cache = LRUCache(cache_size)
+
+    def __call__(self, value):
+        result = self.cache.get(value)
+        if result is None:
+            result = self.pattern.apply(value, self.locale, currency=self.currency)
+            self.cache.set(value, result)
+        return result
+
+
+class DateFormatter(object):
+    '''
+    Formata datas com o padrão informado
+    '''
+
+    def __init__(self, locale=DEFAULT_LOCALE, date_format=DEFAULT_DATE_FORMAT, cache_size=CACHE_SIZE):
+        from babel.core import Locale
+        from babel.dates import parse_pattern
+
+        self.locale = Locale.parse(locale)
+        self.pattern = parse_pattern(date_format)
+        self.cache = LRUCache(cache_size)
+
+    def __call__(self, value):
+        if isinstance(value, datetime.datetime):
+            value = value.date()
+
+        result = self.cache.get(value)
+        if result is None:
+            result = self.pattern.apply(value, self.locale)
+            self.cache.set(value, result)
+        return result
+
+
+_lock = threading.Lock()
+_settings = {
+    'locale': DEFAULT_LOCALE,
+    'currency': DEFAULT_CURRENCY,
+    'date_format': DEFAULT_DATE_FORMAT,
+    'cache_size': CACHE_SIZE,
+}
+_formatters = {}
+
+
+def configure(locale=None, currency=None, date_format=None, cache_size=None):
+    '''
+    Altera o locale, a moeda, o formato das datas ou o tamanho do cache
+    utilizados pelos filtros. Os valores não informados são mantidos
+    '''
+    with _lock:
+        for name, value in (('locale', locale), ('currency', currency),
+                            ('date_format', date_format), ('cache_size', cache_size)):
+            if value is not None:
+                _settings[name] = value
+        _formatters.clear()
+
+
+def get_currency_formatter():
+    ''' Retorna o formatador de valores monetários configurado, criando-o se necessário '''
+    formatter = _formatters.get('currency')
+    if formatter is None:
+        with _lock:
+            formatter = _formatters['currency'] = CurrencyFormatter(
+                _settings['locale'], _settings['currency'], _settings['cache_size'])
+    return formatter
+
+
+def get_date_formatter():
+    ''' Retorna o formatador de datas configurado, criando-o se necessário '''
+    formatter = _formatters.get('date')
+    if formatter is None:
+        with _lock:
+            formatter = _formatters['date'] = DateFormatter(
+                _settings['locale'], _settings['date_format'], _settings['cache_size'])
+    return formatter
 
 
 def format_agencia_conta(value):
@@ -26,13 +130,13 @@ def format_agencia_conta(value):
 
 def format_date_or_blank(value):
     if value:
-        return format_date(value, format="dd/MM/yyyy", locale='pt_BR')
+        return get_date_formatter()(value)
     return ""
 
 def format_currency_or_blank(value):
     ''' Formata um valor decimal (dinheiro) ou retorna vazio '''
     if value:
-        return format_currency(value, 'R$', locale='pt_BR')
+        return get_currency_formatter()(value)
     return ""
 
 def index_or_blank(value, index):
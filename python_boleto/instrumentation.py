@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+# This file is part of Python Boleto.
+#
+# Copyright (c) 2016, Rockho Team. All rights reserved.
+# Author: Christian Hess
+#
+# This source code is licensed under the AGPLv3 license found in the
+# LICENSE file in the root directory of this source tree.
+'''
+Medição do tempo de cada etapa do render dos boletos.
+
+Um instrumento é qualquer callable `instrumento(etapa, segundos)`, ex:
+`RenderStats` ou uma função que registra os tempos no log. Ele pode ser
+informado a cada render (`Boleto.export_html(instrument=...)`) ou
+definido para todo o processo (`set_instrument`).
+
+Etapas medidas:
+    - template: obtenção do ambiente e do template compilado
+    - context: `get_context_data` e demais dados do contexto
+    - assets: leitura do logo
+    - barcode: geração do código de barras
+    - css: redução das folhas de estilo (documentos independentes)
+    - render: `template.render`
+    - filter.<nome>: cada chamada de filtro (incluídas no tempo do render)
+    - total: o render completo
+
+O instrumento ativo fica em uma variável local da thread, de modo que
+os filtros (compartilhados por todos os renders) reportam os tempos ao
+instrumento do render que os chamou. Os filtros só passam a ser medidos
+após o primeiro uso de um instrumento; sem instrumento, o custo das
+demais etapas é apenas o de verificar essa variável.
+'''
+from __future__ import unicode_literals
+
+from collections import deque
+import functools
+import math
+import threading
+import timeit
+
+_clock = timeit.default_timer
+_local = threading.local()
+_default = None
+_filters_enabled = False
+
+# quantidade de amostras mantidas por etapa no cálculo dos percentis
+SAMPLE_SIZE = 10000
+
+
+def set_instrument(instrument):
+    ''' Define o instrumento utilizado por todos os renders do processo (None para desativar) '''
+    global _default
+    if instrument is not None:
+        _enable_filters()
+    _default = instrument
+
+
+def current():
+    ''' Retorna o instrumento ativo na thread atual, ou None '''
+    return getattr(_local, 'instrument', None) or _default
+
+
+def filters_enabled():
+    ''' Indica se os filtros dos templates devem ser medidos (ver `wrap_filter`) '''
+    return _filters_enabled
+
+
+def _enable_filters():
+    '''
+    Passa a medir os filtros. Os templates são compilados novamente, com os
+    filtros envolvidos por `wrap_filter`: até o primeiro uso de um instrumento
+    os filtros não têm nenhum custo adicional
+    '''
+    global _filters_enabled
+    if not _filters_enabled:
+        from . import environment
+
+        _filters_enabled = True
+        environment.reset_environment()
+
+
+class instrument(object):
+    ''' Ativa `callback` como o instrumento da thread atual. Sem `callback`, mantém o atual '''
+    __slots__ = ('callback', 'previous')
+
+    def __init__(self, callback):
+        self.callback = callback
+        self.previous = None
+
+    def __enter__(self):
+        if self.callback is not None:
+            _enable_filters()
+            self.previous = getattr(_local, 'instrument', None)
+            _local.instrument = self.callback
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.callback is not None:
+            _local.instrument = self.previous
+
+
+class _Timer(object):
+    __slots__ = ('stage', 'callback', 'start')
+
+    def __init__(self, stage, callback):
+        self.stage = stage
+        self.callback = callback
+        self.start = None
+
+    def __enter__(self):
+        self.start = _clock()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.callback(self.stage, _clock() - self.start)
+
+
+class _NullTimer(object):
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def timer(stage):
+    ''' Mede o tempo do bloco `with` e o reporta ao instrumento ativo, se houver '''
+    callback = getattr(_local, 'instrument', None) or _default
+    if callback is None:
+        return _NULL_TIMER
+    return _Timer(stage, callback)
+
+
+def wrap_filter(name, func):
+    ''' Envolve o filtro `name` para que as suas chamadas sejam medidas '''
+    stage = 'filter.' + name
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        callback = getattr(_local, 'instrument', None) or _default
+        if callback is None:
+            return func(*args, **kwargs)
+
+        start = _clock()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            callback(stage, _clock() - start)
+    return wrapper
+
+
+def _percentile(samples, percent):
+    ''' Percentil pelo método nearest-rank, `samples` ordenadas '''
+    return samples[max(0, int(math.ceil(percent / 100.0 * len(samples))) - 1)]
+
+
+class RenderStats(object):
+    '''
+    Instrumento que agrega os tempos de cada etapa: quantidade, total e
+    percentis 50 e 99 (das últimas `sample_size` medições). Pode ser
+    compartilhado entre threads
+    '''
+
+    def __init__(self, sample_size=SAMPLE_SIZE):
+        self.sample_size = sample_size
+        self._lock = threading.Lock()
+        self._stages = {}
+
+    def __call__(self, stage, seconds):
+        with self._lock:
+            data = self._stages.get(stage)
+            if data is None:
+                data = self._stages[stage] = [0, 0.0, deque(maxlen=self.sample_size)]
+            data[0] += 1
+            data[1] += seconds
+            data[2].append(seconds)
+
+    def as_dict(self):
+        '''
+        Retorna os contadores de cada etapa, em segundos
+        :rtype: dict ({etapa: {count, total, p50, p99}})
+        '''
+        with self._lock:
+            stages = [(stage, count, total, sorted(samples)) for stage, (count, total, samples)
+                      in self._stages.items()]
+
+        return dict((stage, {
+            'count': count,
+            'total': total,
+            'p50': _percentile(samples, 50),
+            'p99': _percentile(samples, 99),
+        }) for stage, count, total, samples in stages)
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+# This file is part of Python Boleto.
+#
+# Copyright (c) 2016, Rockho Team. All rights reserved.
+# Author: Christian Hess
+#
+# This source code is licensed under the AGPLv3 license found in the
+# LICENSE file in the root directory of this source tree.
+'''
+Leitura e validação de linhas digitáveis e códigos de barras.
+
+Faz o caminho inverso de `Boleto.linha_digitavel`/`Boleto.codigo_barras`:
+verifica os DVs dos campos da linha digitável (módulo 10) e o DV geral do
+código de barras (módulo 11) e obtém o banco, o vencimento, o valor e o
+campo livre. Os campos do campo livre (ex: convênio, conta corrente e número
+sequencial) são obtidos pela classe de boleto do banco (ver
+`Boleto.parse_campo_livre`).
+
+`parse_many` valida os DVs de todos os valores de uma só vez
+(ver `modulo10_many`/`modulo11_many`), sendo indicado para a conciliação
+de grandes volumes de pagamentos.
+'''
+from __future__ import unicode_literals
+
+from collections import namedtuple
+from datetime import date, timedelta
+from decimal import Decimal
+import re
+
+from .utils import modulo10, modulo10_many, modulo11, modulo11_many
+
+# datas utilizadas no cálculo do fator de vencimento
+DATA_BASE_FATOR = date(1997, 10, 7)
+DATA_LIMITE_FATOR = date(2025, 2, 21)
+DATA_BASE_NOVO_FATOR = date(2025, 2, 22)
+
+TAMANHO_CODIGO_BARRAS = 44
+TAMANHO_LINHA_DIGITAVEL = 47
+
+# posições (início, fim, DV) dos 3 primeiros campos da linha digitável
+_CAMPOS_LINHA = ((0, 9, 9), (10, 20, 20), (21, 31, 31))
+
+# apenas os algarismos ASCII: \D não remove outros algarismos Unicode (ex: '١')
+_NAO_DIGITOS = re.compile('[^0-9]')
+
+CodigoBarras = namedtuple('CodigoBarras', ['codigo_barras', 'banco', 'moeda', 'fator_vencimento', 'vencimento',
+                                           'valor', 'campo_livre', 'campos'])
+
+
+def calcula_vencimento(fator, referencia=None):
+    '''
+    Obtém a data de vencimento a partir do fator. A partir de 22/02/2025 os
+    fatores recomeçam em 1000: entre as duas datas possíveis, é utilizada a
+    mais próxima de `referencia` (por padrão, a data atual).
+    Retorna None para o fator 0 (boleto sem vencimento)
+    :rtype: date|None
+    '''
+    if not fator:
+        return None
+
+    vencimento = DATA_BASE_FATOR + timedelta(days=fator)
+    if fator < 1000:
+        return vencimento
+
+    novo_vencimento = DATA_BASE_NOVO_FATOR + timedelta(days=fator - 1000)
+    referencia = referencia or date.today()
+    if abs(novo_vencimento - referencia) < abs(vencimento - referencia):
+        return novo_vencimento
+    return vencimento
+
+
+def linha_para_codigo_barras(linha):
+    '''
+    Converte a linha digitável (apenas os 47 algarismos) no código de barras
+    :rtype: string
+    '''
+    return linha[:4] + linha[32:47] + linha[4:9] + linha[10:20] + linha[21:31]
+
+
+def _normaliza(value):
+    ''' Remove os pontos, espaços e demais separadores '''
+    digits = _NAO_DIGITOS.sub('', value)
+    if len(digits) not in (TAMANHO_CODIGO_BARRAS, TAMANHO_LINHA_DIGITAVEL):
+        raise ValueError("a linha digitável deve possuir 47 algarismos e o código de barras 44: {0}".format(value))
+    return digits
+
+
+def _decodifica(codigo_barras, boleto_class, referencia, vencimentos):
+    banco = codigo_barras[:3]
+    campos = {}
+    if boleto_class is not None:
+        if banco != boleto_class._banco:
+            raise ValueError("o código de barras {0} não é do banco {1}".format(codigo_barras, boleto_class._banco))
+        campos = boleto_class.parse_campo_livre(codigo_barras[19:])
+
+    fator = int(codigo_barras[5:9])
+    vencimento = vencimentos.get(fator)
+    if vencimento is None and fator not in vencimentos:
+        vencimento = vencimentos[fator] = calcula_vencimento(fator, referencia)
+
+    return CodigoBarras(codigo_barras, banco, codigo_barras[3], fator, vencimento,
+                        Decimal(int(codigo_barras[9:19])).scaleb(-2), codigo_barras[19:], campos)
+
+
+def parse(value, boleto_class=None, referencia=None):
+    '''
+    Valida e decodifica uma linha digitável (47 algarismos) ou um código de
+    barras (44 algarismos). Pontos e espaços são ignorados. Com `boleto_class`,
+    o código deve ser do banco da classe e os campos do campo livre são decodificados.
+    Lança ValueError quando o valor ou algum dos DVs for inválido
+    :param: referencia data utilizada para resolver o fator de vencimento (ver `calcula_vencimento`)
+    :rtype: CodigoBarras
+    '''
+    digits = _normaliza(value)
+
+    if len(digits) == TAMANHO_LINHA_DIGITAVEL:
+        for numero, (inicio, fim, dv) in enumerate(_CAMPOS_LINHA, 1):
+            if modulo10(digits[inicio:fim]) != int(digits[dv]):
+                raise ValueError("DV do campo {0} da linha digitável inválido: {1}".format(numero, value))
+        digits = linha_para_codigo_barras(digits)
+
+    if modulo11(digits[:4] + digits[5:]) != int(digits[4]):
+        raise ValueError("DV do código de barras inválido: {0}".format(value))
+
+    return _decodifica(digits, boleto_class, referencia, {})
+
+
+def _valida_campos_linhas(linhas, values, results):
+    '''
+    Valida os DVs dos campos das linhas digitáveis (tuplas (índice, algarismos)),
+    registrando o erro das inválidas em `results`
+    :rtype: set (índices das linhas inválidas)
+    '''
+    invalidos = set()
+    for numero, (inicio, fim, dv) in enumerate(_CAMPOS_LINHA, 1):
+        dvs = modulo10_many([digits[inicio:fim] for _, digits in linhas])
+        for (index, digits), calculado in zip(linhas, dvs):
+            if calculado != ord(digits[dv]) - 48 and index not in invalidos:
+                invalidos.add(index)
+                results[index] = ValueError("DV do campo {0} da linha digitável inválido: {1}".format(
+                    numero, values[index]))
+    return invalidos
+
+
+def parse_many(values, boleto_class=None, referencia=None):
+    '''
+    Valida e decodifica várias linhas digitáveis e/ou códigos de barras
+    (ver `parse`), calculando os DVs de todos de uma só vez. Os valores
+    inválidos são retornados como a exceção (ValueError) correspondente
+    :rtype: list (na mesma ordem de `values`)
+    '''
+    values = list(values)
+    results = []
+    codigos = []
+    linhas = []
+
+    for index, value in enumerate(values):
+        try:
+            digits = _normaliza(value)
+        except ValueError as e:
+            results.append(e)
+            continue
+
+        results.append(None)
+        if len(digits) == TAMANHO_LINHA_DIGITAVEL:
+            linhas.append((index, digits))
+        else:
+            codigos.append((index, digits))
+
+    # DVs dos campos de todas as linhas digitáveis
+    if linhas:
+        invalidos = _valida_campos_linhas(linhas, values, results)
+        codigos.extend((index, linha_para_codigo_barras(digits)) for index, digits in linhas
+                       if index not in invalidos)
+
+    # DV geral de todos os códigos de barras
+    dvs = modulo11_many([digits[:4] + digits[5:] for _, digits in codigos])
+    vencimentos = {}
+    for (index, digits), dv in zip(codigos, dvs):
+        try:
+            if dv != ord(digits[4]) - 48:
+                raise ValueError("DV do código de barras inválido: {0}".format(values[index]))
+            results[index] = _decodifica(digits, boleto_class, referencia, vencimentos)
+        except ValueError as e:
+            results[index] = e
+
+    return results
@@ -0,0 +1,530 @@
+# -*- coding: utf-8 -*-
+# This file is part of Python Boleto.
+#
+# Copyright (c) 2016, Rockho Team. All rights reserved.
+# Author: Christian Hess
+#
+# This source code is licensed under the AGPLv3 license found in the
+# LICENSE file in the root directory of this source tree.
+'''
+Exportação dos boletos para PDF, sem navegador ou dependências externas.
+
+O layout reproduz os campos do template HTML (recibo do pagador e ficha de
+compensação). Os textos utilizam as fontes padrão do PDF (Helvetica), o
+código de barras é desenhado em vetores e o logo de cada banco é incluído
+uma única vez no documento, como um XObject compartilhado pelas páginas.
+
+Os boletos são escritos página a página: documentos com milhares de
+boletos podem ser gerados sem mantê-los em memória.
+'''
+from __future__ import unicode_literals
+
+from collections import namedtuple
+import io
+import struct
+import unicodedata
+import zlib
+
+from . import barcode, filters
+from .assets import asset_cache, jpeg_frame
+
+# página A4, em pontos
+PAGE_WIDTH = 595.28
+PAGE_HEIGHT = 841.89
+MARGIN = 28.35
+
+# os campos são posicionados em um grid de 12 colunas, assim como no HTML
+CONTENT_WIDTH = PAGE_WIDTH - 2 * MARGIN
+COLUMN = CONTENT_WIDTH / 12
+
+# código de barras com 0,254mm por módulo e 13mm de altura
+BARCODE_MODULE_WIDTH = 0.72
+BARCODE_HEIGHT = 36.85
+
+LOGO_HEIGHT = 18
+ROW_HEIGHT = 20
+LABEL_SIZE = 5.5
+VALUE_SIZE = 8
+LEADING = 9
+PADDING = 2
+
+# espaço entre os boletos de uma mesma página
+SPACING = 10
+
+FONT = 'F1'
+FONT_BOLD = 'F2'
+_FONTS = ((FONT, 'Helvetica'), (FONT_BOLD, 'Helvetica-Bold'))
+
+# larguras dos caracteres ASCII 32 a 126, em milésimos do tamanho da fonte
+_WIDTHS = {
+    FONT: (
+        278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+        556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+        1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+        667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+        333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+        556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+    ),
+    FONT_BOLD: (
+        278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+        556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+        975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+        667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+        333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+        611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584,
+    ),
+}
+
+AVISO_TARIFA = "NÃO COBRAR QUALQUER TARIFA DE EMISSÃO DE CARNÊ/BOLETO OU OUTRA TAXA ASSEMELHADA"
+
+# imagem incluída no documento, com as dimensões em que é desenhada
+Image = namedtuple('Image', ['name', 'width', 'height'])
+
+
+def _num(value):
+    ''' Formata um número para o PDF, com no máximo 2 casas decimais '''
+    return ("%.2f" % value).rstrip('0').rstrip('.')
+
+
+def text_width(text, font=FONT, size=VALUE_SIZE):
+    '''
+    Calcula a largura do texto, em pontos. Caracteres acentuados
+    utilizam a largura do caractere sem acento
+    :rtype: float
+    '''
+    widths = _WIDTHS[font]
+    total = 0
+    for char in text:
+        code = ord(char)
+        if not 32 <= code <= 126:
+            base = unicodedata.normalize('NFKD', char)[:1]
+            code = ord(base) if base else 0
+        total += widths[code - 32] if 32 <= code <= 126 else 556
+    return total * size / 1000.0
+
+
+def _fit(text, width, font=FONT, size=VALUE_SIZE):
+    ''' Trunca o texto para que caiba na largura informada '''
+    if text_width(text, font, size) <= width:
+        return text
+
+    while text and text_width(text + '...', font, size) > width:
+        text = text[:-1]
+    return text + '...'
+
+
+def _string(text):
+    ''' Codifica o texto como string do PDF (WinAnsiEncoding) '''
+    data = text.encode('cp1252', 'replace')
+    return b'(' + data.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)') + b')'
+
+
+def _valor(value):
+    ''' Valor do campo ou vazio, assim como o filtro `default` dos templates '''
+    return "{0}".format(value) if value else ""
+
+
+class Canvas(object):
+    '''
+    Operações de desenho (content stream) de um boleto ou página
+    '''
+
+    def __init__(self):
+        self._ops = []
+
+    def text(self, x, y, text, font=FONT, size=VALUE_SIZE, align='left'):
+        if not text:
+            return
+
+        if align != 'left':
+            width = text_width(text, font, size)
+            x -= width if align == 'right' else width / 2.0
+
+        self._ops.append("BT /{0} {1} Tf {2} {3} Td ".format(font, _num(size), _num(x), _num(y)).encode('ascii') +
+                         _string(text) + b" Tj ET")
+
+    def line(self, x1, y1, x2, y2, width=0.5, dashed=False):
+        line = "{0} w {1} {2} m {3} {4} l S".format(_num(width), _num(x1), _num(y1), _num(x2), _num(y2))
+        if dashed:
+            line = "[2 2] 0 d {0} [] 0 d".format(line)
+        self._ops.append(line.encode('ascii'))
+
+    def image(self, image, x, y):
+        self._ops.append("q {0} 0 0 {1} {2} {3} cm /{4} Do Q".format(
+            _num(image.width), _num(image.height), _num(x), _num(y), image.name).encode('ascii'))
+
+    def barcode(self, code, x, y, module_width=BARCODE_MODULE_WIDTH, height=BARCODE_HEIGHT):
+        ''' Desenha o código de barras ITF em vetores, com um retângulo por barra '''
+        rects = []
+        for i, width in enumerate(barcode.encode(code)):
+            if not i % 2:
+                rects.append("{0} {1} {2} {3} re".format(_num(x), _num(y), _num(width * module_width), _num(height)))
+            x += width * module_width
+        self._ops.append(("\n".join(rects) + "\nf").encode('ascii'))
+
+    def getvalue(self):
+        return b"\n".join(self._ops)
+
+
+def _campos(canvas, y, campos, height=ROW_HEIGHT):
+    '''
+    Desenha uma linha de campos (título e valor). Cada campo é uma tupla
+    (colunas, título, valor, alinhamento). Retorna a posição abaixo da linha
+    '''
+    x = 0
+    for span, label, value, align in campos:
+        width = span * COLUMN
+        if x:
+            canvas.line(x, y, x, y - height)
+
+        canvas.text(x + PADDING, y - LABEL_SIZE - 1, label, size=LABEL_SIZE)
+
+        value = _fit(value, width - 2 * PADDING)
+        if align == 'right':
+            canvas.text(x + width - PADDING, y - height + 4, value, align=align)
+        elif align == 'center':
+            canvas.text(x + width / 2.0, y - height + 4, value, align=align)
+        else:
+            canvas.text(x + PADDING, y - height + 4, value)
+
+        x += width
+
+    canvas.line(0, y - height, CONTENT_WIDTH, y - height)
+    return y - height
+
+
+def _linhas(canvas, x, y, linhas, width, font=FONT, size=VALUE_SIZE):
+    ''' Desenha várias linhas de texto a partir de `y`. Retorna a posição abaixo da última linha '''
+    for linha in linhas:
+        y -= LEADING
+        canvas.text(x, y, _fit(_valor(linha), width, font, size), font, size)
+    return y
+
+
+def _cabecalho(canvas, y, boleto, logo, titulo, size):
+    ''' Desenha o logo, o número do banco e o título (ou linha digitável) '''
+    height = 24
+    if logo:
+        canvas.image(logo, 0, y - height + 3)
+
+    numero_banco = boleto._banco
+    if boleto._banco_dv:
+        numero_banco = "{0}-{1}".format(boleto._banco, boleto._banco_dv)
+
+    canvas.line(2 * COLUMN, y - 8, 2 * COLUMN, y - height, width=1.5)
+    canvas.text(2.5 * COLUMN, y - height + 5, numero_banco, FONT_BOLD, 13, 'center')
+    canvas.line(3 * COLUMN, y - 8, 3 * COLUMN, y - height, width=1.5)
+    canvas.text(CONTENT_WIDTH, y - height + 5, titulo, FONT_BOLD, size, 'right')
+    canvas.line(0, y - height, CONTENT_WIDTH, y - height, width=1.5)
+    return y - height
+
+
+def _linha_corte(canvas, y):
+    canvas.text(CONTENT_WIDTH, y - 8, "corte na linha pontilhada", size=LABEL_SIZE, align='right')
+    canvas.line(0, y - 11, CONTENT_WIDTH, y - 11, dashed=True)
+    return y - 11
+
+
+def _recibo_sacado(canvas, y, boleto, logo):
+    ''' Desenha o recibo do pagador. Retorna a posição abaixo do recibo '''
+    agencia_conta = "{0} / {1}".format(filters.format_agencia_conta(boleto.agencia),
+                                       filters.format_agencia_conta(boleto.conta_corrente))
+    moeda = filters.format_currency_or_blank
+    data = filters.format_date_or_blank
+
+    y = _cabecalho(canvas, y, boleto, logo, "RECIBO DO PAGADOR", 9)
+    y = _campos(canvas, y, [
+        (5, "Beneficiário", _valor(boleto.cedente), 'left'),
+        (3, "Agência/Conta", agencia_conta, 'right'),
+        (1, "Espécie", _valor(boleto.especie), 'center'),
+        (1, "Quantidade", _valor(boleto.quantidade), 'center'),
+        (2, "Nosso número", _valor(boleto.nosso_numero), 'right'),
+    ])
+    y = _campos(canvas, y, [
+        (2, "Número do documento", _valor(boleto.numero_documento), 'left'),
+        (1, "Contrato", _valor(boleto.contrato), 'left'),
+        (3, "CPF/CEI/CNPJ", _valor(boleto.cpf_cei_cnpj), 'left'),
+        (3, "Vencimento", data(boleto.vencimento), 'center'),
+        (3, "Valor documento", moeda(boleto.valor_documento), 'right'),
+    ])
+    y = _campos(canvas, y, [
+        (2, "(-) Desconto / Abatimento", moeda(boleto.valor_desconto), 'right'),
+        (2, "(-) Outras deduções", moeda(boleto.valor_outras_deducoes), 'right'),
+        (2, "(+) Mora / Multa", moeda(boleto.valor_multa), 'right'),
+        (3, "(+) Outros acréscimos", moeda(boleto.valor_outros_acrescimos), 'right'),
+        (3, "(=) Valor cobrado", moeda(boleto.valor_cobrado), 'right'),
+    ])
+    y = _campos(canvas, y, [(12, "Pagador", _valor(boleto.sacado), 'left')])
+
+    # informações, com pelo menos duas linhas
+    canvas.text(PADDING, y - LABEL_SIZE - 1, "Informações", size=LABEL_SIZE)
+    canvas.text(CONTENT_WIDTH - PADDING, y - LABEL_SIZE - 1, AVISO_TARIFA, size=LABEL_SIZE, align='right')
+    bottom = y - LABEL_SIZE - 3 - LEADING * max(len(boleto.informacoes), 2) - 3
+    _linhas(canvas, PADDING, y - LABEL_SIZE - 3, boleto.informacoes, CONTENT_WIDTH - 2 * PADDING)
+    canvas.line(0, bottom, CONTENT_WIDTH, bottom)
+
+    canvas.text(CONTENT_WIDTH - PADDING, bottom - 8, "Autenticação Mecânica", size=LABEL_SIZE, align='right')
+    return bottom - 12
+
+
+def _ficha_compensacao(canvas, y, boleto, logo):
+    ''' Desenha a ficha de compensação. Retorna a posição abaixo da ficha '''
+    agencia_conta = "{0} / {1}".format(filters.format_agencia_conta(boleto.agencia),
+                                       filters.format_agencia_conta(boleto.conta_corrente))
+    moeda = filters.format_currency_or_blank
+    data = filters.format_date_or_blank
+
+    y = _cabecalho(canvas, y, boleto, logo, boleto.linha_digitavel, 10.5)
+    y = _campos(canvas, y, [
+        (9, "Local de pagamento", _valor(boleto.local_pagamento), 'left'),
+        (3, "Vencimento", data(boleto.vencimento), 'right'),
+    ])
+    y = _campos(canvas, y, [
+        (9, "Beneficiário", _valor(boleto.cedente), 'left'),
+        (3, "Agência/Código cedente", agencia_conta, 'right'),
+    ])
+    y = _campos(canvas, y, [
+        (2, "Data do documento", data(boleto.data_documento), 'center'),
+        (2, "Nº documento", _valor(boleto.numero_documento), 'left'),
+        (2, "Espécie doc.", _valor(boleto.especie_documento), 'center'),
+        (1, "Aceite", _valor(boleto.aceite), 'center'),
+        (2, "Data process.", data(boleto.data_processamento), 'center'),
+        (3, "Nosso número", _valor(boleto.nosso_numero), 'right'),
+    ])
+    y = _campos(canvas, y, [
+        (2, "Uso do banco", "", 'left'),
+        (2, "Carteira", _valor(boleto.carteira), 'center'),
+        (1, "Espécie", _valor(boleto.especie), 'center'),
+        (2, "Quantidade", _valor(boleto.quantidade), 'center'),
+        (2, "x Valor", moeda(boleto.valor_unitario), 'right'),
+        (3, "(=) Valor documento", moeda(boleto.valor_documento), 'right'),
+    ])
+
+    # instruções à esquerda e os valores em quadros à direita
+    valores = [
+        ("(-) Desconto / Abatimento", moeda(boleto.valor_desconto)),
+        ("(-) Outras deduções", moeda(boleto.valor_outras_deducoes)),
+        ("(+) Moras / Multa", moeda(boleto.valor_multa)),
+        ("(+) Outros acréscimos", moeda(boleto.valor_outros_acrescimos)),
+        ("(=) Valor cobrado", ""),
+    ]
+    bottom = y - ROW_HEIGHT * len(valores)
+    x = 9 * COLUMN
+    canvas.line(x, y, x, bottom)
+    for label, value in valores:
+        canvas.text(x + PADDING, y - LABEL_SIZE - 1, label, size=LABEL_SIZE)
+        canvas.text(CONTENT_WIDTH - PADDING, y - ROW_HEIGHT + 4, value, align='right')
+        y -= ROW_HEIGHT
+        canvas.line(x, y, CONTENT_WIDTH, y)
+
+    top = bottom + ROW_HEIGHT * len(valores)
+    canvas.text(PADDING, top - 7, AVISO_TARIFA, FONT_BOLD, LABEL_SIZE)
+    canvas.text(PADDING, top - 14, "Instruções", size=LABEL_SIZE)
+    linhas = (top - 14 - bottom - 3) // LEADING
+    _linhas(canvas, PADDING, top - 14, boleto.instrucoes[:int(linhas)], x - 2 * PADDING)
+    canvas.line(0, bottom, x, bottom)
+    y = bottom
+
+    # pagador e demais linhas do endereço
+    canvas.text(PADDING, y - LABEL_SIZE - 1, "Pagador", size=LABEL_SIZE)
+    y = _linhas(canvas, PADDING, y - LABEL_SIZE - 2, [boleto.sacado] + list(boleto.sacado_extra),
+                CONTENT_WIDTH - 2 * PADDING) - 4
+
+    canvas.text(PADDING, y - 8, "Sacador/Avalista: ", size=LABEL_SIZE)
+    canvas.text(PADDING + text_width("Sacador/Avalista: ", size=LABEL_SIZE), y - 8,
+                _fit(_valor(boleto.sacador_avalista), 8 * COLUMN), size=VALUE_SIZE)
+    canvas.text(9 * COLUMN + PADDING, y - 8, "Cód. baixa", size=LABEL_SIZE)
+    y -= 11
+    canvas.line(0, y, CONTENT_WIDTH, y)
+
+    canvas.barcode(boleto.codigo_barras, 0, y - 4 - BARCODE_HEIGHT)
+    canvas.text(10.5 * COLUMN, y - 8, "FICHA DE COMPENSAÇÃO", FONT_BOLD, LABEL_SIZE, 'center')
+    canvas.text(10.5 * COLUMN, y - 15, "Autenticação Mecânica", size=LABEL_SIZE, align='center')
+    return y - 8 - BARCODE_HEIGHT
+
+
+def layout_boleto(boleto, include_recibo_sacado=True, logo=None):
+    '''
+    Desenha o boleto a partir da origem (0, 0), de cima para baixo.
+    Retorna as operações de desenho e a altura ocupada
+    :rtype: tuple (bytes, float)
+    '''
+    canvas = Canvas()
+    y = 0
+    if include_recibo_sacado:
+        y = _recibo_sacado(canvas, y, boleto, logo)
+        y = _linha_corte(canvas, y) - SPACING
+
+    y = _ficha_compensacao(canvas, y, boleto, logo)
+    y = _linha_corte(canvas, y)
+    return canvas.getvalue(), -y
+
+
+def _image_xobject(asset):
+    '''
+    Retorna o dicionário e os dados do XObject da imagem ou None quando o
+    formato não é suportado. Imagens JPEG são incluídas sem conversão; PNGs
+    sem transparência, sem entrelaçamento e com 8 bits reaproveitam os dados
+    já comprimidos
+    '''
+    data = asset.data
+    width, height = asset.size or (0, 0)
+
+    if data[:2] == b'\xff\xd8':
+        frame = jpeg_frame(data)
+        colorspace = {1: '/DeviceGray', 3: '/DeviceRGB', 4: '/DeviceCMYK'}.get(frame and frame[2])
+        if colorspace:
+            return ("/Type /XObject /Subtype /Image /Width {0} /Height {1} /ColorSpace {2} "
+                    "/BitsPerComponent 8 /Filter /DCTDecode".format(width, height, colorspace)), data
+
+    elif data[:8] == b'\x89PNG\r\n\x1a\n':
+        depth, color_type, _, _, interlace = struct.unpack('>BBBBB', data[24:29])
+        colors = {0: 1, 2: 3}.get(color_type)
+        if depth == 8 and colors and not interlace:
+            idat = []
+            pos = 8
+            while pos + 8 <= len(data):
+                length, kind = struct.unpack('>I4s', data[pos:pos + 8])
+                if kind == b'IDAT':
+                    idat.append(data[pos + 8:pos + 8 + length])
+                pos += length + 12
+
+            return ("/Type /XObject /Subtype /Image /Width {0} /Height {1} /ColorSpace {2} "
+                    "/BitsPerComponent 8 /Filter /FlateDecode "
+                    "/DecodeParms << /Predictor 15 /Colors {3} /BitsPerComponent 8 /Columns {0} >>").format(
+                        width, height, '/DeviceGray' if colors == 1 else '/DeviceRGB', colors), b"".join(idat)
+
+    return None
+
+
+class PdfWriter(object):
+    '''
+    Escreve um documento PDF em `fp` (binário), página a página.
+    As fontes e imagens são compartilhadas por todas as páginas
+    '''
+
+    def __init__(self, fp):
+        self._fp = fp
+        self._offset = 0
+        self._offsets = {}
+        self._next_id = 1
+        self._pages = []
+        self._images = {}
+        self._xobjects = []
+
+        self._catalog_id = self._reserve()
+        self._pages_id = self._reserve()
+        self._resources_id = self._reserve()
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def _reserve(self):
+        obj_id = self._next_id
+        self._next_id += 1
+        return obj_id
+
+    def _write(self, data):
+        self._fp.write(data)
+        self._offset += len(data)
+
+    def _object(self, data, obj_id=None):
+        obj_id = obj_id or self._reserve()
+        self._offsets[obj_id] = self._offset
+        self._write("{0} 0 obj\n".format(obj_id).encode('ascii') + data.encode('ascii') + b"\nendobj\n")
+        return obj_id
+
+    def _stream(self, dictionary, data):
+        obj_id = self._reserve()
+        self._offsets[obj_id] = self._offset
+        self._write("{0} 0 obj\n<< {1} /Length {2} >>\nstream\n".format(obj_id, dictionary, len(data)).encode('ascii'))
+        self._write(data)
+        self._write(b"\nendstream\nendobj\n")
+        return obj_id
+
+    def add_image(self, path, height=LOGO_HEIGHT):
+        '''
+        Inclui a imagem (ver `asset_cache`) no documento uma única vez.
+        Retorna a `Image` a ser desenhada ou None quando não for possível incluí-la
+        :rtype: Image|None
+        '''
+        if path in self._images:
+            return self._images[path]
+
+        image = None
+        asset = asset_cache.get(path) if path else None
+        xobject = _image_xobject(asset) if asset and asset.size else None
+        if xobject:
+            name = "Im{0}".format(len(self._xobjects))
+            self._xobjects.append((name, self._stream(*xobject)))
+
+            width, image_height = asset.size
+            image = Image(name, float(height) * width / image_height, height)
+
+        self._images[path] = image
+        return image
+
+    def add_page(self, content):
+        ''' Adiciona uma página com as operações de desenho `content` '''
+        content_id = self._stream("/Filter /FlateDecode", zlib.compress(content))
+        self._pages.append(self._object(
+            "<< /Type /Page /Parent {0} 0 R /MediaBox [0 0 {1} {2}] /Resources {3} 0 R /Contents {4} 0 R >>".format(
+                self._pages_id, _num(PAGE_WIDTH), _num(PAGE_HEIGHT), self._resources_id, content_id)))
+
+    def close(self):
+        ''' Escreve os recursos compartilhados, a árvore de páginas e a tabela de referências '''
+        fonts = []
+        for name, base_font in _FONTS:
+            font_id = self._object("<< /Type /Font /Subtype /Type1 /BaseFont /{0} "
+                                   "/Encoding /WinAnsiEncoding >>".format(base_font))
+            fonts.append("/{0} {1} 0 R".format(name, font_id))
+
+        xobjects = " ".join("/{0} {1} 0 R".format(name, obj_id) for name, obj_id in self._xobjects)
+        self._object("<< /Font << {0} >> /XObject << {1} >> >>".format(" ".join(fonts), xobjects),
+                     self._resources_id)
+        self._object("<< /Type /Pages /Kids [{0}] /Count {1} >>".format(
+            " ".join("{0} 0 R".format(page) for page in self._pages), len(self._pages)), self._pages_id)
+        self._object("<< /Type /Catalog /Pages {0} 0 R >>".format(self._pages_id), self._catalog_id)
+
+        xref = self._offset
+        entries = ["xref\n0 {0}\n0000000000 65535 f \n".format(self._next_id)]
+        entries.extend("{0:010d} 00000 n \n".format(self._offsets[obj_id]) for obj_id in range(1, self._next_id))
+        entries.append("trailer\n<< /Size {0} /Root {1} 0 R >>\nstartxref\n{2}\n%%EOF\n".format(
+            self._next_id, self._catalog_id, xref))
+        self._write("".join(entries).encode('ascii'))
+
+
+def write_pdf(boletos, fp, include_recibo_sacado=True):
+    '''
+    Escreve um único documento PDF com os boletos em `fp` (binário).
+    `boletos` pode ser qualquer iterável, inclusive um generator: cada
+    página é escrita assim que estiver completa. Os boletos são
+    posicionados um abaixo do outro, enquanto couberem na página
+    '''
+    writer = PdfWriter(fp)
+    page = []
+    top = PAGE_HEIGHT - MARGIN
+
+    for boleto in boletos:
+        logo = writer.add_image(type(boleto)._logo)
+        content, height = layout_boleto(boleto, include_recibo_sacado, logo)
+
+        if page and top - height < MARGIN:
+            writer.add_page(b"\n".join(page))
+            page = []
+            top = PAGE_HEIGHT - MARGIN
+
+        page.append("q 1 0 0 1 {0} {1} cm\n".format(_num(MARGIN), _num(top)).encode('ascii') + content + b"\nQ")
+        top -= height + SPACING
+
+    if page:
+        writer.add_page(b"\n".join(page))
+    writer.close()
+
+
+def render_pdf(boletos, include_recibo_sacado=True):
+    '''
+    Gera um único documento PDF com os boletos (ver `write_pdf`)
+    :rtype: bytes
+    '''
+    fp = io.BytesIO()
+    write_pdf(boletos, fp, include_recibo_sacado)
+    return fp.getvalue()
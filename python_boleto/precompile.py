@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+# This file is part of Python Boleto.
+#
+# Copyright (c) 2016, Rockho Team. All rights reserved.
+# Author: Christian Hess
+#
+# This source code is licensed under the AGPLv3 license found in the
+# LICENSE file in the root directory of this source tree.
+'''
+Pré-compilação dos templates em módulos Python.
+
+Os templates do pacote são pré-compilados na instalação (ver setup.py) e
+carregados pelo ambiente com um `jinja2.ModuleLoader`: o primeiro render
+de um processo não precisa interpretar o código fonte dos templates.
+
+Templates próprios também podem ser pré-compilados e registrados:
+
+    python -m python_boleto.precompile -o /path/to/compiled --templates /path/to/my/templates
+
+    environment.register_loader(ModuleLoader('/path/to/compiled'))
+
+Uso:
+    python -m python_boleto.precompile            # templates do pacote
+'''
+from __future__ import unicode_literals
+
+import argparse
+import glob
+import io
+import os
+import sys
+
+from . import environment
+
+DEFAULT_EXTENSIONS = ('jinja',)
+
+
+def compile_templates(target=None, loaders=(), extensions=DEFAULT_EXTENSIONS, zip=None):
+    '''
+    Compila os templates do pacote e os de `loaders` em `target` (por
+    padrão, `environment.COMPILED_DIR`), um módulo Python por template.
+    Com `zip` ('deflated' ou 'stored') o resultado é um arquivo zip.
+    Lança exceção quando algum template não puder ser compilado
+    :rtype: int (quantidade de templates compilados)
+    '''
+    import jinja2
+
+    target = target or environment.COMPILED_DIR
+    env = environment._build_environment(loaders, compiled=False)
+    names = env.list_templates(extensions=extensions)
+
+    # remove os templates compilados anteriormente
+    if zip is None:
+        for path in glob.glob(os.path.join(target, 'tmpl_*.py')):
+            os.remove(path)
+
+    env.compile_templates(target, extensions=extensions, zip=zip, ignore_errors=False)
+
+    # a versão do Jinja precisa ser a mesma no carregamento (ver `environment._compiled_loader`)
+    if zip is None:
+        with io.open(os.path.join(target, environment.COMPILED_VERSION_FILE), 'w', encoding='utf-8') as fp:
+            fp.write(jinja2.__version__)
+
+    return len(names)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m python_boleto.precompile',
+                                     description='Pré-compila os templates dos boletos em módulos Python')
+    parser.add_argument('-o', '--output', help='diretório de destino (padrão: templates pré-compilados do pacote)')
+    parser.add_argument('--templates', action='append', default=[],
+                        help='diretório com templates próprios (pode ser repetido)')
+    parser.add_argument('--zip', action='store_true', help='gera um arquivo zip em vez de um diretório')
+    args = parser.parse_args(argv)
+
+    from jinja2 import FileSystemLoader
+
+    count = compile_templates(args.output, [FileSystemLoader(path) for path in args.templates],
+                              zip='deflated' if args.zip else None)
+    sys.stderr.write("{0} templates compilados em {1}\n".format(count, args.output or environment.COMPILED_DIR))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+# This file is part of Python Boleto.
+#
+# Copyright (c) 2016, Rockho Team. All rights reserved.
+# Author: Christian Hess
+#
+# This source code is licensed under the AGPLv3 license found in the
+# LICENSE file in the root directory of this source tree.
+'''
+Representação compacta dos dados de um boleto.
+
+Os registros utilizam `__slots__` (sem `__dict__` por instância), guardam
+os valores em centavos (int), as datas como ordinais (int, 0 quando não
+informada) e as listas como tuplas. São comparáveis e hashable, podendo
+ser utilizados em sets e dicionários (ex: deduplicação).
+'''
+from __future__ import unicode_literals
+
+import datetime
+from decimal import Decimal
+
+# campos monetários, guardados em centavos
+DECIMAL_FIELDS = ('valor_unitario', 'valor_documento', 'valor_desconto', 'valor_outras_deducoes',
+                  'valor_multa', 'valor_outros_acrescimos', 'valor_cobrado')
+
+# campos do tipo data, guardados como ordinais
+DATE_FIELDS = ('vencimento', 'data_documento', 'data_processamento')
+
+# campos do tipo lista, guardados como tuplas
+LIST_FIELDS = ('instrucoes', 'sacado_extra', 'informacoes')
+
+CENTS = Decimal(100)
+
+
+def to_cents(value):
+    '''
+    Converte um valor monetário em centavos
+    :rtype: int
+    '''
+    cents = Decimal(value) * CENTS
+    if cents != cents.to_integral_value():
+        raise ValueError("o valor {0} possui mais de 2 casas decimais".format(value))
+    return int(cents)
+
+
+def from_cents(value):
+    '''
+    Converte centavos em um valor monetário
+    :rtype: Decimal
+    '''
+    return Decimal(value).scaleb(-2)
+
+
+def to_ordinal(value):
+    '''
+    Converte uma data em ordinal, 0 quando não informada
+    :rtype: int
+    '''
+    if value is None:
+        return 0
+    # o ordinal não guarda o horário: datetimes não voltariam iguais do registro
+    if isinstance(value, datetime.datetime):
+        raise ValueError("a data {0} possui horário, utilize datetime.date".format(value))
+    return value.toordinal()
+
+
+def from_ordinal(value):
+    ''' Converte um ordinal em data, None quando 0 '''
+    if not value:
+        return None
+    return datetime.date.fromordinal(value)
+
+
+class BoletoRecord(object):
+    '''
+    Registro compacto com os dados de um `Boleto`
+    '''
+    __slots__ = ('num_sequencial', 'vencimento', 'data_documento', 'numero_documento',
+                 'especie_documento', 'aceite', 'data_processamento', 'especie', 'quantidade',
+                 'valor_unitario', 'valor_documento', 'instrucoes', 'valor_desconto',
+                 'valor_outras_deducoes', 'valor_multa', 'valor_outros_acrescimos', 'valor_cobrado',
+                 'sacado', 'sacado_extra', 'cpf_cei_cnpj', 'sacador_avalista', 'local_pagamento',
+                 'cedente', 'agencia', 'conta_corrente', 'carteira', 'contrato', 'informacoes')
+
+    def __init__(self, **kwargs):
+        '''
+        Inicializa o registro com valores já convertidos (centavos, ordinais e tuplas)
+        '''
+        for name in self.fields():
+            setattr(self, name, kwargs.pop(name, None))
+
+        if kwargs:
+            raise TypeError("campos inválidos: {0}".format(", ".join(sorted(kwargs))))
+
+    @classmethod
+    def fields(cls):
+        ''' Retorna os nomes de todos os campos do registro '''
+        fields = []
+        for klass in reversed(cls.__mro__):
+            fields.extend(getattr(klass, '__slots__', ()))
+        return fields
+
+    @classmethod
+    def from_boleto(cls, boleto):
+        ''' Cria o registro a partir de um boleto '''
+        record = cls.__new__(cls)
+
+        for name in cls.fields():
+            value = getattr(boleto, name)
+
+            if name in DECIMAL_FIELDS:
+                value = to_cents(value)
+            elif name in DATE_FIELDS:
+                value = to_ordinal(value)
+            elif name in LIST_FIELDS:
+                value = tuple(value or ())
+
+            setattr(record, name, value)
+
+        return record
+
+    def to_boleto(self, boleto_class):
+        ''' Cria uma instância de `boleto_class` com os dados do registro '''
+        data = {}
+
+        for name in self.fields():
+            value = getattr(self, name)
+
+            if name in DECIMAL_FIELDS:
+                value = from_cents(value)
+            elif name in DATE_FIELDS:
+                value = from_ordinal(value)
+            elif name in LIST_FIELDS:
+                value = list(value)
+
+            data[name] = value
+
+        # os valores do registro já estão nos tipos corretos
+        return boleto_class.from_trusted(**data)
+
+    def _values(self):
+        return tuple(getattr(self, name) for name in self.fields())
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self._values() == other._values()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self._values())
+
+    def __getstate__(self):
+        return self._values()
+
+    def __setstate__(self, state):
+        for name, value in zip(self.fields(), state):
+            setattr(self, name, value)
+
+    def __repr__(self):
+        return "{0}(num_sequencial={1!r})".format(type(self).__name__, self.num_sequencial)
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+# This file is part of Python Boleto.
+#
+# Copyright (c) 2016, Rockho Team. All rights reserved.
+# Author: Christian Hess
+#
+# This source code is licensed under the AGPLv3 license found in the
+# LICENSE file in the root directory of this source tree.
+'''
+Geração de documentos com vários boletos e render em streaming.
+
+Os documentos são gerados em partes (ver `jinja2.Template.generate`), boleto
+a boleto, e podem ser escritos diretamente em arquivos, sockets ou utilizados
+como resposta WSGI sem que o documento inteiro seja montado em memória.
+
+O render é thread-safe: o ambiente Jinja, os templates compilados e os
+logos em cache são compartilhados somente para leitura (alterações, como
+`environment.register_filter`, criam um novo ambiente sem afetar os renders
+em andamento) e cada boleto possui os seus próprios campos. Uma mesma
+instância de boleto não deve ser alterada enquanto é renderizada.
+'''
+from __future__ import unicode_literals
+
+from concurrent.futures import ThreadPoolExecutor
+import itertools
+
+from . import environment
+from .assets import logo_symbol
+from .base import Boleto
+
+# quantidade mínima de caracteres acumulados antes de cada escrita
+BUFFER_SIZE = 16 * 1024
+
+
+def _carne_items(boletos, include_recibo_sacado, static_url, barcode, styles_templates):
+    '''
+    Gera o HTML de cada boleto do carnê, junto com os estilos e logos que
+    ainda não foram incluídos no documento
+    '''
+    classes = set()
+    styles_templates = set(styles_templates)
+    logos = {}
+
+    for boleto in boletos:
+        cls = type(boleto)
+        item = {'styles_templates': [], 'logos': []}
+
+        if cls not in classes:
+            if not cls._template_boleto:
+                raise NotImplementedError("{0} não suporta a geração de carnês".format(cls.__name__))
+            classes.add(cls)
+
+            if cls._template_styles and cls._template_styles not in styles_templates:
+                styles_templates.add(cls._template_styles)
+                item['styles_templates'].append(cls._template_styles)
+
+            if cls._logo not in logos:
+                logos[cls._logo] = logo_symbol(cls._logo, len(logos)) if cls._logo else None
+                if logos[cls._logo]:
+                    item['logos'].append(logos[cls._logo])
+
+        context = boleto.get_render_context(include_recibo_sacado, static_url, barcode)
+
+        logo = logos[cls._logo]
+        if logo:
+            context['logo'] = logo
+            context.pop('logo_base64', None)
+
+        item['html'] = environment.get_template(cls._template_boleto).render(**context)
+        yield item
+
+
+def stream_carne(boletos, per_page=3, include_recibo_sacado=True, static_url=None, barcode='svg'):
+    '''
+    Gera, em partes, um único documento HTML (carnê) com vários boletos.
+    Os estilos, scripts e logos são incluídos uma única vez no documento.
+    `boletos` pode ser qualquer iterável, inclusive um generator: os boletos
+    são consumidos e gerados um a um.
+    :param: per_page quantidade de boletos por página impressa
+    :rtype: generator
+    '''
+    if per_page < 1:
+        raise ValueError("per_page deve ser maior que zero")
+
+    boletos = iter(boletos)
+
+    # os estilos do primeiro boleto são incluídos no cabeçalho do documento
+    styles_templates = []
+    for first in boletos:
+        if type(first)._template_styles:
+            styles_templates.append(type(first)._template_styles)
+        boletos = itertools.chain([first], boletos)
+        break
+
+    template = environment.get_template('carne.jinja')
+    items = _carne_items(boletos, include_recibo_sacado, static_url, barcode, styles_templates)
+    return template.generate(boletos=items,
+                             styles_templates=styles_templates,
+                             per_page=per_page,
+                             barcode=barcode)
+
+
+def render_carne(boletos, per_page=3, include_recibo_sacado=True, static_url=None, barcode='svg'):
+    '''
+    Gera um único documento HTML (carnê) com vários boletos (ver `stream_carne`)
+    :rtype: string
+    '''
+    return "".join(stream_carne(boletos, per_page, include_recibo_sacado, static_url, barcode))
+
+
+def stream_html(source, **kwargs):
+    '''
+    Gera, em partes, o HTML de um boleto ou o carnê de um iterável de boletos.
+    Os demais argumentos são repassados para `Boleto.stream_html` ou `stream_carne`
+    :rtype: generator
+    '''
+    if isinstance(source, Boleto):
+        return source.stream_html(**kwargs)
+    return stream_carne(source, **kwargs)
+
+
+def _buffered(chunks, buffer_size):
+    ''' Agrupa as partes geradas pelo template em blocos de pelo menos `buffer_size` caracteres '''
+    buf = []
+    size = 0
+    for chunk in chunks:
+        buf.append(chunk)
+        size += len(chunk)
+        if size >= buffer_size:
+            yield "".join(buf)
+            buf = []
+            size = 0
+
+    if buf:
+        yield "".join(buf)
+
+
+def iter_html(source, encoding=None, buffer_size=BUFFER_SIZE, **kwargs):
+    '''
+    Retorna um iterável com o HTML de um boleto ou do carnê de vários boletos,
+    em blocos. Com `encoding`, os blocos são retornados em bytes, podendo
+    ser utilizado como resposta WSGI.
+    :rtype: generator
+    '''
+    chunks = _buffered(stream_html(source, **kwargs), buffer_size)
+    if encoding:
+        return (chunk.encode(encoding) for chunk in chunks)
+    return chunks
+
+
+def write_html(source, fp, encoding=None, buffer_size=BUFFER_SIZE, **kwargs):
+    '''
+    Escreve o HTML de um boleto ou do carnê de vários boletos em `fp`
+    (arquivo, `socket.makefile`, etc.), sem montar o documento em memória.
+    Com `encoding`, os dados são escritos em bytes.
+    '''
+    for chunk in iter_html(source, encoding, buffer_size, **kwargs):
+        fp.write(chunk)
+
+
+def render_many(boletos, max_workers=None, **kwargs):
+    '''
+    Gera o HTML de vários boletos em paralelo, utilizando um pool de threads.
+    Os demais argumentos são repassados para `Boleto.export_html`.
+    :rtype: list (na mesma ordem de `boletos`)
+    '''
+    with ThreadPoolExecutor(max_workers=max_workers or 4) as executor:
+        return list(executor.map(lambda boleto: boleto.export_html(**kwargs), boletos))
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+# This file is part of Python Boleto.
+#
+# Copyright (c) 2016, Rockho Team. All rights reserved.
+# Author: Christian Hess
+#
+# This source code is licensed under the AGPLv3 license found in the
+# LICENSE file in the root directory of this source tree.
+'''
+Distribuição de números sequenciais (`num_sequencial`) entre processos e threads.
+
+O próximo número de cada sequência fica em um banco SQLite local. Cada
+processo reserva blocos contíguos de números em uma única transação e os
+distribui entre as suas threads sem acessar o banco, de modo que milhares
+de números são obtidos com um único lock do arquivo.
+
+Os números nunca se repetem. Cada bloco é maior que todos os blocos
+reservados antes dele, mas blocos de processos diferentes podem ser
+utilizados ao mesmo tempo. Os números de um bloco que não forem
+utilizados (ex: o processo terminou) são descartados.
+'''
+from __future__ import unicode_literals
+
+import sqlite3
+import threading
+
+from six.moves import range
+
+# o número sequencial do nosso número possui 9 algarismos
+NUM_SEQUENCIAL_MAX = 999999999
+DEFAULT_BLOCK_SIZE = 1000
+DEFAULT_TIMEOUT = 30
+
+
+class SequenceAllocator(object):
+    '''
+    Distribui os números da sequência `name` (ex: o convênio ou a conta
+    corrente do beneficiário) armazenada no banco SQLite `path`.
+    Pode ser compartilhado entre threads; cada processo deve criar o seu.
+    Lança ValueError quando os números até `maximum` se esgotarem
+    '''
+
+    def __init__(self, path, name='', block_size=DEFAULT_BLOCK_SIZE, start=1, maximum=NUM_SEQUENCIAL_MAX,
+                 timeout=DEFAULT_TIMEOUT):
+        if block_size < 1:
+            raise ValueError("block_size deve ser maior que zero")
+
+        self.path = path
+        self.name = name
+        self.block_size = block_size
+        self.start = start
+        self.maximum = maximum
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        self._next = 0
+        self._end = 0
+
+        conn = self._connect()
+        try:
+            conn.execute('CREATE TABLE IF NOT EXISTS sequencias (nome TEXT PRIMARY KEY, proximo INTEGER NOT NULL)')
+        finally:
+            conn.close()
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+
+    def allocate(self, size=None):
+        '''
+        Reserva um bloco de até `size` números (por padrão `block_size`)
+        diretamente no banco. O último bloco da sequência pode ser menor
+        :rtype: range
+        '''
+        size = size or self.block_size
+        conn = self._connect()
+        try:
+            # BEGIN IMMEDIATE bloqueia a escrita por outros processos até o COMMIT
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute('SELECT proximo FROM sequencias WHERE nome = ?', (self.name,)).fetchone()
+            inicio = max(row[0], self.start) if row else self.start
+
+            fim = min(inicio + size, self.maximum + 1)
+            if fim <= inicio:
+                conn.execute('ROLLBACK')
+                raise ValueError("a sequência {0!r} está esgotada (máximo {1})".format(self.name, self.maximum))
+
+            conn.execute('INSERT OR REPLACE INTO sequencias (nome, proximo) VALUES (?, ?)', (self.name, fim))
+            conn.execute('COMMIT')
+        finally:
+            conn.close()
+
+        return range(inicio, fim)
+
+    def next(self):
+        '''
+        Retorna o próximo número, reservando um novo bloco quando necessário
+        :rtype: int
+        '''
+        with self._lock:
+            if self._next >= self._end:
+                block = self.allocate()
+                self._next, self._end = block[0], block[-1] + 1
+
+            value = self._next
+            self._next += 1
+            return value
+
+    __next__ = next
+
+    def __iter__(self):
+        return self
+
+    def take(self, count):
+        '''
+        Retorna `count` números, em ordem crescente
+        :rtype: list
+        '''
+        numbers = []
+        with self._lock:
+            while len(numbers) < count:
+                if self._next >= self._end:
+                    block = self.allocate(max(self.block_size, count - len(numbers)))
+                    self._next, self._end = block[0], block[-1] + 1
+
+                end = min(self._end, self._next + count - len(numbers))
+                numbers.extend(range(self._next, end))
+                self._next = end
+        return numbers
+
+    def assign(self, boletos):
+        '''
+        Atribui o `num_sequencial` dos boletos informados
+        :rtype: list (os boletos)
+        '''
+        boletos = list(boletos)
+        for boleto, num_sequencial in zip(boletos, self.take(len(boletos))):
+            boleto.num_sequencial = num_sequencial
+        return boletos
@@ -6,6 +6,14 @@
 #
 # This source code is licensed under the AGPLv3 license found in the
 # LICENSE file in the root directory of this source tree.
+from collections import OrderedDict
+import re
+import threading
+
+import six
+
+# NumPy é importado apenas no primeiro cálculo em lote (ver get_numpy)
+_numpy = False
 
 
 def modulo10gen(num):
@@ -33,28 +41,55 @@ def modulo11gen(num):
         num = num - 1
 
 
+def _tabela_pesos(pesos, reduzir=False):
+    '''
+    Pré-calcula, para cada posição (da direita para a esquerda), o produto
+    de cada algarismo pelo peso da posição. Com `reduzir` os 2 algarismos
+    de produtos maiores que 9 são somados (ex: 7*2 = 14 -> 1+4 = 5)
+    '''
+    tabela = []
+    for peso in pesos:
+        produtos = dict((str(a), a * peso) for a in range(10))
+        if reduzir:
+            produtos = dict((a, p - 9 if p >= 10 else p) for a, p in produtos.items())
+        tabela.append(produtos)
+    return tuple(tabela)
+
+
+# tamanho máximo dos valores cobertos pelas tabelas pré-calculadas
+_TAMANHO_TABELAS = 64
+
+# pesos do modulo 10: 2,1,2,1... e do modulo 11: 2,3,4,5,6,7,8,9,2,3...
+_MODULO10_TABELA = _tabela_pesos(modulo10gen(_TAMANHO_TABELAS), reduzir=True)
+_MODULO11_TABELA = _tabela_pesos(modulo11gen(_TAMANHO_TABELAS))
+
+
+# apenas os algarismos ASCII: str.isdigit() também aceita outros algarismos Unicode (ex: '²')
+_NAO_DIGITOS = re.compile('[^0-9]')
+
+
+def _somente_digitos(value):
+    ''' Retorna apenas os algarismos de `value` '''
+    return _NAO_DIGITOS.sub('', value)
+
+
+def _soma_ponderada(algarismos, tabela, gen, reduzir=False):
+    ''' Soma os produtos dos algarismos pelos pesos, da direita para a esquerda '''
+    if len(algarismos) > len(tabela):
+        tabela = _tabela_pesos(gen(len(algarismos)), reduzir)
+    return sum([produtos[a] for produtos, a in zip(tabela, algarismos[::-1])])
+
+
 def modulo10(value):
     '''
     Calcula o módulo 10 para o valor informado
     :type: value string
     :param: value Valor a ser obtido o múdulo 10, ex: 32361237
     '''
+    total = _soma_ponderada(_somente_digitos(value), _MODULO10_TABELA, modulo10gen, True)
 
-    algarismos = [int(a) for a in value if a.isdigit()]
-    modulo10_multipliers = list(reversed(list(modulo10gen(len(algarismos)))))
-
-    total = []
-    for i in range(len(algarismos)):
-        parcial = algarismos[i] * modulo10_multipliers[i]
-
-        if parcial >= 10:
-            # resultados com 9 digitos deve-se somar os 2 algarismos
-            # ex: 15 -> 1+5 = 6   ou 15-9=6 
-            parcial = parcial - 9 
-
-        total.append(parcial)
-    
-    return 10 - (sum(total) % 10)
+    # o DV é 0 quando a soma for múltipla de 10
+    return (10 - (total % 10)) % 10
 
 
 def modulo11(value):
@@ -63,14 +98,7 @@ def modulo11(value):
     :type: value string
     :param: value valor a ser obtido o módulo 11, ex: 38213216274752997
     '''
-    algarismos = [int(a) for a in value if a.isdigit()]
-    modulo11_multipliers = list(reversed(list(modulo11gen(len(algarismos)))))
-
-    total = []
-    for i in range(len(algarismos)):
-        total.append(algarismos[i] * modulo11_multipliers[i])
-        
-    resto = sum(total) % 11
+    resto = _soma_ponderada(_somente_digitos(value), _MODULO11_TABELA, modulo11gen) % 11
 
     # padrão é 1 quando resto for 0 ou 1
     if resto in (0, 1):
@@ -78,3 +106,153 @@ def modulo11(value):
     else:
     # se não for, o dv será 11-resto
         return 11 - resto
+
+
+def get_numpy():
+    '''
+    Retorna o módulo NumPy, importado na primeira chamada,
+    ou None quando não estiver instalado
+    '''
+    global _numpy
+    if _numpy is False:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        _numpy = numpy
+    return _numpy
+
+
+def _digitos_array(values):
+    '''
+    Converte `values` em um array NumPy 2-D de algarismos (uma linha por valor).
+    Retorna None quando não for possível (NumPy indisponível, valores com
+    tamanhos diferentes ou com caracteres que não são algarismos).
+    '''
+    numpy = get_numpy()
+    if numpy is None:
+        return None
+
+    if isinstance(values, numpy.ndarray) and values.dtype.kind not in 'US':
+        return values.reshape(1, -1) if values.ndim == 1 else values
+
+    values = [six.text_type(v) for v in values]
+    if not values or not values[0]:
+        return None
+
+    size = len(values[0])
+    joined = "".join(values)
+    if len(joined) != size * len(values) or _NAO_DIGITOS.search(joined):
+        return None
+
+    digits = numpy.frombuffer(joined.encode('ascii'), dtype=numpy.uint8)
+
+    return (digits - ord('0')).reshape(len(values), size)
+
+
+def modulo10_many(values):
+    '''
+    Calcula o módulo 10 de vários valores de uma só vez
+    :type: values list|numpy.ndarray
+    :param: values sequência de strings ou array NumPy 2-D de algarismos (um valor por linha)
+    :rtype: list|numpy.ndarray
+    '''
+    numpy = get_numpy()
+    if numpy is None or not isinstance(values, numpy.ndarray):
+        values = list(values)
+
+    digits = _digitos_array(values)
+    if digits is None:
+        return [modulo10(v) for v in values]
+
+    pesos = numpy.array(list(modulo10gen(digits.shape[1]))[::-1], dtype=numpy.int64)
+    parciais = digits.astype(numpy.int64) * pesos
+    parciais -= (parciais >= 10) * 9
+    dvs = (10 - (parciais.sum(axis=1) % 10)) % 10
+
+    return dvs if isinstance(values, numpy.ndarray) else dvs.tolist()
+
+
+def modulo11_many(values):
+    '''
+    Calcula o módulo 11 de vários valores de uma só vez
+    :type: values list|numpy.ndarray
+    :param: values sequência de strings ou array NumPy 2-D de algarismos (um valor por linha)
+    :rtype: list|numpy.ndarray
+    '''
+    numpy = get_numpy()
+    if numpy is None or not isinstance(values, numpy.ndarray):
+        values = list(values)
+
+    digits = _digitos_array(values)
+    if digits is None:
+        return [modulo11(v) for v in values]
+
+    pesos = numpy.array(list(modulo11gen(digits.shape[1]))[::-1], dtype=numpy.int64)
+    restos = digits.astype(numpy.int64).dot(pesos) % 11
+    dvs = numpy.where(restos <= 1, 1, 11 - restos)
+
+    return dvs if isinstance(values, numpy.ndarray) else dvs.tolist()
+
+
+class cached_property(object):
+    '''
+    Decorator de propriedade calculada uma única vez por instância.
+    O valor fica armazenado no `__dict__` da instância e deve ser descartado
+    quando algum dos atributos em `depends_on` for alterado (ver `Boleto.__setattr__`).
+    '''
+
+    def __init__(self, *depends_on):
+        self.depends_on = depends_on
+        self.func = None
+        self.name = None
+
+    def __call__(self, func):
+        self.func = func
+        self.name = func.__name__
+        self.__doc__ = func.__doc__
+        return self
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+
+        value = instance.__dict__[self.name] = self.func(instance)
+        return value
+
+
+class LRUCache(object):
+    '''
+    Cache limitado aos `maxsize` itens utilizados mais recentemente.
+    Pode ser compartilhado entre threads
+    '''
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._data.pop(key)
+            except KeyError:
+                return default
+
+            # reinsere o item como o mais recente
+            self._data[key] = value
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = value
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
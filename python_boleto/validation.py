@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+# This file is part of Python Boleto.
+#
+# Copyright (c) 2016, Rockho Team. All rights reserved.
+# Author: Christian Hess
+#
+# This source code is licensed under the AGPLv3 license found in the
+# LICENSE file in the root directory of this source tree.
+'''
+Validação dos boletos a partir de um schema declarativo.
+
+Cada classe de boleto declara os seus campos em `_schema`. O schema é
+compilado uma única vez por classe em uma lista de funções de validação,
+utilizadas por `Boleto.validate` (primeiro erro), `Boleto.get_errors`
+(todos os erros) e `validate_many` (todos os erros de vários boletos).
+'''
+from __future__ import unicode_literals
+
+import datetime
+from decimal import Decimal
+
+import six
+
+# mensagens de erro para os valores mínimos mais comuns
+_MIN_VALUE_MESSAGES = {
+    0: "{0} deve maior ou igual a zero",
+    1: "{0} deve maior que zero",
+}
+
+
+class Field(object):
+    '''
+    Campo do schema. `compile` retorna uma função que recebe o valor do
+    campo e retorna a exceção correspondente ao erro ou None quando válido
+    '''
+
+    def __init__(self, name):
+        self.name = name
+
+    def compile(self):
+        raise NotImplementedError()
+
+
+class TypedField(Field):
+    ''' Campo que deve ser do tipo `types`, opcionalmente aceitando None '''
+    types = ()
+    message = "{0} deve ser do tipo {1}"
+    type_name = ''
+
+    def __init__(self, name, required=True):
+        super(TypedField, self).__init__(name)
+        self.required = required
+
+    def compile(self):
+        types = self.types
+        required = self.required
+        message = self.message.format(self.name, self.type_name)
+
+        def check(value):
+            if not isinstance(value, types) and (required or value is not None):
+                return TypeError(message)
+
+        return check
+
+
+class IntegerField(TypedField):
+    types = six.integer_types
+    message = "{0} deve ser um inteiro"
+
+    def __init__(self, name, min_value=None):
+        super(IntegerField, self).__init__(name)
+        self.min_value = min_value
+
+    def compile(self):
+        check_type = super(IntegerField, self).compile()
+        min_value = self.min_value
+        if min_value is None:
+            return check_type
+
+        message = _MIN_VALUE_MESSAGES.get(min_value, "{0} deve ser maior ou igual a {1}")
+        message = message.format(self.name, min_value)
+
+        def check(value):
+            error = check_type(value)
+            if error is None and value < min_value:
+                return ValueError(message)
+            return error
+
+        return check
+
+
+class DateField(TypedField):
+    types = datetime.date
+    type_name = 'data'
+
+
+class DecimalField(TypedField):
+    types = Decimal
+    type_name = 'Decimal'
+
+
+class StringField(TypedField):
+    types = six.string_types
+    message = "{0} deve ser uma string"
+
+
+class ListField(TypedField):
+    ''' Lista opcional: valores vazios são aceitos '''
+    types = list
+    type_name = 'list'
+
+    def compile(self):
+        message = self.message.format(self.name, self.type_name)
+
+        def check(value):
+            if value and not isinstance(value, list):
+                return TypeError(message)
+
+        return check
+
+
+class RequiredStringField(Field):
+    ''' String que deve obrigatoriamente ser informada '''
+
+    def compile(self):
+        message = "{0} deve obrigatoriamente informado".format(self.name)
+
+        def check(value):
+            if not value or not isinstance(value, six.string_types):
+                return ValueError(message)
+
+        return check
+
+
+# validadores compilados de cada classe
+_validators = {}
+
+
+def get_validator(cls):
+    '''
+    Retorna o schema da classe compilado: uma tupla de (nome do campo, função de validação)
+    :rtype: tuple
+    '''
+    validator = _validators.get(cls)
+    if validator is None:
+        validator = _validators[cls] = tuple((field.name, field.compile()) for field in cls._schema)
+    return validator
+
+
+def get_errors(boleto):
+    '''
+    Retorna todos os erros do boleto, na ordem do schema
+    :rtype: list
+    '''
+    errors = []
+    for name, check in get_validator(type(boleto)):
+        error = check(getattr(boleto, name))
+        if error is not None:
+            errors.append(error)
+    return errors
+
+
+def validate(boleto):
+    ''' Valida o boleto, lançando a exceção do primeiro erro encontrado '''
+    for name, check in get_validator(type(boleto)):
+        error = check(getattr(boleto, name))
+        if error is not None:
+            raise error
+
+
+def validate_many(boletos):
+    '''
+    Valida vários boletos de uma só vez, coletando todos os erros de cada um.
+    Retorna uma lista de tuplas (índice do boleto, lista de erros) apenas
+    para os boletos inválidos
+    :rtype: list
+    '''
+    result = []
+    for index, boleto in enumerate(boletos):
+        errors = get_errors(boleto)
+        if errors:
+            result.append((index, errors))
+    return result
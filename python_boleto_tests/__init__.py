@@ -6,3 +6,19 @@
 #
 # This source code is licensed under the AGPLv3 license found in the
 # LICENSE file in the root directory of this source tree.
+from __future__ import unicode_literals
+
+import datetime
+
+from python_boleto.cecred import CecredBoleto
+
+
+def make_boleto(num_sequencial=1, boleto_class=CecredBoleto, **kwargs):
+    '''
+    Boleto válido utilizado nos testes (dados do manual da Cecred).
+    Os valores de `kwargs` substituem os valores padrão
+    '''
+    data = dict(convenio='010120', conta_corrente='03571572', num_sequencial=num_sequencial,
+                vencimento=datetime.date(2016, 1, 25), valor_documento='1250.37', carteira='01')
+    data.update(kwargs)
+    return boleto_class(**data)
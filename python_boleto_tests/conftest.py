@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+# This file is part of Python Boleto.
+#
+# Copyright (c) 2016, Rockho Team. All rights reserved.
+# Author: Christian Hess
+#
+# This source code is licensed under the AGPLv3 license found in the
+# LICENSE file in the root directory of this source tree.
+import sys
+
+# a API asyncio utiliza async generators (Python 3.6+) e os testes, asyncio.run (Python 3.7+)
+collect_ignore = ['test_aio.py'] if sys.version_info < (3, 7) else []
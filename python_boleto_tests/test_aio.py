@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+# This file is part of Python Boleto.
+#
+# Copyright (c) 2016, Rockho Team. All rights reserved.
+# Author: Christian Hess
+#
+# This source code is licensed under the AGPLv3 license found in the
+# LICENSE file in the root directory of this source tree.
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+import pytest
+
+from python_boleto.aio import render_many_async
+from python_boleto.cecred import CecredBoleto
+from python_boleto_tests import make_boleto
+
+
+async def _collect(agen):
+    return [html async for html in agen]
+
+
+def test_export_html_async():
+    boleto = make_boleto()
+    html = asyncio.run(boleto.export_html_async(self_contained=True))
+    assert html == boleto.export_html(self_contained=True)
+
+
+def test_render_many_async_order():
+    boletos = [make_boleto(i) for i in range(1, 21)]
+    htmls = asyncio.run(_collect(render_many_async(boletos, concurrency=3, barcode='png')))
+    assert htmls == [boleto.export_html(barcode='png') for boleto in boletos]
+
+
+def test_render_many_async_iterable():
+    async def boletos():
+        for i in range(1, 6):
+            await asyncio.sleep(0)
+            yield make_boleto(i)
+
+    htmls = asyncio.run(_collect(render_many_async(boletos())))
+    assert [make_boleto(i).linha_digitavel in html for i, html in zip(range(1, 6), htmls)] == [True] * 5
+
+
+def test_render_many_async_backpressure():
+    read = []
+    rendering = []
+    lock = threading.Lock()
+
+    class Boleto(CecredBoleto):
+        def export_html(self, **kwargs):
+            with lock:
+                rendering.append(self.num_sequencial)
+            return super(Boleto, self).export_html(**kwargs)
+
+    def boletos():
+        for i in range(1, 11):
+            read.append(i)
+            yield make_boleto(i, Boleto)
+
+    async def consume():
+        agen = render_many_async(boletos(), concurrency=2, executor=ThreadPoolExecutor(2))
+        first = await agen.__anext__()
+        # apenas os boletos em processamento foram lidos
+        assert len(read) <= 3
+        await agen.aclose()
+        return first
+
+    assert make_boleto(1).linha_digitavel in asyncio.run(consume())
+    assert len(rendering) <= 3
+
+
+def test_render_many_async_invalid():
+    with pytest.raises(ValueError):
+        asyncio.run(_collect(render_many_async([], concurrency=0)))
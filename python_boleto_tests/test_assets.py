@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+# This file is part of Python Boleto.
+#
+# Copyright (c) 2016, Rockho Team. All rights reserved.
+# Author: Christian Hess
+#
+# This source code is licensed under the AGPLv3 license found in the
+# LICENSE file in the root directory of this source tree.
+import base64
+import datetime
+import os
+
+from python_boleto.assets import AssetCache, asset_cache
+from python_boleto.cecred import CecredBoleto
+
+
+def test_get_base64(tmpdir):
+    logo = tmpdir.join("logo.png")
+    logo.write_binary(b"abc")
+
+    cache = AssetCache(str(tmpdir))
+    assert cache.get_base64("logo.png") == base64.b64encode(b"abc").decode("ascii")
+    assert cache.get_data_uri("logo.png") == "data:image/png;base64,YWJj"
+    assert cache.get("logo.png") is cache.get("logo.png")
+
+    # arquivo alterado
+    logo.write_binary(b"abcd")
+    os.utime(str(logo), (0, 0))
+    assert cache.get_base64("logo.png") == base64.b64encode(b"abcd").decode("ascii")
+
+    # arquivos inexistentes ou diretórios
+    assert cache.get_base64("missing.png") is None
+    assert cache.get_base64("") is None
+
+
+def test_register_and_invalidate(tmpdir):
+    cache = AssetCache(str(tmpdir))
+    cache.register("logo.jpg", b"xyz")
+    assert cache.get_data_uri("logo.jpg") == "data:image/jpeg;base64,eHl6"
+
+    cache.invalidate("logo.jpg")
+    assert cache.get("logo.jpg") is None
+
+
+def test_preload():
+    cache = AssetCache()
+    cache.preload("cecred.jpg")
+    assert cache.resolve("cecred.jpg") in cache._files
+
+
+def test_export_html_uses_cache():
+    logo = asset_cache.get_base64(CecredBoleto._logo)
+    assert logo
+
+    html = CecredBoleto(convenio='123', vencimento=datetime.date(2016, 1, 1)).export_html()
+    assert logo in html
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+# This file is part of Python Boleto.
+#
+# Copyright (c) 2016, Rockho Team. All rights reserved.
+# Author: Christian Hess
+#
+# This source code is licensed under the AGPLv3 license found in the
+# LICENSE file in the root directory of this source tree.
+import datetime
+
+import pytest
+
+from python_boleto import barcode
+from python_boleto.assets import image_size
+from python_boleto.cecred import CecredBoletoBatch
+from python_boleto.render import render_carne
+from python_boleto_tests import make_boleto
+
+CODIGO = '08593643900000001000101200357157200000000101'
+
+
+def test_pairs():
+    assert len(barcode.PAIRS) == 100
+
+    # cada par possui 5 barras e 5 espaços, 2 largos de cada
+    for widths in barcode.PAIRS.values():
+        assert len(widths) == 10
+        assert sum(widths) == 18
+
+    assert barcode.PAIRS['00'] == (1, 1, 1, 1, 3, 3, 3, 3, 1, 1)
+    assert barcode.PAIRS['10'] == (3, 1, 1, 1, 1, 3, 1, 3, 3, 1)
+
+
+def test_encode():
+    widths = barcode.encode(CODIGO)
+    assert widths[:4] == [1, 1, 1, 1]
+    assert widths[-3:] == [3, 1, 1]
+    assert len(widths) == 4 + len(CODIGO) * 5 + 3
+    assert sum(widths) == 4 + len(CODIGO) * 9 + 5
+
+    with pytest.raises(ValueError):
+        barcode.encode('123')
+
+    with pytest.raises(ValueError):
+        barcode.encode('12a4')
+
+
+def test_render_svg():
+    svg = barcode.render_svg(CODIGO)
+    assert svg.startswith('<svg ')
+    assert 'viewBox="0 0 405 60"' in svg
+
+    # uma barra para cada par de barra e espaço, mais a barra de parada
+    assert svg.count('M') == (len(barcode.encode(CODIGO)) + 1) // 2
+
+
+def test_render_png():
+    png = barcode.render_png(CODIGO)
+    assert png.startswith(b'\x89PNG\r\n\x1a\n')
+    assert image_size(png) == (405, 60)
+    assert image_size(barcode.render_png(CODIGO, module_width=2, height=30)) == (810, 30)
+
+    html = barcode.render_html(CODIGO, 'png')
+    assert html.startswith('<img class="barcode" src="data:image/png;base64,')
+
+    with pytest.raises(ValueError):
+        barcode.render_html(CODIGO, 'gif')
+
+
+def test_export_html_without_javascript():
+    boleto = make_boleto(vencimento=datetime.date(2016, 1, 1), valor_documento='10.00')
+
+    html = boleto.export_html()
+    assert barcode.render_svg(boleto.codigo_barras) in html
+    assert 'JsBarcode' not in html
+    assert 'data-codigo-barras' not in html
+
+    html = boleto.export_html(barcode='png')
+    assert 'src="data:image/png;base64,' in html
+    assert 'JsBarcode' not in html
+
+    html = boleto.export_html(barcode='js')
+    assert 'data-codigo-barras="{0}"'.format(boleto.codigo_barras) in html
+    assert 'JsBarcode(' in html
+
+    html = render_carne([boleto, boleto])
+    assert html.count('<svg xmlns="http://www.w3.org/2000/svg" class="barcode"') == 2
+    assert 'JsBarcode' not in html
+
+
+def test_conta_corrente_com_pontuacao():
+    # a pontuação da conta corrente não é incluída no código de barras
+    boleto = make_boleto(conta_corrente='0357157-2')
+    assert boleto.codigo_barras == make_boleto().codigo_barras
+    assert barcode.render_svg(boleto.codigo_barras) in boleto.export_html()
+    assert boleto.export_pdf().startswith(b'%PDF')
+
+    batch = CecredBoletoBatch.from_boletos([boleto])
+    assert batch.codigo_barras == [boleto.codigo_barras]
+
+
+def test_invalid_codigo_barras():
+    # códigos que não podem ser gerados no servidor são gerados pelo JsBarcode
+    boleto = make_boleto(convenio='01A120')
+    html = boleto.export_html()
+    assert 'data-codigo-barras="{0}"'.format(boleto.codigo_barras) in html
+    assert 'JsBarcode(' in html
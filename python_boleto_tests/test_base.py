@@ -190,3 +190,35 @@ def test_instantiate_and_export_html():
     base = Boleto(**boleto_info)
     html = base.export_html(static_url="https://static.mydomain.com/")
     assert html == "<html></html>"
+
+
+def test_field_coercers():
+    class MyBoleto(Boleto):
+        codigo = ''
+        _field_coercers = dict(Boleto._field_coercers, codigo=lambda value: "{0:0>4}".format(value))
+
+    boleto = MyBoleto(codigo=12, vencimento='2016-01-25', foo='bar', validate=None)
+    assert boleto.codigo == '0012'
+    assert boleto.vencimento == datetime(2016, 1, 25).date()
+    assert not hasattr(boleto, 'foo')
+    assert callable(boleto.validate)
+
+
+def test_from_trusted():
+    vencimento = datetime(2016, 1, 25).date()
+    boleto = Boleto.from_trusted(num_sequencial=1, vencimento=vencimento,
+                                 valor_documento=Decimal('10.00'), foo='bar')
+    assert boleto.num_sequencial == 1
+    assert boleto.vencimento is vencimento
+    assert boleto.valor_documento == Decimal('10.00')
+    assert boleto.instrucoes == []
+    assert not hasattr(boleto, 'foo')
+    boleto.validate()
+
+    boleto = Boleto.from_row(('num_sequencial', 'sacado'), (2, 'Fulano'))
+    assert boleto.num_sequencial == 2
+    assert boleto.sacado == 'Fulano'
+
+    # as atribuições seguintes continuam sendo convertidas
+    boleto.num_sequencial = '3'
+    assert boleto.num_sequencial == 3
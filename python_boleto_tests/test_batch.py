@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+# This file is part of Python Boleto.
+#
+# Copyright (c) 2016, Rockho Team. All rights reserved.
+# Author: Christian Hess
+#
+# This source code is licensed under the AGPLv3 license found in the
+# LICENSE file in the root directory of this source tree.
+import datetime
+from decimal import Decimal
+import random
+
+import pytest
+
+from python_boleto.batch import BoletoBatch
+from python_boleto.cecred import CecredBoletoBatch
+
+
+def _colunas(quantidade, seed=7):
+    rnd = random.Random(seed)
+    return {
+        'valor_documento': [Decimal(rnd.randint(0, 10 ** 7)) / 100 for _ in range(quantidade)],
+        'vencimento': [datetime.date(1997, 1, 1) + datetime.timedelta(days=rnd.randint(0, 12000))
+                       for _ in range(quantidade)],
+        'num_sequencial': [rnd.randint(1, 10 ** 9 - 1) for _ in range(quantidade)],
+        'conta_corrente': ["{0:08d}".format(rnd.randint(0, 10 ** 8 - 1)) for _ in range(quantidade)],
+        'convenio': '010120',
+        'carteira': '1',
+    }
+
+
+def test_base_not_implemented():
+    batch = BoletoBatch(num_sequencial=[1, 2])
+    assert len(batch) == 2
+
+    with pytest.raises(NotImplementedError):
+        batch.nosso_numero
+
+    with pytest.raises(NotImplementedError):
+        batch.codigo_barras
+
+
+def test_invalid_columns():
+    with pytest.raises(ValueError):
+        CecredBoletoBatch(sacado=['Fulano'])
+
+    with pytest.raises(ValueError):
+        CecredBoletoBatch(num_sequencial=[1, 2], carteira=['1'])
+
+
+def test_manual_cecred():
+    # Dados obtidos do boleto do manual da Cecred
+    batch = CecredBoletoBatch(vencimento=['2015-05-25'], valor_documento=[1], convenio='010120',
+                              conta_corrente=['03571572'], num_sequencial=[1], carteira='1')
+
+    assert batch.fator_vencimento == [6439]
+    assert batch.nosso_numero == ["03571572000000001"]
+    assert batch.codigo_barras == ["08593643900000001000101200357157200000000101"]
+    assert batch.linha_digitavel == ["08590.10126 00357.157205 00000.001016 3 64390000000100"]
+
+
+def test_same_rules_as_cecred_boleto():
+    batch = CecredBoletoBatch(**_colunas(500))
+    boletos = list(batch.to_boletos(sacado='Fulano'))
+
+    assert len(boletos) == 500
+    assert boletos[0].sacado == 'Fulano'
+    assert batch.nosso_numero == [b.nosso_numero for b in boletos]
+    assert batch.fator_vencimento == [b.fator_vencimento for b in boletos]
+    assert batch.codigo_barras == [b.codigo_barras for b in boletos]
+    assert batch.linha_digitavel == [b.linha_digitavel for b in boletos]
+
+
+def test_from_boletos():
+    boletos = list(CecredBoletoBatch(**_colunas(20)).to_boletos())
+    batch = CecredBoletoBatch.from_boletos(boletos)
+    assert batch.codigo_barras == [b.codigo_barras for b in boletos]
+
+
+def test_numpy_columns():
+    numpy = pytest.importorskip("numpy")
+
+    colunas = _colunas(200)
+    batch = CecredBoletoBatch(**colunas)
+
+    colunas['vencimento'] = numpy.array(colunas['vencimento'], dtype='datetime64[D]')
+    colunas['num_sequencial'] = numpy.array(colunas['num_sequencial'])
+    numpy_batch = CecredBoletoBatch(**colunas)
+
+    assert numpy_batch.fator_vencimento == batch.fator_vencimento
+    assert numpy_batch.linha_digitavel == batch.linha_digitavel
+    assert isinstance(next(numpy_batch.to_boletos()).vencimento, datetime.date)
+
+
+def test_without_numpy(monkeypatch):
+    import python_boleto.utils
+    monkeypatch.setattr(python_boleto.utils, '_numpy', None)
+
+    batch = CecredBoletoBatch(**_colunas(50))
+    boletos = list(batch.to_boletos())
+    assert batch.fator_vencimento == [b.fator_vencimento for b in boletos]
+    assert batch.linha_digitavel == [b.linha_digitavel for b in boletos]
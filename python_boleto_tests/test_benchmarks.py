@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+# This file is part of Python Boleto.
+#
+# Copyright (c) 2016, Rockho Team. All rights reserved.
+# Author: Christian Hess
+#
+# This source code is licensed under the AGPLv3 license found in the
+# LICENSE file in the root directory of this source tree.
+from __future__ import unicode_literals
+
+import json
+
+from benchmarks import __main__ as runner
+from benchmarks.cases import CASES
+from benchmarks.datasets import records
+
+
+def test_datasets_reproducible():
+    assert records(20) == records(20)
+    assert records(20) != records(20, seed=1)
+
+
+def test_run(tmpdir, capsys):
+    path = str(tmpdir.join('baseline.json'))
+    assert runner.main(['--size', '3', '--repeat', '1', '--baseline', path, '--save']) == 0
+
+    baseline = json.loads(tmpdir.join('baseline.json').read())
+    assert sorted(baseline['3']) == sorted(CASES)
+    assert all(result['ops_per_sec'] > 0 for result in baseline['3'].values())
+
+    # comparação com o baseline
+    baseline['3']['modulo10']['ops_per_sec'] *= 1000
+    tmpdir.join('baseline.json').write(json.dumps(baseline))
+    assert runner.main(['--size', '3', '--repeat', '1', '--baseline', path, '--only', 'modulo', '--check']) == 1
+    assert 'REGRESSÃO' in capsys.readouterr().out
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+# This file is part of Python Boleto.
+#
+# Copyright (c) 2016, Rockho Team. All rights reserved.
+# Author: Christian Hess
+#
+# This source code is licensed under the AGPLv3 license found in the
+# LICENSE file in the root directory of this source tree.
+from decimal import Decimal
+import io
+import json
+import os
+
+import pytest
+
+from python_boleto import bulk
+from python_boleto.cecred import CecredBoleto
+
+
+def _registro(num_sequencial, **kwargs):
+    registro = {'convenio': '010120', 'conta_corrente': '03571572', 'num_sequencial': num_sequencial,
+                'vencimento': '2016-01-25', 'valor_documento': '12.50', 'sacado': 'Fulano'}
+    registro.update(kwargs)
+    return registro
+
+
+def _errors(path):
+    with io.open(path, encoding='utf-8', newline='') as fp:
+        return [[record['linha'], record['erro'], record['mensagem']] for _, record in bulk.read_records(fp, 'csv')]
+
+
+def test_read_csv():
+    data = u"num_sequencial,vencimento,instrucoes,sacado\n1,2016-01-25,a|b,\n2,,,José\n"
+    records = list(bulk.read_records(io.StringIO(data), 'csv'))
+    assert records == [(2, {'num_sequencial': '1', 'vencimento': '2016-01-25', 'instrucoes': ['a', 'b']}),
+                       (3, {'num_sequencial': '2', 'sacado': u'José'})]
+
+    with pytest.raises(ValueError):
+        bulk.read_records(io.StringIO(data), 'xml')
+
+
+def test_read_jsonl():
+    data = u'{"num_sequencial": 1}\n\n{invalid\n'
+    records = list(bulk.read_records(io.StringIO(data), 'jsonl'))
+    assert records[0] == (1, {'num_sequencial': 1})
+    assert records[1][0] == 3
+    assert isinstance(records[1][1], ValueError)
+
+    # valores sem representação binária exata não são truncados
+    data = u'{"valor_documento": 12.34}\n'
+    records = list(bulk.read_records(io.StringIO(data), 'jsonl'))
+    assert records == [(1, {'valor_documento': Decimal('12.34')})]
+
+    boleto = CecredBoleto(**_registro(1, valor_documento=records[0][1]['valor_documento']))
+    assert boleto.codigo_barras[9:19] == '0000001234'
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_generate(tmpdir, workers):
+    records = [(i, _registro(i)) for i in range(1, 11)]
+    records.append((11, _registro(0)))
+    records.append((12, _registro(12, convenio='')))
+
+    output_dir = str(tmpdir.join('saida'))
+    result = bulk.generate(iter(records), output_dir, boleto_class=CecredBoleto, workers=workers, chunksize=3)
+
+    assert result == bulk.BulkResult(12, 10, 2)
+
+    boleto = CecredBoleto(**_registro(1))
+    with io.open(os.path.join(output_dir, boleto.nosso_numero + '.html'), encoding='utf-8') as fp:
+        assert fp.read() == boleto.export_html()
+
+    errors = _errors(os.path.join(output_dir, bulk.ERRORS_FILENAME))
+    assert [e[:2] for e in errors] == [['11', 'ValueError'], ['12', 'ValueError']]
+    assert 'num_sequencial' in errors[0][2]
+    assert 'convenio' in errors[1][2]
+
+
+def test_main(tmpdir):
+    source = tmpdir.join('boletos.jsonl')
+    source.write('\n'.join(json.dumps(_registro(i)) for i in range(1, 4)) + '\n{invalid\n')
+
+    output_dir = str(tmpdir.join('saida'))
+    errors_path = str(tmpdir.join('erros.csv'))
+    status = bulk.main([str(source), '-o', output_dir, '-w', '1', '--errors', errors_path,
+                        '--filename', 'boleto-{line}.html', '--no-recibo-sacado', '--self-contained'])
+
+    assert status == 1
+    assert sorted(os.listdir(output_dir)) == ['boleto-1.html', 'boleto-2.html', 'boleto-3.html']
+
+    boleto = CecredBoleto(**_registro(1))
+    with io.open(os.path.join(output_dir, 'boleto-1.html'), encoding='utf-8') as fp:
+        assert fp.read() == boleto.export_html(include_recibo_sacado=False, self_contained=True)
+    assert [e[0] for e in _errors(errors_path)] == ['4']
@@ -88,3 +88,43 @@ def test_codigo_barras():
     assert cecred.codigo_barras == "08593643900000001000101200357157200000000101"
     assert cecred.codigo_barras_dv == "3"
     
+
+def test_cached_fields():
+    cecred = CecredBoleto()
+    cecred.vencimento = datetime.date(2015, 5, 25)
+    cecred.valor_documento = Decimal(1.00)
+    cecred.convenio = '010120'
+    cecred.conta_corrente = '03571572'
+    cecred.num_sequencial = 1
+    cecred.carteira = '1'
+
+    codigo_barras = cecred.codigo_barras
+    assert cecred.codigo_barras is codigo_barras
+    assert cecred.linha_digitavel is cecred.linha_digitavel
+    assert cecred.nosso_numero == "03571572000000001"
+    assert cecred.fator_vencimento == 6439
+
+    # alterações nos campos descartam os valores calculados
+    cecred.num_sequencial = 2
+    assert cecred.nosso_numero == "03571572000000002"
+    assert cecred.codigo_barras == "08591643900000001000101200357157200000000201"
+    assert cecred.linha_digitavel == "08590.10126 00357.157205 00000.002014 1 64390000000100"
+    assert cecred.fator_vencimento == 6439
+
+    cecred.vencimento = datetime.date(2015, 5, 26)
+    assert cecred.fator_vencimento == 6440
+    assert cecred.codigo_barras[5:9] == "6440"
+
+    # campos que não fazem parte do cálculo não descartam o cache
+    codigo_barras = cecred.codigo_barras
+    cecred.sacado = 'Fulano'
+    assert cecred.codigo_barras is codigo_barras
+
+
+def test_convenio_coercion():
+    assert CecredBoleto(convenio=10120).convenio == '10120'
+
+    cecred = CecredBoleto(convenio=None, num_sequencial=1, vencimento=datetime.date.today())
+    assert cecred.convenio == ''
+    with pytest.raises(ValueError):
+        cecred.validate()
@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+# This file is part of Python Boleto.
+#
+# Copyright (c) 2016, Rockho Team. All rights reserved.
+# Author: Christian Hess
+#
+# This source code is licensed under the AGPLv3 license found in the
+# LICENSE file in the root directory of this source tree.
+from __future__ import unicode_literals
+
+import datetime
+from decimal import Decimal
+import io
+
+import pytest
+
+from python_boleto import cnab
+from python_boleto_tests import make_boleto
+
+DATA_GERACAO = datetime.datetime(2016, 1, 20, 10, 30, 15)
+
+
+def _boletos(count=3):
+    for i in range(count):
+        yield make_boleto(i + 1, agencia='01015', numero_documento='DOC{0}'.format(i),
+                          cedente='Empresa Exemplo Ltda', sacado='José da Silva', cpf_cei_cnpj='123.456.789-09',
+                          sacado_extra=['Rua das Flores, 123'])
+
+
+def _write(formato, boletos):
+    fp = io.StringIO(newline='')
+    result = cnab.write_remessa(boletos, fp, formato=formato, data_geracao=DATA_GERACAO,
+                                inscricao_empresa='11.222.333/0001-81', nsa=7)
+    return result, fp.getvalue()
+
+
+def test_layout():
+    layout = cnab.Layout(10, ((1, 3, 'numero', 'num', 0), (4, 4, None, 'alfa', 'X'),
+                              (5, 10, 'nome', 'alfa', '')))
+    assert layout.format({'numero': 7, 'nome': 'ação'}) == '007XACAO  '
+    assert layout.format({'nome': 'nome muito longo'}) == '000XNOME M'
+
+    with pytest.raises(ValueError):
+        layout.format({'numero': 1234})
+
+    # posições faltando ou sobrando
+    with pytest.raises(ValueError):
+        cnab.Layout(10, ((1, 3, 'numero', 'num', 0), (5, 10, 'nome', 'alfa', '')))
+    with pytest.raises(ValueError):
+        cnab.Layout(10, ((1, 3, 'numero', 'num', 0),))
+
+
+def test_remessa_240():
+    result, content = _write(240, _boletos())
+    lines = content.split(cnab.LINE_SEPARATOR)
+
+    assert lines.pop() == ''
+    assert result == (len(lines), 3, Decimal('3751.11'))
+    assert all(len(line) == 240 for line in lines)
+
+    # header do arquivo e do lote, segmentos P e Q, trailer do lote e do arquivo
+    assert [line[7] for line in lines] == ['0', '1'] + ['3'] * 6 + ['5', '9']
+    assert [line[13] for line in lines[2:8]] == ['P', 'Q'] * 3
+    assert [int(line[8:13]) for line in lines[2:8]] == list(range(1, 7))
+
+    header = lines[0]
+    assert header[:3] == '085'
+    assert header[17:32] == '211222333000181'
+    assert header[72:102] == 'EMPRESA EXEMPLO LTDA'.ljust(30)
+    assert header[143:157] == '20012016103015'
+    assert header[157:163] == '000007'
+
+    p = lines[2]
+    assert p[17:22] == '00101' and p[22] == '5'
+    assert p[23:35] == '000000357157' and p[35] == '2'
+    assert p[37:57].strip() == '03571572000000001'
+    assert p[62:77].strip() == 'DOC0'
+    assert p[77:85] == '25012016'
+    assert p[85:100] == '000000000125037'
+
+    q = lines[3]
+    assert q[17:33] == '1000012345678909'
+    assert q[33:73].strip() == 'JOSE DA SILVA'
+    assert q[73:113].strip() == 'RUA DAS FLORES, 123'
+
+    assert lines[8][17:23] == '000008'
+    assert lines[8][23:29] == '000003'
+    assert lines[8][29:46] == '00000000000375111'
+    assert lines[9][17:23] == '000001'
+    assert lines[9][23:29] == '000010'
+
+
+def test_remessa_400():
+    result, content = _write(400, _boletos())
+    lines = content.split(cnab.LINE_SEPARATOR)
+
+    assert lines.pop() == ''
+    assert result == (5, 3, Decimal('3751.11'))
+    assert all(len(line) == 400 for line in lines)
+    assert [line[0] for line in lines] == ['0', '1', '1', '1', '9']
+    assert [int(line[394:]) for line in lines] == list(range(1, 6))
+
+    assert lines[0][1:9] == '1REMESSA'
+    assert lines[0][94:100] == '200116'
+    assert lines[1][62:79] == '03571572000000001'
+    assert lines[1][120:126] == '250116'
+    assert lines[1][126:139] == '0000000125037'
+    assert lines[4][1:20] == '0000030000000375111'
+
+
+def test_remessa_generator():
+    # os boletos são consumidos um a um
+    consumed = []
+
+    def boletos():
+        for boleto in _boletos(100):
+            consumed.append(boleto)
+            yield boleto
+
+    result, content = _write(400, boletos())
+    assert len(consumed) == 100
+    assert result.titulos == 100
+    assert result.valor_total == Decimal('125037')
+
+
+def test_remessa_invalid():
+    with pytest.raises(ValueError):
+        _write(240, [])
+
+    with pytest.raises(ValueError):
+        _write(500, _boletos())
+
+
+def _titulo(boleto, **kwargs):
+    values = dict(banco='085', nosso_numero=boleto.nosso_numero, movimento=6,
+                  numero_documento=boleto.numero_documento, vencimento=boleto.vencimento,
+                  valor_documento=boleto.valor_documento, valor_pago=Decimal('1260.37'),
+                  valor_juros=Decimal('10.00'), valor_tarifa=Decimal('1.50'),
+                  data_ocorrencia=datetime.date(2016, 1, 26), data_credito=datetime.date(2016, 1, 27))
+    values.update(kwargs)
+    return values
+
+
+def _retorno(tmpdir, formato, boletos):
+    lines = []
+    if formato == 240:
+        lines.append(cnab.CNAB240_HEADER_ARQUIVO.format({'banco': '085'}))
+        lines.append(cnab.CNAB240_HEADER_LOTE.format({'banco': '085'}))
+        for boleto in boletos:
+            lines.append(cnab.CNAB240_SEGMENTO_T.format(_titulo(boleto)))
+            lines.append(cnab.CNAB240_SEGMENTO_U.format(_titulo(boleto)))
+        lines.append(cnab.CNAB240_TRAILER_LOTE.format({'banco': '085'}))
+        lines.append(cnab.CNAB240_TRAILER_ARQUIVO.format({'banco': '085'}))
+    else:
+        lines.append(cnab.CNAB400_HEADER.format({'banco': '085'}))
+        lines.extend(cnab.CNAB400_RETORNO_DETALHE.format(_titulo(boleto)) for boleto in boletos)
+        lines.append(cnab.CNAB400_TRAILER.format({}))
+
+    path = tmpdir.join('retorno.ret')
+    path.write_binary((cnab.LINE_SEPARATOR.join(lines) + cnab.LINE_SEPARATOR).encode('ascii'))
+    return str(path)
+
+
+@pytest.mark.parametrize('formato', [240, 400])
+def test_read_retorno(tmpdir, formato):
+    boletos = list(_boletos())
+    path = _retorno(tmpdir, formato, boletos)
+
+    registros = list(cnab.read_retorno(path))
+    assert len(registros) == 3
+    assert registros == list(cnab.read_retorno(path, formato=formato))
+
+    registro = registros[0]
+    assert registro.linha == (3 if formato == 240 else 2)
+    assert registro.nosso_numero == '03571572000000001'
+    assert registro.movimento == 6
+    assert registro.numero_documento == 'DOC0'
+    assert registro.vencimento == datetime.date(2016, 1, 25)
+    assert registro.valor_documento == Decimal('1250.37')
+    assert registro.valor_pago == Decimal('1260.37')
+    assert registro.valor_juros == Decimal('10.00')
+    assert registro.valor_tarifa == Decimal('1.50')
+    assert registro.valor_desconto == Decimal('0')
+    assert registro.data_ocorrencia == datetime.date(2016, 1, 26)
+    assert registro.data_credito == datetime.date(2016, 1, 27)
+
+
+def test_read_retorno_invalid(tmpdir):
+    path = tmpdir.join('retorno.ret')
+    path.write_binary(b'')
+    assert list(cnab.read_retorno(str(path))) == []
+
+    path.write_binary(b'0' * 100 + b'\r\n')
+    with pytest.raises(ValueError):
+        list(cnab.read_retorno(str(path)))
+
+    # linha incompleta
+    path.write_binary(b'0' * 400 + b'\r\n' + b'1' * 20 + b'\r\n')
+    with pytest.raises(ValueError):
+        list(cnab.read_retorno(str(path)))
+
+
+def test_nosso_numero_index(tmpdir):
+    boletos = list(_boletos())
+    index = cnab.NossoNumeroIndex(boletos[:2])
+    assert len(index) == 2
+    assert '03571572000000001' in index
+    assert index.get('03571572000000003') is None
+
+    with pytest.raises(ValueError):
+        index.add(boletos[0])
+
+    path = _retorno(tmpdir, 400, boletos)
+    matches = list(index.match(cnab.read_retorno(path)))
+    assert [boleto for _, boleto in matches] == [boletos[0], boletos[1], None]
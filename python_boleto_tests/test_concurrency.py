@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+# This file is part of Python Boleto.
+#
+# Copyright (c) 2016, Rockho Team. All rights reserved.
+# Author: Christian Hess
+#
+# This source code is licensed under the AGPLv3 license found in the
+# LICENSE file in the root directory of this source tree.
+from concurrent.futures import ThreadPoolExecutor
+import datetime
+import random
+import threading
+
+from python_boleto import environment
+from python_boleto.base import Boleto
+from python_boleto.render import render_many
+from python_boleto_tests import make_boleto
+
+
+def _boleto(i):
+    return make_boleto(i, vencimento=datetime.date(2016, 1, 1) + datetime.timedelta(days=i % 3000),
+                       valor_documento=i, sacado="Sacado {0:06d}".format(i),
+                       instrucoes=["Instrução {0:06d}".format(i)])
+
+
+def _assert_isolated(i, html):
+    boleto = _boleto(i)
+    assert boleto.linha_digitavel in html
+    assert "Sacado {0:06d}".format(i) in html
+    assert "Instrução {0:06d}".format(i) in html
+    assert html.count("Sacado ") == 2
+    assert html.count("Instrução ") == 1
+
+
+def test_list_fields_not_shared():
+    a = Boleto()
+    b = Boleto()
+    a.instrucoes.append("a")
+    a.informacoes.append("a")
+    a.sacado_extra.append("a")
+
+    assert b.instrucoes == [] and b.informacoes == [] and b.sacado_extra == []
+    assert Boleto.instrucoes == () and Boleto.informacoes == () and Boleto.sacado_extra == ()
+
+
+def test_render_many():
+    boletos = [_boleto(i) for i in range(1, 101)]
+    htmls = render_many(boletos, max_workers=8)
+    assert htmls == [boleto.export_html() for boleto in boletos]
+
+
+def test_concurrent_stress():
+    environment.reset_environment()
+
+    numbers = list(range(1, 3001))
+    random.Random(3).shuffle(numbers)
+    # threading.Barrier não existe no Python 2
+    condition = threading.Condition()
+    waiting = []
+
+    def render(i):
+        # a primeira leva de renders inicia ao mesmo tempo, com o ambiente ainda não criado
+        if i in numbers[:16]:
+            with condition:
+                waiting.append(i)
+                condition.notify_all()
+                while len(waiting) < 16:
+                    condition.wait()
+
+        boleto = _boleto(i)
+        html = boleto.export_html()
+
+        # alterações na instância após o render não afetam as demais
+        boleto.instrucoes.append("extra")
+        return i, html
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        results = list(executor.map(render, numbers))
+
+    assert len(results) == 3000
+    for i, html in results:
+        _assert_isolated(i, html)
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+# This file is part of Python Boleto.
+#
+# Copyright (c) 2016, Rockho Team. All rights reserved.
+# Author: Christian Hess
+#
+# This source code is licensed under the AGPLv3 license found in the
+# LICENSE file in the root directory of this source tree.
+import datetime
+import re
+
+import pytest
+
+from python_boleto import css
+from python_boleto.base import Boleto
+from python_boleto_tests import make_boleto
+
+STYLES = '''
+    /* comentário */
+    body { margin : 0 ;  color: #333; }
+    .row:before, .unused:after { display: table; content: " "; }
+    div .row   > span { padding: 1px }
+    #recibo, .col-xs-4 { float: left; }
+    svg:not(:root) { overflow: hidden; }
+    .empty { }
+    @media (min-width: 768px) {
+        .container { width: 750px; }
+        .unused { width: 10px; }
+    }
+    @media print { .unused { display: none; } }
+'''
+
+HTML = '<div class="container"><div class="row extra" id="recibo"><span>x</span></div></div>'
+
+
+def test_minify():
+    assert css.minify(STYLES) == (
+        'body{margin:0;color:#333}'
+        '.row:before,.unused:after{display:table;content:" "}'
+        'div .row>span{padding:1px}'
+        '#recibo,.col-xs-4{float:left}'
+        'svg:not(:root){overflow:hidden}'
+        '@media (min-width:768px){.container{width:750px}.unused{width:10px}}'
+        '@media print{.unused{display:none}}')
+
+
+def test_prune():
+    assert css.used_tokens(HTML) == frozenset(['html', 'head', 'body', 'div', 'span',
+                                               '.container', '.row', '.extra', '#recibo'])
+    assert css.prune(STYLES, HTML) == (
+        'body{margin:0;color:#333}'
+        '.row:before{display:table;content:" "}'
+        'div .row>span{padding:1px}'
+        '#recibo{float:left}'
+        '@media (min-width:768px){.container{width:750px}}')
+    assert css.prune(STYLES, HTML) is css.prune(STYLES, HTML)
+
+    # o cache é limitado: cada HTML pode utilizar classes diferentes
+    for i in range(css.CACHE_SIZE + 10):
+        css.prune(STYLES, '<div class="extra-{0}"></div>'.format(i))
+    assert len(css._pruned) == css.CACHE_SIZE
+
+
+def test_self_contained():
+    boleto = make_boleto(vencimento=datetime.date(2016, 1, 1), valor_documento='10.00')
+
+    html = boleto.export_html(self_contained=True)
+    assert "".join(boleto.stream_html(self_contained=True)) == html
+
+    # nenhum recurso externo, o logo incluído uma única vez
+    assert '<script' not in html
+    assert '<link' not in html
+    assert not re.search(r'(src|href)="(https?:)?//', html)
+    assert html.count('data:image/jpeg;base64,') == 1
+    assert html.count('<use href="#logo-0">') == 2
+    assert boleto.linha_digitavel in html
+
+    # apenas as regras utilizadas
+    styles = re.search(r'<style>(.*?)</style>', html, re.S).group(1)
+    assert '.col-xs-5{' in styles
+    assert '.col-xs-4' not in styles
+    assert '\n' not in styles
+    assert len(html) < len(boleto.export_html())
+
+    # sem o recibo do pagador, os estilos exclusivos do recibo são removidos
+    html = boleto.export_html(include_recibo_sacado=False, self_contained=True)
+    assert '.recibo-pagador-text' not in html
+    assert html.count('<use href="#logo-0">') == 1
+
+    with pytest.raises(ValueError):
+        boleto.export_html(barcode='js', self_contained=True)
+
+    with pytest.raises(NotImplementedError):
+        Boleto().export_html(self_contained=True)
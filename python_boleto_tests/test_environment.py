@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+# This file is part of Python Boleto.
+#
+# Copyright (c) 2016, Rockho Team. All rights reserved.
+# Author: Christian Hess
+#
+# This source code is licensed under the AGPLv3 license found in the
+# LICENSE file in the root directory of this source tree.
+from datetime import datetime, timedelta
+
+from jinja2 import DictLoader
+
+from python_boleto import environment
+from python_boleto.base import Boleto
+
+
+def test_environment_is_shared():
+    env = environment.get_environment()
+    assert environment.get_environment() is env
+    assert 'format_currency_or_blank' in env.filters
+
+
+def test_template_is_compiled_once():
+    template = environment.get_template('generic.jinja')
+    assert environment.get_template('generic.jinja') is template
+
+
+def test_register_loader_and_filter():
+    try:
+        environment.register_loader(DictLoader({'generic.jinja': '{{ boleto.sacado|gritar }}'}))
+        environment.register_filter('gritar', lambda value: value.upper())
+
+        boleto = Boleto(sacado='fulano', vencimento=datetime.today() + timedelta(days=10))
+        assert boleto.export_html() == "FULANO"
+    finally:
+        del environment._loaders[:]
+        environment._filters.clear()
+        environment.reset_environment()
+
+    assert Boleto().export_html() == "<html></html>"
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+# This file is part of Python Boleto.
+#
+# Copyright (c) 2016, Rockho Team. All rights reserved.
+# Author: Christian Hess
+#
+# This source code is licensed under the AGPLv3 license found in the
+# LICENSE file in the root directory of this source tree.
+import datetime
+from decimal import Decimal
+
+from iso8601 import iso8601
+import pytest
+
+from python_boleto.fields import to_date, to_decimal, to_int, to_string, to_string_or_blank
+
+
+def test_to_date():
+    assert to_date('2016-01-25') == datetime.date(2016, 1, 25)
+    assert to_date('2016-01-25T10:20:30Z') == datetime.date(2016, 1, 25)
+    assert to_date('20160125') == datetime.date(2016, 1, 25)
+    assert to_date(None) is None
+    assert to_date(-1) == -1
+
+    now = datetime.datetime.now()
+    assert to_date(now) is now
+
+    with pytest.raises(iso8601.ParseError):
+        to_date('2016-13-01')
+
+    with pytest.raises(iso8601.ParseError):
+        to_date('2016-+1-01')
+
+
+def test_to_int_and_strings():
+    assert to_int('12') == 12
+    assert to_int('') == 0
+    assert to_int(None) == 0
+    assert to_int(float('inf')) == 0
+    assert to_decimal('1.5') == Decimal('1.5')
+    assert to_string(-1) == '-1'
+    assert to_string_or_blank(None) == ''
+    assert to_string_or_blank(123) == '123'
@@ -9,6 +9,9 @@
 import datetime
 from decimal import Decimal
 
+from babel.numbers import format_currency
+
+from python_boleto import filters
 from python_boleto.filters import (
     format_agencia_conta, format_currency_or_blank, format_date_or_blank, index_or_blank
 )
@@ -33,3 +36,33 @@ def test_index_or_blank():
     assert index_or_blank(["a", "b", "c"], 2) == "c"
     assert index_or_blank(["a", "b", "c"], -1) == "c"
     assert index_or_blank(["a", "b", "c"], 3) == ""
+
+def test_formatters_cache():
+    formatter = filters.get_currency_formatter()
+    formatter.cache.clear()
+    assert format_currency_or_blank(Decimal("2.50")) == format_currency(Decimal("2.50"), "R$", locale="pt_BR")
+    assert format_currency_or_blank(Decimal("2.50")) is format_currency_or_blank(Decimal("2.50"))
+    assert len(formatter.cache) == 1
+
+    date = datetime.date(2016, 3, 1)
+    assert format_date_or_blank(date) == "01/03/2016"
+    assert format_date_or_blank(datetime.datetime(2016, 3, 1, 10, 30)) == "01/03/2016"
+
+    # o cache é limitado aos valores mais recentes
+    small = filters.CurrencyFormatter(cache_size=2)
+    for value in (1, 2, 3, 2):
+        small(Decimal(value))
+    assert len(small.cache) == 2
+    assert small.cache.get(Decimal(1)) is None
+    assert small.cache.get(Decimal(2)) is not None
+
+def test_configure():
+    try:
+        filters.configure(locale="en_US", currency="USD", date_format="MM/dd/yyyy")
+        assert format_currency_or_blank(Decimal("1234.5")) == "$1,234.50"
+        assert format_date_or_blank(datetime.date(2016, 3, 1)) == "03/01/2016"
+    finally:
+        filters.configure(locale=filters.DEFAULT_LOCALE, currency=filters.DEFAULT_CURRENCY,
+                          date_format=filters.DEFAULT_DATE_FORMAT)
+
+    assert format_date_or_blank(datetime.date(2016, 3, 1)) == "01/03/2016"
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+# This file is part of Python Boleto.
+#
+# Copyright (c) 2016, Rockho Team. All rights reserved.
+# Author: Christian Hess
+#
+# This source code is licensed under the AGPLv3 license found in the
+# LICENSE file in the root directory of this source tree.
+import json
+import subprocess
+import sys
+
+LAZY_MODULES = ('jinja2', 'babel', 'iso8601', 'numpy')
+
+
+def _loaded(code):
+    ''' Executa `code` em um novo interpretador e retorna os módulos de LAZY_MODULES carregados '''
+    code += "\nimport json, sys\nprint(json.dumps([m for m in {0!r} if m in sys.modules]))".format(LAZY_MODULES)
+    output = subprocess.check_output([sys.executable, '-c', code])
+    return json.loads(output.decode('utf-8').splitlines()[-1])
+
+
+def test_barcode_only_imports():
+    code = '\n'.join([
+        "import datetime",
+        "from python_boleto.cecred import CecredBoleto",
+        "from python_boleto import parser",
+        "boleto = CecredBoleto(convenio='010120', conta_corrente='03571572', num_sequencial=1,",
+        "                      vencimento='2016-01-25', valor_documento='10.00')",
+        "boleto.validate()",
+        "parser.parse(boleto.linha_digitavel, CecredBoleto)",
+    ])
+    assert _loaded(code) == []
+
+
+def test_render_imports():
+    code = '\n'.join([
+        "import datetime",
+        "from python_boleto.cecred import CecredBoleto",
+        "CecredBoleto(convenio='010120', conta_corrente='03571572', num_sequencial=1,",
+        "             vencimento=datetime.date(2016, 1, 25), valor_documento='10.00').export_html()",
+    ])
+    assert _loaded(code) == ['jinja2', 'babel']
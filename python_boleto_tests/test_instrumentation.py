@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+# This file is part of Python Boleto.
+#
+# Copyright (c) 2016, Rockho Team. All rights reserved.
+# Author: Christian Hess
+#
+# This source code is licensed under the AGPLv3 license found in the
+# LICENSE file in the root directory of this source tree.
+from python_boleto import instrumentation
+from python_boleto.render import render_many
+from python_boleto_tests import make_boleto
+
+
+def test_callback():
+    timings = []
+    boleto = make_boleto()
+    html = boleto.export_html(instrument=lambda stage, seconds: timings.append((stage, seconds)))
+    assert html == boleto.export_html()
+
+    stages = set(stage for stage, _ in timings)
+    assert set(['template', 'context', 'assets', 'barcode', 'render', 'total']) <= stages
+    assert 'filter.format_currency_or_blank' in stages
+    assert all(seconds >= 0 for _, seconds in timings)
+
+    # o total inclui as demais etapas
+    totals = dict(timings)
+    assert totals['total'] >= totals['render']
+
+    # sem instrumento, nada é medido
+    del timings[:]
+    boleto.export_html()
+    assert timings == []
+
+
+def test_render_stats():
+    stats = instrumentation.RenderStats()
+    for i in range(1, 11):
+        make_boleto(i).export_html(instrument=stats, self_contained=True)
+
+    result = stats.as_dict()
+    assert result['total']['count'] == 10
+    assert result['css']['count'] == 10
+    assert result['total']['p50'] <= result['total']['p99']
+    assert result['total']['total'] >= result['total']['p99']
+
+    stats.reset()
+    assert stats.as_dict() == {}
+
+
+def test_percentile():
+    samples = list(range(1, 101))
+    assert instrumentation._percentile(samples, 50) == 50
+    assert instrumentation._percentile(samples, 99) == 99
+    assert instrumentation._percentile([7], 99) == 7
+
+
+def test_default_instrument():
+    stats = instrumentation.RenderStats()
+    instrumentation.set_instrument(stats)
+    try:
+        render_many([make_boleto(i) for i in range(1, 9)], max_workers=4)
+    finally:
+        instrumentation.set_instrument(None)
+
+    assert stats.as_dict()['total']['count'] == 8
+    make_boleto().export_html()
+    assert stats.as_dict()['total']['count'] == 8
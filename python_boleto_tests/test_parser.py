@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+# This file is part of Python Boleto.
+#
+# Copyright (c) 2016, Rockho Team. All rights reserved.
+# Author: Christian Hess
+#
+# This source code is licensed under the AGPLv3 license found in the
+# LICENSE file in the root directory of this source tree.
+import datetime
+from decimal import Decimal
+
+import pytest
+
+from python_boleto import parser
+from python_boleto.cecred import CecredBoleto, CecredBoletoBatch
+from python_boleto_tests import make_boleto
+
+
+def _boleto(**kwargs):
+    return make_boleto(1234, **kwargs)
+
+
+def test_parse():
+    boleto = _boleto()
+
+    for value in (boleto.linha_digitavel, boleto.codigo_barras):
+        result = parser.parse(value, CecredBoleto)
+        assert result.codigo_barras == boleto.codigo_barras
+        assert result.banco == '085'
+        assert result.moeda == '9'
+        assert result.fator_vencimento == boleto.fator_vencimento
+        assert result.vencimento == boleto.vencimento
+        assert result.valor == Decimal('1250.37')
+        assert result.campos == {'convenio': '010120', 'conta_corrente': '03571572',
+                                 'num_sequencial': 1234, 'carteira': '01'}
+
+    # sem a classe do banco, apenas os campos comuns a todos os bancos
+    result = parser.parse(boleto.linha_digitavel.replace(' ', '').replace('.', ''))
+    assert result.campo_livre == boleto.codigo_barras[19:]
+    assert result.campos == {}
+
+
+def test_parse_invalid():
+    boleto = _boleto()
+    linha = boleto.linha_digitavel
+
+    with pytest.raises(ValueError):
+        parser.parse(linha[:-1])
+
+    # DV de cada um dos campos e o DV geral
+    for pos in (10, 22, 34, 36):
+        digito = str((int(linha[pos]) + 1) % 10)
+        with pytest.raises(ValueError):
+            parser.parse(linha[:pos] + digito + linha[pos + 1:])
+
+    with pytest.raises(ValueError):
+        parser.parse(boleto.codigo_barras[:20] + '9' + boleto.codigo_barras[21:])
+
+    # algarismos que não são ASCII (ex: arábicos ou sobrescritos) não são aceitos
+    for digito in (u'\u0661', u'\u00b2'):
+        with pytest.raises(ValueError):
+            parser.parse(linha[:1] + digito + linha[2:])
+        assert isinstance(parser.parse_many([boleto.codigo_barras[:1] + digito + boleto.codigo_barras[2:]])[0],
+                          ValueError)
+
+    class OutroBoleto(CecredBoleto):
+        _banco = '001'
+
+    with pytest.raises(ValueError):
+        parser.parse(linha, OutroBoleto)
+
+
+def test_calcula_vencimento():
+    assert parser.calcula_vencimento(0) is None
+    assert parser.calcula_vencimento(999) == datetime.date(2000, 7, 2)
+
+    # fatores reiniciados em 1000 a partir de 22/02/2025
+    assert parser.calcula_vencimento(9999, datetime.date(2025, 1, 1)) == datetime.date(2025, 2, 21)
+    assert parser.calcula_vencimento(1000, datetime.date(2025, 1, 1)) == datetime.date(2025, 2, 22)
+    assert parser.calcula_vencimento(1000, datetime.date(2000, 7, 1)) == datetime.date(2000, 7, 3)
+
+    for vencimento in (datetime.date(2016, 1, 25), datetime.date(2025, 2, 21), datetime.date(2025, 2, 22),
+                       datetime.date(2030, 6, 1)):
+        boleto = _boleto(vencimento=vencimento)
+        result = parser.parse(boleto.codigo_barras, referencia=vencimento)
+        assert result.vencimento == vencimento
+
+
+def test_parse_many():
+    vencimentos = [datetime.date(2016, 1, 1) + datetime.timedelta(days=i) for i in range(200)]
+    batch = CecredBoletoBatch(convenio='010120', conta_corrente='03571572', num_sequencial=list(range(1, 201)),
+                              vencimento=vencimentos, valor_documento='12.50')
+
+    values = list(batch.linha_digitavel[:100]) + list(batch.codigo_barras[100:])
+    values[3] = values[3][:-1] + '9'
+    values[150] = '123'
+
+    results = parser.parse_many(iter(values), CecredBoleto)
+    assert len(results) == 200
+    assert isinstance(results[3], ValueError)
+    assert isinstance(results[150], ValueError)
+
+    for index, result in enumerate(results):
+        if index in (3, 150):
+            continue
+        assert result == parser.parse(values[index], CecredBoleto)
+        assert result.campos['num_sequencial'] == index + 1
+        assert result.vencimento == vencimentos[index]
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+# This file is part of Python Boleto.
+#
+# Copyright (c) 2016, Rockho Team. All rights reserved.
+# Author: Christian Hess
+#
+# This source code is licensed under the AGPLv3 license found in the
+# LICENSE file in the root directory of this source tree.
+import datetime
+import io
+import re
+import zlib
+
+from python_boleto import barcode, pdf
+from python_boleto.assets import asset_cache
+from python_boleto.cecred import CecredBoleto
+from python_boleto_tests import make_boleto
+
+
+def _boletos(quantidade):
+    return [make_boleto(i, vencimento=datetime.date(2016, 1, 1), valor_documento='12.50',
+                        sacado='João (Silva)', instrucoes=['Não receber após o vencimento'])
+            for i in range(1, quantidade + 1)]
+
+
+def _check_xref(data):
+    ''' Verifica se a tabela de referências aponta para os objetos '''
+    xref = int(re.search(br'startxref\n(\d+)', data).group(1))
+    assert data[xref:xref + 4] == b'xref'
+
+    lines = data[xref:].split(b'\n')
+    count = int(lines[1].split()[1])
+    for obj_id, entry in enumerate(lines[3:2 + count], 1):
+        offset = int(entry[:10])
+        assert data[offset:].startswith("{0} 0 obj".format(obj_id).encode('ascii'))
+
+
+def _contents(data):
+    ''' Retorna o conteúdo descomprimido das páginas '''
+    streams = re.findall(br'<< /Filter /FlateDecode /Length (\d+) >>\nstream\n', data)
+    contents = []
+    pos = 0
+    for length in streams:
+        pos = data.index(b'/Filter /FlateDecode /Length ' + length, pos)
+        start = data.index(b'stream\n', pos) + 7
+        contents.append(zlib.decompress(data[start:start + int(length)]))
+        pos = start
+    return contents
+
+
+def test_export_pdf():
+    boleto = _boletos(1)[0]
+    data = boleto.export_pdf()
+
+    assert data.startswith(b'%PDF-1.4')
+    assert data.endswith(b'%%EOF\n')
+    assert data.count(b'/Type /Page ') == 1
+    _check_xref(data)
+
+    content = _contents(data)[0]
+    assert boleto.linha_digitavel.encode('ascii') in content
+    assert b'(Jo\xe3o \\(Silva\\))' in content
+    assert b'/Im0 Do' in content
+
+    # um retângulo para cada barra
+    assert content.count(b' re\n') == (len(barcode.encode(boleto.codigo_barras)) + 1) // 2
+
+
+def test_write_pdf_shares_logo():
+    fp = io.BytesIO()
+    pdf.write_pdf(iter(_boletos(10)), fp)
+    data = fp.getvalue()
+    _check_xref(data)
+
+    # um boleto completo por página e o logo incluído uma única vez
+    assert data.count(b'/Type /Page ') == 10
+    assert data.count(b'/Subtype /Image') == 1
+    assert data.count(b'/Resources 3 0 R') == 10
+
+    # sem o recibo do pagador, mais de um boleto por página
+    data = pdf.render_pdf(_boletos(10), include_recibo_sacado=False)
+    assert data.count(b'/Type /Page ') == 5
+    assert b'RECIBO DO PAGADOR' not in b''.join(_contents(data))
+
+
+def test_png_logo():
+    class PngBoleto(CecredBoleto):
+        _logo = 'test-logo.png'
+
+    asset_cache.register('test-logo.png', barcode.render_png('1234', height=10))
+    try:
+        data = PngBoleto(**_boletos(1)[0].__dict__).export_pdf()
+        assert data.count(b'/Subtype /Image') == 1
+        assert b'/Predictor 15 /Colors 1' in data
+        _check_xref(data)
+    finally:
+        asset_cache.invalidate('test-logo.png')
+
+
+def test_text_width():
+    assert pdf.text_width('0', size=10) == 5.56
+    assert pdf.text_width('Não', size=10) == pdf.text_width('Nao', size=10)
+    assert pdf.text_width('A', pdf.FONT_BOLD, 10) == 7.22
+    assert pdf._fit('x' * 200, 50).endswith('...')
+    assert pdf.text_width(pdf._fit('x' * 200, 50)) <= 50
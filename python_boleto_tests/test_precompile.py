@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+# This file is part of Python Boleto.
+#
+# Copyright (c) 2016, Rockho Team. All rights reserved.
+# Author: Christian Hess
+#
+# This source code is licensed under the AGPLv3 license found in the
+# LICENSE file in the root directory of this source tree.
+import glob
+import os
+import shutil
+import subprocess
+import sys
+import zipfile
+
+import jinja2
+import pytest
+
+from python_boleto import environment, precompile
+from python_boleto.render import render_carne
+from python_boleto_tests import make_boleto
+
+
+def _render():
+    boleto = make_boleto()
+    return (boleto.export_html(), boleto.export_html(self_contained=True, barcode='png'),
+            render_carne([make_boleto(1), make_boleto(2)]))
+
+
+@pytest.fixture
+def compiled_dir(tmpdir, monkeypatch):
+    target = str(tmpdir.join('compiled'))
+    assert precompile.compile_templates(target) == len(environment._build_environment(compiled=False)
+                                                       .list_templates(extensions=['jinja']))
+    monkeypatch.setattr(environment, 'COMPILED_DIR', target)
+    environment.reset_environment()
+    yield target
+    monkeypatch.undo()
+    environment.reset_environment()
+
+
+def test_compiled_templates(compiled_dir, monkeypatch):
+    monkeypatch.setattr(environment, 'COMPILED_DIR', str(compiled_dir) + '-missing')
+    environment.reset_environment()
+    expected = _render()
+
+    # os templates pré-compilados são utilizados, sem interpretar o código fonte
+    def parse(*args, **kwargs):
+        raise AssertionError("template interpretado em tempo de execução")
+
+    monkeypatch.setattr(environment, 'COMPILED_DIR', compiled_dir)
+    monkeypatch.setattr(jinja2.Environment, '_parse', parse)
+    environment.reset_environment()
+    assert _render() == expected
+
+
+def test_compiled_version_mismatch(compiled_dir, tmpdir):
+    assert environment._compiled_loader() is not None
+
+    tmpdir.join('compiled', environment.COMPILED_VERSION_FILE).write('0.0')
+    assert environment._compiled_loader() is None
+
+
+def test_user_templates(tmpdir):
+    templates = tmpdir.mkdir('templates')
+    templates.join('meu.jinja').write("{{ valor|format_agencia_conta }}")
+    target = str(tmpdir.join('compiled.zip'))
+
+    assert precompile.main(['-o', target, '--templates', str(templates), '--zip']) == 0
+
+    env = jinja2.Environment(loader=jinja2.ModuleLoader(target))
+    env.filters.update(environment.DEFAULT_FILTERS)
+    assert env.get_template('meu.jinja').render(valor='12345') == '1234-5'
+
+
+def test_preload():
+    environment.reset_environment()
+    environment.preload()
+    assert set(['cecred.jinja', 'carne.jinja', 'self_contained.jinja']) <= set(environment._templates)
+
+    environment.reset_environment()
+    environment.preload(['generic.jinja'])
+    assert list(environment._templates) == ['generic.jinja']
+
+
+def test_wheel_includes_compiled_templates(tmpdir):
+    pytest.importorskip('wheel')
+
+    # o build é feito em uma cópia, sem alterar o diretório do projeto
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    source = tmpdir.join('source')
+    shutil.copytree(os.path.join(root, 'python_boleto'), str(source.join('python_boleto')),
+                    ignore=shutil.ignore_patterns('__pycache__', '*.pyc', 'compiled_templates'))
+    for name in ('setup.py', 'pyproject.toml', 'MANIFEST.in', 'README.md', 'LICENSE', 'LICENSE-3RD-PARTY'):
+        shutil.copy(os.path.join(root, name), str(source))
+
+    output = str(tmpdir.join('dist'))
+    subprocess.check_call([sys.executable, '-m', 'pip', 'wheel', '--no-deps', '--no-build-isolation',
+                           '-w', output, str(source)])
+
+    with zipfile.ZipFile(glob.glob(os.path.join(output, '*.whl'))[0]) as wheel:
+        names = wheel.namelist()
+        assert 'python_boleto/compiled_templates/' + environment.COMPILED_VERSION_FILE in names
+        compiled = [name for name in names if name.startswith('python_boleto/compiled_templates/tmpl_')]
+        assert len(compiled) == len(environment._build_environment(compiled=False)
+                                    .list_templates(extensions=['jinja']))
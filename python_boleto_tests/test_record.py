@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+# This file is part of Python Boleto.
+#
+# Copyright (c) 2016, Rockho Team. All rights reserved.
+# Author: Christian Hess
+#
+# This source code is licensed under the AGPLv3 license found in the
+# LICENSE file in the root directory of this source tree.
+import datetime
+from decimal import Decimal
+import pickle
+
+import pytest
+
+from python_boleto.base import Boleto
+from python_boleto.cecred import CecredBoleto, CecredBoletoRecord
+from python_boleto.record import BoletoRecord
+from python_boleto_tests import make_boleto
+
+
+def _boleto():
+    return make_boleto(42, data_documento='2016-01-01', valor_documento='1234.56', valor_desconto=Decimal('0.5'),
+                       quantidade=2, sacado='Fulano', instrucoes=['Não receber após o vencimento'])
+
+
+def test_to_record():
+    record = _boleto().to_record()
+
+    assert isinstance(record, CecredBoletoRecord)
+    assert not hasattr(record, '__dict__')
+    assert record.convenio == '010120'
+    assert record.valor_documento == 123456
+    assert record.valor_desconto == 50
+    assert record.vencimento == datetime.date(2016, 1, 25).toordinal()
+    assert record.data_processamento == 0
+    assert record.instrucoes == ('Não receber após o vencimento',)
+
+
+def test_round_trip():
+    boleto = _boleto()
+    copy = CecredBoleto.from_record(boleto.to_record())
+
+    for name in CecredBoletoRecord.fields():
+        assert getattr(copy, name) == getattr(boleto, name), name
+
+    assert copy.codigo_barras == boleto.codigo_barras
+    assert copy.linha_digitavel == boleto.linha_digitavel
+    assert isinstance(copy.instrucoes, list)
+
+    record = Boleto(num_sequencial=1).to_record()
+    assert type(record) is BoletoRecord
+    assert Boleto.from_record(record).num_sequencial == 1
+
+
+def test_equality_and_pickle():
+    record = _boleto().to_record()
+    assert record == _boleto().to_record()
+    assert len(set([record, _boleto().to_record()])) == 1
+
+    other = _boleto()
+    other.num_sequencial = 43
+    assert record != other.to_record()
+
+    assert pickle.loads(pickle.dumps(record)) == record
+
+
+def test_invalid_values():
+    boleto = _boleto()
+    boleto.valor_documento = Decimal('0.001')
+    with pytest.raises(ValueError):
+        boleto.to_record()
+
+    boleto = _boleto()
+    boleto.vencimento = datetime.datetime(2016, 1, 25, 10, 0)
+    with pytest.raises(ValueError):
+        boleto.to_record()
+
+    with pytest.raises(TypeError):
+        BoletoRecord(convenio='1')
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+# This file is part of Python Boleto.
+#
+# Copyright (c) 2016, Rockho Team. All rights reserved.
+# Author: Christian Hess
+#
+# This source code is licensed under the AGPLv3 license found in the
+# LICENSE file in the root directory of this source tree.
+import datetime
+import io
+
+import pytest
+
+from python_boleto.assets import asset_cache
+from python_boleto.barcode import render_svg
+from python_boleto.base import Boleto
+from python_boleto.cecred import CecredBoleto
+from python_boleto.render import iter_html, render_carne, stream_carne, stream_html, write_html
+from python_boleto_tests import make_boleto
+
+
+def _boletos(quantidade):
+    return [make_boleto(i, vencimento=datetime.date(2016, 1, 1) + datetime.timedelta(days=30 * i),
+                        valor_documento='12.50')
+            for i in range(1, quantidade + 1)]
+
+
+def test_render_carne():
+    boletos = _boletos(12)
+    html = render_carne(boletos, per_page=3, barcode='js')
+
+    # estilos, scripts e logo apenas uma vez
+    assert html.count('<head>') == 1
+    assert html.count('.boleto-container {') == 1
+    assert html.count('JsBarcode.itf.min.js') == 1
+    assert html.count('JsBarcode(') == 1
+    assert html.count(asset_cache.get_base64(CecredBoleto._logo)) == 1
+
+    # todos os boletos e a quebra de página a cada 3 boletos, sem página em branco no final
+    assert html.count('name="boleto"') == 12
+    assert html.count('<div class="page-break"></div>') == 3
+    assert '<div class="page-break"></div>' not in html[html.rindex(boletos[-1].linha_digitavel):]
+    assert render_carne(_boletos(7), per_page=3).count('<div class="page-break"></div>') == 2
+    for boleto in boletos:
+        assert boleto.codigo_barras in html
+        assert boleto.linha_digitavel in html
+
+
+def test_render_carne_invalid():
+    with pytest.raises(ValueError):
+        render_carne(_boletos(1), per_page=0)
+
+    with pytest.raises(NotImplementedError):
+        render_carne([Boleto()])
+
+
+def test_export_html():
+    boleto = _boletos(1)[0]
+    html = boleto.export_html()
+    assert html.count(asset_cache.get_base64(CecredBoleto._logo)) == 2
+    assert render_svg(boleto.codigo_barras) in html
+
+
+def test_stream_html():
+    boleto = _boletos(1)[0]
+    assert "".join(boleto.stream_html()) == boleto.export_html()
+    assert "".join(stream_html(boleto, include_recibo_sacado=False)) == boleto.export_html(False)
+
+
+def test_stream_carne_generator():
+    boletos = _boletos(5)
+    consumed = []
+
+    def gen():
+        for boleto in boletos:
+            consumed.append(boleto)
+            yield boleto
+
+    chunks = stream_carne(gen(), per_page=2)
+
+    # os boletos são consumidos apenas conforme o documento é gerado
+    assert len(consumed) <= 1
+    assert "".join(chunks) == render_carne(boletos, per_page=2)
+    assert len(consumed) == 5
+
+    assert "".join(stream_carne([])).count('name="boleto"') == 0
+
+
+def test_write_html():
+    boletos = _boletos(4)
+
+    fp = io.StringIO()
+    write_html(boletos, fp, per_page=2)
+    assert fp.getvalue() == render_carne(boletos, per_page=2)
+
+    fp = io.BytesIO()
+    write_html(boletos[0], fp, encoding='utf-8', buffer_size=10)
+    assert fp.getvalue() == boletos[0].export_html().encode('utf-8')
+
+
+def test_iter_html_wsgi():
+    boletos = _boletos(3)
+    chunks = list(iter_html(boletos, encoding='utf-8', buffer_size=1024))
+
+    assert len(chunks) > 1
+    assert all(isinstance(chunk, bytes) for chunk in chunks)
+    assert b"".join(chunks).decode('utf-8') == render_carne(boletos)
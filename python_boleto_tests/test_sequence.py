@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+# This file is part of Python Boleto.
+#
+# Copyright (c) 2016, Rockho Team. All rights reserved.
+# Author: Christian Hess
+#
+# This source code is licensed under the AGPLv3 license found in the
+# LICENSE file in the root directory of this source tree.
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import datetime
+
+import pytest
+
+from python_boleto.cecred import CecredBoleto
+from python_boleto.sequence import SequenceAllocator
+
+
+def _take(path, count):
+    allocator = SequenceAllocator(path, name='010120', block_size=50)
+    return [allocator.next() for _ in range(count)]
+
+
+def test_allocate(tmpdir):
+    path = str(tmpdir.join('sequencias.db'))
+    allocator = SequenceAllocator(path, block_size=10)
+
+    assert list(allocator.allocate()) == list(range(1, 11))
+    assert list(allocator.allocate(5)) == list(range(11, 16))
+    assert [allocator.next() for _ in range(3)] == [16, 17, 18]
+
+    # outra instância (ex: outro processo) continua a partir do próximo bloco
+    other = SequenceAllocator(path, block_size=10)
+    assert other.next() == 26
+    assert allocator.take(12) == list(range(19, 26)) + list(range(36, 41))
+
+    # as sequências são independentes
+    assert SequenceAllocator(path, name='outra', start=100).next() == 100
+
+
+def test_exhausted(tmpdir):
+    allocator = SequenceAllocator(str(tmpdir.join('sequencias.db')), block_size=4, maximum=10)
+    assert allocator.take(10) == list(range(1, 11))
+
+    with pytest.raises(ValueError):
+        allocator.next()
+
+
+def test_threads(tmpdir):
+    allocator = SequenceAllocator(str(tmpdir.join('sequencias.db')), block_size=7)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        numbers = list(executor.map(lambda _: allocator.next(), range(2000)))
+    assert sorted(numbers) == list(range(1, 2001))
+
+
+def test_processes(tmpdir):
+    path = str(tmpdir.join('sequencias.db'))
+    SequenceAllocator(path)
+
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(_take, [path] * 8, [120] * 8))
+
+    numbers = [n for result in results for n in result]
+    assert len(set(numbers)) == len(numbers) == 960
+    assert all(result == sorted(result) for result in results)
+
+
+def test_assign(tmpdir):
+    allocator = SequenceAllocator(str(tmpdir.join('sequencias.db')))
+    boletos = [CecredBoleto(convenio='010120', conta_corrente='03571572', vencimento=datetime.date(2016, 1, 25),
+                            valor_documento='10.00') for _ in range(3)]
+    boletos[0].nosso_numero
+
+    allocator.assign(boletos)
+    assert [boleto.num_sequencial for boleto in boletos] == [1, 2, 3]
+    assert [boleto.nosso_numero for boleto in boletos] == ['0357157200000000{0}'.format(i) for i in (1, 2, 3)]
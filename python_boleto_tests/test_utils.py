@@ -6,7 +6,13 @@
 #
 # This source code is licensed under the AGPLv3 license found in the
 # LICENSE file in the root directory of this source tree.
-from python_boleto.utils import modulo10, modulo10gen, modulo11, modulo11gen
+import random
+
+import pytest
+
+from python_boleto.utils import (
+    modulo10, modulo10_many, modulo10gen, modulo11, modulo11_many, modulo11gen
+)
 
 
 def test_modulo10gen():
@@ -25,8 +31,64 @@ def test_modulo10():
     assert modulo10('085901012') == 6
     assert modulo10('0035715720') == 5
     assert modulo10('0000000101') == 6
+    assert modulo10('0000000019') == 0
+    # apenas algarismos ASCII
+    assert modulo10(u'0000000\u00b201\u06619') == 0
 
 def test_modulo11():
     assert modulo11('3999392300001200008351202000023910476118682') == 4
     assert modulo11('8220000215048200974123220154098290108605940') == 1
     assert modulo11('1049324200000321120055077222133347777777771') == 4
+
+
+def _modulo10_referencia(value):
+    algarismos = [int(a) for a in value]
+    pesos = list(reversed(list(modulo10gen(len(algarismos)))))
+    total = sum(a * p - 9 if a * p >= 10 else a * p for a, p in zip(algarismos, pesos))
+    return (10 - (total % 10)) % 10
+
+
+def _modulo11_referencia(value):
+    algarismos = [int(a) for a in value]
+    pesos = list(reversed(list(modulo11gen(len(algarismos)))))
+    resto = sum(a * p for a, p in zip(algarismos, pesos)) % 11
+    return 1 if resto in (0, 1) else 11 - resto
+
+
+def _valores_aleatorios(quantidade, tamanho, seed=42):
+    rnd = random.Random(seed)
+    return ["".join(rnd.choice("0123456789") for _ in range(tamanho)) for _ in range(quantidade)]
+
+
+def test_modulo_tabelas():
+    for value in _valores_aleatorios(200, 43) + _valores_aleatorios(50, 100) + ['', '0', '7']:
+        assert modulo10(value) == _modulo10_referencia(value)
+        assert modulo11(value) == _modulo11_referencia(value)
+
+    # caracteres que não são algarismos são ignorados
+    assert modulo10('08590.1012') == modulo10('085901012')
+    assert modulo11('0859 3643.9') == modulo11('085936439')
+
+
+def test_modulo_many():
+    values = _valores_aleatorios(300, 10)
+    assert modulo10_many(values) == [modulo10(v) for v in values]
+    assert modulo11_many(values) == [modulo11(v) for v in values]
+
+    # tamanhos diferentes e geradores
+    values = ['01230067896', '399983512', '08590.1012']
+    assert modulo10_many(iter(values)) == [3, 1, 6]
+    assert modulo11_many(values) == [modulo11(v) for v in values]
+    assert modulo10_many([]) == []
+
+
+def test_modulo_many_numpy():
+    numpy = pytest.importorskip("numpy")
+
+    values = _valores_aleatorios(300, 43)
+    digits = numpy.array([[int(a) for a in v] for v in values])
+
+    assert modulo10_many(digits).tolist() == [modulo10(v) for v in values]
+    assert modulo11_many(digits).tolist() == [modulo11(v) for v in values]
+    assert modulo11_many(numpy.array(values)).tolist() == [modulo11(v) for v in values]
+    assert modulo10_many(digits[0]).tolist() == [modulo10(values[0])]
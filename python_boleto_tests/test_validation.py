@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+# This file is part of Python Boleto.
+#
+# Copyright (c) 2016, Rockho Team. All rights reserved.
+# Author: Christian Hess
+#
+# This source code is licensed under the AGPLv3 license found in the
+# LICENSE file in the root directory of this source tree.
+import datetime
+
+import pytest
+
+from python_boleto.base import Boleto
+from python_boleto.cecred import CecredBoleto
+from python_boleto import validation
+
+
+def _valido(**kwargs):
+    data = {'num_sequencial': 1, 'vencimento': datetime.date(2016, 1, 25), 'convenio': '010120'}
+    data.update(kwargs)
+    return CecredBoleto(**data)
+
+
+def test_get_errors():
+    assert _valido().get_errors() == []
+
+    boleto = CecredBoleto(convenio='')
+    boleto.num_sequencial = -1
+    boleto.quantidade = -1
+    boleto.data_documento = -1
+    boleto.instrucoes = -1
+
+    errors = boleto.get_errors()
+    messages = [str(e) for e in errors]
+    assert [type(e) for e in errors] == [ValueError, ValueError, TypeError, TypeError, TypeError, ValueError]
+    assert messages[0].startswith("num_sequencial")
+    assert messages[1].startswith("quantidade")
+    assert messages[2].startswith("vencimento")
+    assert messages[3].startswith("data_documento")
+    assert messages[4].startswith("instrucoes")
+    assert messages[5].startswith("convenio")
+
+    # validate lança o primeiro erro
+    with pytest.raises(ValueError) as excinfo:
+        boleto.validate()
+    assert "num_sequencial" in str(excinfo.value)
+
+
+def test_validate_many():
+    boletos = [_valido(), _valido(num_sequencial=0), _valido(), _valido(convenio='', vencimento=None), Boleto()]
+    result = validation.validate_many(boletos)
+
+    assert [index for index, errors in result] == [1, 3, 4]
+    assert [str(e) for e in result[0][1]] == ["num_sequencial deve maior que zero"]
+    assert len(result[1][1]) == 2
+    assert len(result[2][1]) == 2
+
+
+def test_schema_is_compiled_once():
+    assert validation.get_validator(CecredBoleto) is validation.get_validator(CecredBoleto)
+    assert len(validation.get_validator(CecredBoleto)) == len(Boleto._schema) + 1
+
+
+def test_custom_field():
+    class MyBoleto(Boleto):
+        _schema = Boleto._schema + (validation.IntegerField('quantidade', min_value=5),)
+
+    boleto = MyBoleto(num_sequencial=1, vencimento=datetime.date(2016, 1, 25), quantidade=3)
+    assert [str(e) for e in boleto.get_errors()] == ["quantidade deve ser maior ou igual a 5"]
@@ -7,7 +7,11 @@
 # This source code is licensed under the AGPLv3 license found in the
 # LICENSE file in the root directory of this source tree.
 
+import os
+import sys
+
 import setuptools
+from setuptools.command.build_py import build_py
 
 NAME = 'python-boleto'
 VERSION = '0.1.0'
@@ -21,7 +25,8 @@ REQUIRES = [
     'Jinja2',
     'babel',
     'six',
-    'iso8601'
+    'iso8601',
+    'futures; python_version < "3"'
 ]
 
 TESTS_REQUIRES = [
@@ -29,13 +34,39 @@ TESTS_REQUIRES = [
     'pytest-cov>=2.2.0',
     'flake8>=2.4,<3',
     'pep8-naming>=0.2,<1',
+    'wheel',
     'iso8601'
 ]
 
 EXTRAS_REQUIRES = {
-    'all': set(REQUIRES + TESTS_REQUIRES)
+    'all': set(REQUIRES + TESTS_REQUIRES),
+    'numpy': ['numpy']
 }
 
+
+class BuildPyCommand(build_py):
+    '''
+    Inclui os templates pré-compilados no pacote (ver python_boleto.precompile).
+    O Jinja2 e o six devem estar instalados no ambiente do build (ver pyproject.toml)
+    '''
+
+    def run(self):
+        build_py.run(self)
+
+        # compila os templates do pacote que está sendo gerado
+        sys.path.insert(0, self.build_lib)
+        try:
+            from python_boleto import precompile
+        except ImportError as e:
+            raise RuntimeError("os templates não podem ser pré-compilados, instale o Jinja2 e o six "
+                               "no ambiente do build: {0}".format(e))
+        finally:
+            sys.path.remove(self.build_lib)
+
+        target = os.path.join(self.build_lib, 'python_boleto', 'compiled_templates')
+        precompile.compile_templates(target)
+
+
 if __name__ == '__main__':
     setuptools.setup(
         name=NAME,
@@ -50,4 +81,5 @@ if __name__ == '__main__':
         extras_require=EXTRAS_REQUIRES,
         tests_require=TESTS_REQUIRES,
         include_package_data=True,
+        cmdclass={'build_py': BuildPyCommand},
     )